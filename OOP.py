@@ -1,75 +1,556 @@
-import json
-import re 
-from typing import List
-
-
-class Person:
-    def __init__(self, name: str, age: int, email: str):
-        self.name = name
-        self.age = self.validate_age(age)
-        self._email = self.validate_email(email)
-
-
-    def introduce(self):
-        print(f'Hello, i am  {self.name} i am {self.age} and my email is {self._email}.')
-
-
-    @staticmethod
-    def validate_email(email: str) -> str:
-        email_regex = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-        if re.match(email_regex, email):
-            return email
-        else:
-            raise ValueError(f"Invalid email format: {email}")
-
-
-    @staticmethod
-    def validate_age(age: int) -> int:
-        if isinstance(age, int) and age >= 0:
-            return age
-        else:
-            raise ValueError(f"Invalid age: {age} please enter a valid age.")
-
-
-    @staticmethod
-    def save_data(filename, data):
-        with open(filename, 'w') as file:
-            json.dump(data, file, default=lambda obj: obj.__dict__, indent=4)
-
-
-    @staticmethod
-    def load_data(filename):
-        with open(filename, 'r') as file:
-            return json.load(file)
-
-
-class Instructor(Person):
-    def __init__(self, name: str, age: int, email: str, instructor_id: str, assigned_courses: List['Course'] = None):
-        super().__init__(name, age, email)
-        self.instructor_id = instructor_id
-        self.assigned_courses = assigned_courses if assigned_courses is not None else []
-
-
-    def assign_course(self, course: 'Course'):
-        self.assigned_courses.append(course)
-        
-class Course:
-    def __init__(self, course_id: str, course_name: str, instructor: Instructor, enrolled_students: List['Student'] = None):
-        self.course_id = course_id
-        self.course_name = course_name
-        self.instructor = instructor
-        self.enrolled_students = enrolled_students if enrolled_students is not None else []
-
-
-    def add_student(self, student: 'Student'):
-        self.enrolled_students.append(student)
-        
-class Student(Person):
-    def __init__(self, name: str, age: int, email: str, student_id: str, registered_courses: List[Course] = None):
-        super().__init__(name, age, email)
-        self.student_id = student_id
-        self.registered_courses = registered_courses if registered_courses is not None else []
-
-
-    def register_course(self, course: Course):
-        self.registered_courses.append(course)
\ No newline at end of file
+import json
+import re 
+import warnings
+import weakref
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+EMAIL_PATTERN = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+
+
+def _attributes(obj) -> dict:
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    return {name: getattr(obj, name)
+            for cls in reversed(type(obj).__mro__)
+            for name in getattr(cls, '__slots__', ())
+            if hasattr(obj, name)}
+
+
+def _encode(obj):
+    # Model objects are written as flat records that refer to related entities
+    # by ID, so json never follows the Instructor <-> Course reference cycles.
+    # Course records only list their students when written by SchoolRegistry.iter_records.
+    if isinstance(obj, (Person, Course)):
+        return to_record(obj)
+    return _attributes(obj)
+
+
+def _iter_ndjson(filename) -> Iterator[dict]:
+    with open(filename, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Person:
+    __slots__ = ('name', 'age', '_email')
+
+    def __init__(self, name: str, age: int, email: str):
+        self.name = name
+        self.age = self.validate_age(age)
+        self._email = self.validate_email(email)
+
+
+    def introduce(self):
+        print(f'Hello, i am  {self.name} i am {self.age} and my email is {self._email}.')
+
+
+    @staticmethod
+    def validate_email(email: str) -> str:
+        if isinstance(email, str) and EMAIL_PATTERN.match(email):
+            return email
+        else:
+            raise ValueError(f"Invalid email format: {email}")
+
+
+    @staticmethod
+    def validate_age(age: int) -> int:
+        if isinstance(age, int) and age >= 0:
+            return age
+        else:
+            raise ValueError(f"Invalid age: {age} please enter a valid age.")
+
+
+    @staticmethod
+    def validate_many(records) -> List[List[str]]:
+        match_email = EMAIL_PATTERN.match
+        errors = []
+        for record in records:
+            age = record.get('age')
+            email = record.get('email')
+            if type(age) is int and age >= 0 and type(email) is str and match_email(email):
+                errors.append([])
+                continue
+            row_errors = []
+            for validate, value in ((Person.validate_age, age), (Person.validate_email, email)):
+                try:
+                    validate(value)
+                except ValueError as e:
+                    row_errors.append(str(e))
+            errors.append(row_errors)
+        return errors
+
+
+    @staticmethod
+    def save_data(filename, data, stream: bool = False, chunk_size: int = 1000):
+        if not stream:
+            with open(filename, 'w') as file:
+                json.dump(data, file, default=_encode, indent=4)
+            return
+        # NDJSON: one record per line, flushed every chunk_size records.
+        records = iter(data)
+        with open(filename, 'w') as file:
+            while True:
+                chunk = [json.dumps(record, default=_encode) + '\n' for record in islice(records, chunk_size)]
+                if not chunk:
+                    break
+                file.writelines(chunk)
+
+
+    @staticmethod
+    def load_data(filename, stream: bool = False):
+        if stream:
+            return _iter_ndjson(filename)
+        with open(filename, 'r') as file:
+            return json.load(file)
+
+
+class Instructor(Person):
+    __slots__ = ('instructor_id', 'assigned_courses')
+
+    def __init__(self, name: str, age: int, email: str, instructor_id: str, assigned_courses: List['Course'] = None):
+        super().__init__(name, age, email)
+        self.instructor_id = instructor_id
+        self.assigned_courses = assigned_courses if assigned_courses is not None else []
+
+
+    def assign_course(self, course: 'Course'):
+        self.assigned_courses.append(course)
+        
+# Live registries, searched by the deprecated enrollment shims for the ones holding a record.
+_REGISTRIES: 'weakref.WeakSet[SchoolRegistry]' = weakref.WeakSet()
+
+
+def _deprecated(what: str, stacklevel: int = 3):
+    # stacklevel 3 blames the caller of the shim that called this.
+    warnings.warn(f"{what} is deprecated; enrollments live in SchoolRegistry.enrollments, "
+                  f"use SchoolRegistry.enroll(student_id, course_id)", DeprecationWarning, stacklevel=stacklevel)
+
+
+def _registry_of(record) -> Optional['SchoolRegistry']:
+    # The live registry this very Student or Course object was added to, if any.
+    for registry in list(_REGISTRIES):
+        if isinstance(record, Student):
+            if registry.students.get(record.student_id) is record:
+                return registry
+        elif registry.courses.get(record.course_id) is record:
+            return registry
+    return None
+
+
+def _enroll_legacy(student: 'Student', course: 'Course', what: str):
+    _deprecated(what, stacklevel=4)
+    student_registry, course_registry = _registry_of(student), _registry_of(course)
+    if student_registry is not None and student_registry is course_registry:
+        student_registry.enroll(student.student_id, course.course_id)
+    elif student_registry is not None and course_registry is None:
+        # Linked by the registry when the course is added to it; dropped with the registry otherwise.
+        student_registry._pending_enrollments.setdefault(course, []).append(student.student_id)
+    elif course_registry is not None and student_registry is None:
+        course_registry._pending_enrollments.setdefault(student, []).append(course.course_id)
+    else:
+        raise ValueError(f"Cannot enroll {student.student_id} in {course.course_id}: "
+                         f"add one of them to a SchoolRegistry first")
+
+
+# Enrollments are not stored on Course or Student; they live in the registry's EnrollmentGraph.
+# The enrolled_students / registered_courses arguments, properties and add_student /
+# register_course are deprecated shims over the graph of the registry holding the records.
+class Course:
+    __slots__ = ('course_id', 'course_name', 'instructor')
+
+    def __init__(self, course_id: str, course_name: str, instructor: Instructor, enrolled_students: List['Student'] = None):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.instructor = instructor
+        for student in enrolled_students or ():
+            _enroll_legacy(student, self, 'Course(enrolled_students=...)')
+
+
+    @property
+    def enrolled_students(self) -> List['Student']:
+        _deprecated('Course.enrolled_students')
+        registry = _registry_of(self)
+        return registry.roster(self.course_id) if registry is not None else []
+
+
+    def add_student(self, student: 'Student'):
+        _enroll_legacy(student, self, 'Course.add_student')
+        
+class Student(Person):
+    __slots__ = ('student_id',)
+
+    def __init__(self, name: str, age: int, email: str, student_id: str, registered_courses: List[Course] = None):
+        super().__init__(name, age, email)
+        self.student_id = student_id
+        for course in registered_courses or ():
+            _enroll_legacy(self, course, 'Student(registered_courses=...)')
+
+
+    @property
+    def registered_courses(self) -> List[Course]:
+        _deprecated('Student.registered_courses')
+        registry = _registry_of(self)
+        return registry.schedule(self.student_id) if registry is not None else []
+
+
+    def register_course(self, course: Course):
+        _enroll_legacy(self, course, 'Student.register_course')
+
+
+class EnrollmentGraph:
+    # Student <-> course enrollments as a bipartite graph keyed by ID. Each side maps an ID to a
+    # dict used as an insertion-ordered set of IDs on the other side, so looking up either
+    # adjacency, testing, adding or dropping an enrollment and counting a degree are all O(1).
+    # Adjacency is returned as live views; copy them before enrolling or dropping while iterating.
+
+    def __init__(self):
+        self._courses_of: Dict[str, Dict[str, None]] = {}
+        self._students_of: Dict[str, Dict[str, None]] = {}
+        self._edges = 0
+
+
+    def _courses(self, student_id: str, create: bool = False) -> Optional[Dict[str, None]]:
+        # The course set of a student. Snapshot-backed graphs override this and _students
+        # to load a set from the file the first time it is changed.
+        edges = self._courses_of.get(student_id)
+        if edges is None and create:
+            edges = self._courses_of[student_id] = {}
+        return edges
+
+
+    def _students(self, course_id: str, create: bool = False) -> Optional[Dict[str, None]]:
+        edges = self._students_of.get(course_id)
+        if edges is None and create:
+            edges = self._students_of[course_id] = {}
+        return edges
+
+
+    def __len__(self) -> int:
+        return self._edges
+
+
+    def enroll(self, student_id: str, course_id: str) -> bool:
+        courses = self._courses(student_id, create=True)
+        if course_id in courses:
+            return False
+        courses[course_id] = None
+        self._students(course_id, create=True)[student_id] = None
+        self._edges += 1
+        return True
+
+
+    def drop(self, student_id: str, course_id: str) -> bool:
+        courses = self._courses(student_id)
+        if not courses or course_id not in courses:
+            return False
+        del courses[course_id]
+        del self._students(course_id)[student_id]
+        self._edges -= 1
+        return True
+
+
+    def is_enrolled(self, student_id: str, course_id: str) -> bool:
+        courses = self._courses(student_id)
+        return courses is not None and course_id in courses
+
+
+    def courses_of(self, student_id: str) -> Iterable[str]:
+        courses = self._courses(student_id)
+        return courses.keys() if courses is not None else ()
+
+
+    def students_of(self, course_id: str) -> Iterable[str]:
+        students = self._students(course_id)
+        return students.keys() if students is not None else ()
+
+
+    def course_count(self, student_id: str) -> int:
+        return len(self._courses(student_id) or ())
+
+
+    def student_count(self, course_id: str) -> int:
+        return len(self._students(course_id) or ())
+
+
+    def remove_student(self, student_id: str) -> List[str]:
+        # Drops every enrollment of the student and returns the IDs of the courses it left.
+        courses = self._courses(student_id)
+        dropped = list(courses or ())
+        for course_id in dropped:
+            del self._students(course_id)[student_id]
+        self._edges -= len(dropped)
+        self._courses_of.pop(student_id, None)
+        return dropped
+
+
+    def remove_course(self, course_id: str) -> List[str]:
+        students = self._students(course_id)
+        dropped = list(students or ())
+        for student_id in dropped:
+            del self._courses(student_id)[course_id]
+        self._edges -= len(dropped)
+        self._students_of.pop(course_id, None)
+        return dropped
+
+
+def to_record(obj, enrollments: Optional[EnrollmentGraph] = None) -> dict:
+    if isinstance(obj, Student):
+        return {'type': 'student', 'student_id': obj.student_id, 'name': obj.name,
+                'age': obj.age, 'email': obj._email}
+    if isinstance(obj, Instructor):
+        return {'type': 'instructor', 'instructor_id': obj.instructor_id, 'name': obj.name,
+                'age': obj.age, 'email': obj._email}
+    if isinstance(obj, Course):
+        # A course's students are only known to a registry's enrollment graph.
+        if enrollments is None:
+            registry = _registry_of(obj)
+            if registry is None:
+                raise ValueError(f"Course {obj.course_id} is in no registry; pass the enrollments to list its students")
+            enrollments = registry.enrollments
+        return {'type': 'course', 'course_id': obj.course_id, 'course_name': obj.course_name,
+                'instructor_id': obj.instructor.instructor_id if obj.instructor is not None else None,
+                'enrolled_students': list(enrollments.students_of(obj.course_id))}
+    if isinstance(obj, Person):
+        return {'type': 'person', 'name': obj.name, 'age': obj.age, 'email': obj._email}
+    raise TypeError(f"Cannot convert {type(obj).__name__} to a record")
+
+
+class SchoolRegistry:
+    def __init__(self):
+        self.students: Dict[str, Student] = {}
+        self.instructors: Dict[str, Instructor] = {}
+        self.courses: Dict[str, Course] = {}
+        self.enrollments = EnrollmentGraph()
+        self._listeners: List[Callable[[str, str, str], None]] = []
+        # Records enrolled through the deprecated shims before being added here: the
+        # Student or Course object -> the IDs of what it is enrolled with in this registry.
+        self._pending_enrollments: Dict[object, List[str]] = {}
+        _REGISTRIES.add(self)
+
+
+    def subscribe(self, listener: Callable[[str, str, str], None]):
+        # Listeners are called as listener(event, kind, record_id) after each change, with
+        # event 'inserted', 'updated' or 'removed' and kind 'student', 'instructor' or 'course'.
+        self._listeners.append(listener)
+
+
+    def unsubscribe(self, listener: Callable[[str, str, str], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+    def _notify(self, event: str, kind: str, record_id: str):
+        for listener in self._listeners:
+            listener(event, kind, record_id)
+
+
+    def add_student(self, student: Student) -> Student:
+        if student.student_id in self.students:
+            raise ValueError(f"Student ID already exists: {student.student_id}")
+        self.students[student.student_id] = student
+        self._notify('inserted', 'student', student.student_id)
+        for course_id in self._pending_enrollments.pop(student, ()):
+            self.enroll(student.student_id, course_id)
+        return student
+
+
+    def add_instructor(self, instructor: Instructor) -> Instructor:
+        if instructor.instructor_id in self.instructors:
+            raise ValueError(f"Instructor ID already exists: {instructor.instructor_id}")
+        self.instructors[instructor.instructor_id] = instructor
+        self._notify('inserted', 'instructor', instructor.instructor_id)
+        return instructor
+
+
+    def add_course(self, course: Course) -> Course:
+        if course.course_id in self.courses:
+            raise ValueError(f"Course ID already exists: {course.course_id}")
+        self.courses[course.course_id] = course
+        self._notify('inserted', 'course', course.course_id)
+        for student_id in self._pending_enrollments.pop(course, ()):
+            self.enroll(student_id, course.course_id)
+        return course
+
+
+    def get_student(self, student_id: str) -> Optional[Student]:
+        return self.students.get(student_id)
+
+
+    def get_instructor(self, instructor_id: str) -> Optional[Instructor]:
+        return self.instructors.get(instructor_id)
+
+
+    def get_course(self, course_id: str) -> Optional[Course]:
+        return self.courses.get(course_id)
+
+
+    def schedule(self, student_id: str) -> List[Course]:
+        return [self.courses[course_id] for course_id in self.enrollments.courses_of(student_id)]
+
+
+    def roster(self, course_id: str) -> List[Student]:
+        return [self.students[student_id] for student_id in self.enrollments.students_of(course_id)]
+
+
+    # Counters read in O(1) from the enrollment graph and the instructor's course list,
+    # mirroring the course_stats and instructor_stats tables of school.db
+    def enrollment_count(self, course_id: str) -> int:
+        return self.enrollments.student_count(course_id)
+
+
+    def teaching_load(self, instructor_id: str) -> int:
+        instructor = self.instructors.get(instructor_id)
+        return len(instructor.assigned_courses) if instructor is not None else 0
+
+
+    # Edits are validated like new records, so a reload never drops what was saved
+    def update_student(self, student_id: str, name: str, age: int, email: str) -> Optional[Student]:
+        student = self.students.get(student_id)
+        if student is not None:
+            age, email = Person.validate_age(age), Person.validate_email(email)
+            student.name, student.age, student._email = name, age, email
+            self._notify('updated', 'student', student_id)
+        return student
+
+
+    def update_instructor(self, instructor_id: str, name: str, age: int, email: str) -> Optional[Instructor]:
+        instructor = self.instructors.get(instructor_id)
+        if instructor is not None:
+            age, email = Person.validate_age(age), Person.validate_email(email)
+            instructor.name, instructor.age, instructor._email = name, age, email
+            self._notify('updated', 'instructor', instructor_id)
+        return instructor
+
+
+    def remove_student(self, student_id: str) -> Optional[Student]:
+        student = self.students.pop(student_id, None)
+        if student is not None:
+            self._notify('removed', 'student', student_id)
+            for course_id in self.enrollments.remove_student(student_id):
+                self._notify('updated', 'course', course_id)
+        return student
+
+
+    def remove_instructor(self, instructor_id: str) -> Optional[Instructor]:
+        instructor = self.instructors.pop(instructor_id, None)
+        if instructor is not None:
+            self._notify('removed', 'instructor', instructor_id)
+            for course in instructor.assigned_courses:
+                if course.instructor is instructor:
+                    course.instructor = None
+                    self._notify('updated', 'course', course.course_id)
+        return instructor
+
+
+    def remove_course(self, course_id: str) -> Optional[Course]:
+        course = self.courses.pop(course_id, None)
+        if course is not None:
+            self._notify('removed', 'course', course_id)
+            for student_id in self.enrollments.remove_course(course_id):
+                self._notify('updated', 'student', student_id)
+            if course.instructor is not None and course in course.instructor.assigned_courses:
+                course.instructor.assigned_courses.remove(course)
+                self._notify('updated', 'instructor', course.instructor.instructor_id)
+        return course
+
+
+    def enroll(self, student_id: str, course_id: str) -> bool:
+        if student_id not in self.students or course_id not in self.courses:
+            return False
+        if not self.enrollments.enroll(student_id, course_id):
+            return False
+        self._notify('updated', 'student', student_id)
+        self._notify('updated', 'course', course_id)
+        return True
+
+
+    def drop(self, student_id: str, course_id: str) -> bool:
+        if not self.enrollments.drop(student_id, course_id):
+            return False
+        self._notify('updated', 'student', student_id)
+        self._notify('updated', 'course', course_id)
+        return True
+
+
+    def assign(self, instructor_id: str, course_id: str) -> bool:
+        instructor = self.instructors.get(instructor_id)
+        course = self.courses.get(course_id)
+        if instructor is None or course is None:
+            return False
+        previous = course.instructor
+        if previous is not None and previous is not instructor:
+            if course in previous.assigned_courses:
+                previous.assigned_courses.remove(course)
+                if previous.instructor_id in self.instructors:
+                    self._notify('updated', 'instructor', previous.instructor_id)
+        course.instructor = instructor
+        if course not in instructor.assigned_courses:
+            instructor.assign_course(course)
+        self._notify('updated', 'instructor', instructor_id)
+        self._notify('updated', 'course', course_id)
+        return True
+
+
+    def iter_records(self) -> Iterator[dict]:
+        # Instructors and students come first so courses can link to them on load.
+        for instructor in self.instructors.values():
+            yield to_record(instructor)
+        for student in self.students.values():
+            yield to_record(student)
+        for course in self.courses.values():
+            yield to_record(course, self.enrollments)
+
+
+    def load_records(self, records: Iterable[dict], chunk_size: int = 1000,
+                     progress: Optional[Callable[[int], None]] = None) -> int:
+        # progress(records_read) is called after each chunk; an exception it raises stops the load.
+        skipped = 0
+        read = 0
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return skipped
+            for record, errors in zip(chunk, Person.validate_many(chunk)):
+                try:
+                    if not self.add_record(record, errors):
+                        skipped += 1
+                except ValueError:
+                    skipped += 1
+            read += len(chunk)
+            if progress is not None:
+                progress(read)
+
+
+    def load_graph(self, document: Dict[str, List[dict]],
+                   progress: Optional[Callable[[int], None]] = None) -> int:
+        return self.load_records(chain(
+            ({**record, 'type': 'instructor'} for record in document.get('instructors', [])),
+            ({**record, 'type': 'student'} for record in document.get('students', [])),
+            ({**record, 'type': 'course'} for record in document.get('courses', []))
+        ), progress=progress)
+
+
+    def add_record(self, record: dict, errors: List[str] = None) -> bool:
+        kind = record.get('type')
+        if kind == 'course':
+            course_id = record.get('course_id', '')
+            self.add_course(Course(course_id=course_id, course_name=record.get('course_name', ''), instructor=None))
+            self.assign(record.get('instructor_id'), course_id)
+            for student_id in record.get('enrolled_students', record.get('enrolled_students_ids', [])):
+                self.enroll(student_id, course_id)
+            return True
+        if errors:
+            return False
+        if kind == 'student':
+            self.add_student(Student(name=record.get('name', ''), age=record.get('age', 0),
+                                     email=record.get('email', ''), student_id=record.get('student_id', '')))
+            return True
+        if kind == 'instructor':
+            self.add_instructor(Instructor(name=record.get('name', ''), age=record.get('age', 0),
+                                           email=record.get('email', ''), instructor_id=record.get('instructor_id', '')))
+            return True
+        return False
@@ -0,0 +1,100 @@
+"""
+Background jobs for the PyQt app, run on ``QThreadPool`` worker threads.
+
+A ``Job`` wraps a plain function that takes a ``progress`` callback, such as
+``OOP.SchoolRegistry.load_records`` or ``snapshot.write_snapshot``. The job
+runs it on a pool thread and reports back through the signals of its
+``JobSignals``; Qt queues signals emitted on another thread to the GUI
+thread, so the connected slots can update widgets. The function itself must
+not touch widgets.
+
+Cancelling a job makes its next progress report raise ``JobCancelled``,
+which unwinds the function and is reported through ``cancelled`` instead of
+``failed``.
+"""
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job's function when the job has been cancelled.
+    """
+
+
+class JobSignals(QObject):
+    """
+    Signals emitted by a ``Job``; a ``QRunnable`` cannot emit signals itself.
+
+    Attributes:
+        progress (pyqtSignal): ``(count, fraction)`` as reported by the function,
+            with ``fraction`` between 0 and 1.
+        finished (pyqtSignal): The function's return value.
+        failed (pyqtSignal): The exception the function raised.
+        cancelled (pyqtSignal): Emitted when the function stopped because the job was cancelled.
+    """
+    progress = pyqtSignal(int, float)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    Runs ``work(*args, progress=callback, **kwargs)`` on a ``QThreadPool`` thread.
+
+    Exactly one of ``signals.finished``, ``signals.failed`` and
+    ``signals.cancelled`` is emitted when the function returns. Keep a
+    reference to the job until then; it is not deleted by the pool.
+
+    Attributes:
+        signals (JobSignals): The job's signals, created on the calling (GUI) thread.
+    """
+
+    def __init__(self, work, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = JobSignals()
+        self._work = work
+        self._args = args
+        self._kwargs = kwargs
+        self._cancelled = threading.Event()
+
+    def isCancelled(self):
+        """
+        Returns whether ``cancel`` has been called.
+        """
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Asks the job to stop at its next progress report.
+        """
+        self._cancelled.set()
+
+    def report(self, count, fraction):
+        """
+        Emits ``signals.progress``; passed to the function as its ``progress`` callback.
+
+        Raises:
+            JobCancelled: If the job has been cancelled.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self.signals.progress.emit(count, fraction)
+
+    def run(self):
+        """
+        Runs the function and emits the signal matching how it ended; called by the pool.
+        """
+        try:
+            if self._cancelled.is_set():
+                raise JobCancelled()
+            result = self._work(*self._args, progress=self.report, **self._kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
@@ -0,0 +1,100 @@
+"""
+Measures ``school_api`` request throughput over loopback.
+
+Builds a throwaway database with synthetic students, starts the API server
+on a free port in a subprocess, then has many concurrent keep-alive clients
+request random students by ID and reports requests per second together with
+the server's ``/stats`` (how many queries the lookups were batched into).
+
+Usage::
+
+    python benchmarks/api_throughput.py [rows] [requests] [clients]
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db_migrations import migrate
+
+DEFAULT_ROWS = 100_000
+DEFAULT_REQUESTS = 20_000
+DEFAULT_CLIENTS = 50
+
+
+def populate(path, rows):
+    """
+    Creates a database at ``path`` with ``rows`` students.
+    """
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.executemany('INSERT INTO students (name, age, email, student_id) VALUES (?, ?, ?, ?)',
+                     ((f'Student {i}', 18 + i % 10, f's{i}@school.edu', f'S{i}') for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+async def request(reader, writer, path):
+    """
+    Sends one GET on an open connection and returns the status and decoded JSON body.
+    """
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode('latin-1'))
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port, rows, count):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for _ in range(count):
+        status, _body = await request(reader, writer, f'/students/S{random.randrange(rows)}')
+        assert status == 200, status
+    writer.close()
+
+
+async def run(port, rows, requests, clients):
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, rows, requests // clients) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _status, stats = await request(reader, writer, '/stats')
+    writer.close()
+    done = requests // clients * clients
+    print(f'{done} requests from {clients} clients in {elapsed:.2f}s: {done / elapsed:,.0f} requests/s')
+    print(f'server stats: {stats}')
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_REQUESTS
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CLIENTS
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'school.db')
+        populate(path, rows)
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'school_api.py'), '--db', path, '--port', '0'],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            port = int(server.stdout.readline().rsplit(':', 1)[1])
+            asyncio.run(run(port, rows, requests, clients))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
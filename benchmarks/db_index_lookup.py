@@ -0,0 +1,89 @@
+"""
+Measures ``school.db`` lookup latency before and after the index migration.
+
+Builds a throwaway database at schema version 1 (the original tables, no
+indexes), fills it with synthetic rows, times the lookups the Tkinter app
+issues, then migrates to the latest version and times them again.
+
+Usage::
+
+    python benchmarks/db_index_lookup.py [rows] [lookups]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_migrations import migrate
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_LOOKUPS = 200
+COURSES = 1000
+
+QUERIES = [
+    ('student by student_id', 'SELECT name FROM students WHERE student_id = ?', lambda i: f'S{i}'),
+    ('student_id by name', 'SELECT student_id FROM students WHERE name = ?', lambda i: f'Student {i}'),
+    ('course_id by course_name', 'SELECT course_id FROM courses WHERE course_name = ?', lambda i: f'Course {i % COURSES}'),
+    ('registrations by course', 'SELECT COUNT(*) FROM registrations WHERE course_id = ?', lambda i: f'C{i % COURSES}'),
+]
+
+
+def populate(conn, rows):
+    """
+    Fills the version 1 schema with ``rows`` students, each registered for one course.
+    """
+    migrate(conn, target=1)
+    conn.executemany('INSERT INTO instructors (name, age, email, instructor_id) VALUES (?, ?, ?, ?)',
+                     ((f'Instructor {i}', 40, f'i{i}@school.edu', f'I{i}') for i in range(COURSES)))
+    conn.executemany('INSERT INTO courses (course_name, course_id, instructor_id) VALUES (?, ?, ?)',
+                     ((f'Course {i}', f'C{i}', f'I{i}') for i in range(COURSES)))
+    conn.executemany('INSERT INTO students (name, age, email, student_id) VALUES (?, ?, ?, ?)',
+                     ((f'Student {i}', 18 + i % 10, f's{i}@school.edu', f'S{i}') for i in range(rows)))
+    conn.executemany('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)',
+                     ((f'S{i}', f'C{i % COURSES}') for i in range(rows)))
+    conn.commit()
+
+
+def time_queries(conn, keys):
+    """
+    Returns the mean latency in milliseconds of each query in ``QUERIES``.
+    """
+    results = []
+    for label, sql, make_key in QUERIES:
+        start = time.perf_counter()
+        for i in keys:
+            conn.execute(sql, (make_key(i),)).fetchall()
+        results.append((label, 1000 * (time.perf_counter() - start) / len(keys)))
+    return results
+
+
+def main(rows, lookups):
+    path = os.path.join(tempfile.mkdtemp(), 'bench_school.db')
+    conn = sqlite3.connect(path)
+    try:
+        print(f'Populating {rows:,} students ...')
+        populate(conn, rows)
+        keys = random.sample(range(rows), min(lookups, rows))
+        before = time_queries(conn, keys)
+
+        start = time.perf_counter()
+        migrate(conn)
+        print(f'Migration to latest schema took {time.perf_counter() - start:.1f}s')
+        after = time_queries(conn, keys)
+
+        print(f"{'lookup':<28} {'before ms':>10} {'after ms':>10} {'speedup':>9}")
+        for (label, old), (_, new) in zip(before, after):
+            print(f'{label:<28} {old:>10.3f} {new:>10.3f} {old / new:>8.0f}x')
+    finally:
+        conn.close()
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:3]]
+    main(*(arguments + [DEFAULT_ROWS, DEFAULT_LOOKUPS][len(arguments):]))
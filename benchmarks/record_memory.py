@@ -0,0 +1,101 @@
+"""
+Reports the memory used per record by the OOP model classes.
+
+Compares the previous ``__dict__``-backed layout of ``Student``, ``Instructor``
+and ``Course`` against the ``__slots__`` layout in ``OOP.py``. The strings each
+record points to are allocated up front and shared by both layouts, so the
+figures only count the objects themselves (instance plus any empty lists).
+Both layouts hold the same attributes: enrollments live in the registry's
+``EnrollmentGraph`` rather than on students and courses, so neither layout
+carries per-record enrollment lists and the difference is ``__slots__`` alone.
+
+Usage::
+
+    python benchmarks/record_memory.py [count ...]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OOP import Course, Instructor, Student
+
+DEFAULT_COUNTS = (10_000, 100_000, 1_000_000)
+
+
+class DictPerson:
+    def __init__(self, name, age, email):
+        self.name = name
+        self.age = age
+        self._email = email
+
+
+class DictStudent(DictPerson):
+    def __init__(self, name, age, email, student_id):
+        super().__init__(name, age, email)
+        self.student_id = student_id
+
+
+class DictInstructor(DictPerson):
+    def __init__(self, name, age, email, instructor_id, assigned_courses=None):
+        super().__init__(name, age, email)
+        self.instructor_id = instructor_id
+        self.assigned_courses = assigned_courses if assigned_courses is not None else []
+
+
+class DictCourse:
+    def __init__(self, course_id, course_name, instructor):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.instructor = instructor
+
+
+def make_strings(count):
+    """
+    Builds the per-record strings shared by both layouts.
+    """
+    return [(f'Name {i}', f'user{i}@school.edu', f'ID{i}') for i in range(count)]
+
+
+def bytes_per_record(factory, strings):
+    """
+    Returns the average number of bytes allocated per record built by ``factory``.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    records = [factory(name, email, record_id) for name, email, record_id in strings]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return (after - before) / len(strings)
+
+
+LAYOUTS = [
+    ('Student',
+     lambda n, e, i: DictStudent(n, 20, e, i),
+     lambda n, e, i: Student(n, 20, e, i)),
+    ('Instructor',
+     lambda n, e, i: DictInstructor(n, 40, e, i),
+     lambda n, e, i: Instructor(n, 40, e, i)),
+    ('Course',
+     lambda n, e, i: DictCourse(i, n, None),
+     lambda n, e, i: Course(i, n, None)),
+]
+
+
+def main(counts):
+    print(f"{'records':>10} {'class':<11} {'dict B/rec':>11} {'slots B/rec':>12} {'saved':>7}")
+    for count in counts:
+        strings = make_strings(count)
+        for label, before_factory, after_factory in LAYOUTS:
+            before = bytes_per_record(before_factory, strings)
+            after = bytes_per_record(after_factory, strings)
+            saved = 100 * (before - after) / before
+            print(f"{count:>10,} {label:<11} {before:>11.1f} {after:>12.1f} {saved:>6.1f}%")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
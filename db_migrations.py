@@ -0,0 +1,326 @@
+"""
+Versioned schema migrations for ``school.db``.
+
+The schema version is kept in SQLite's ``PRAGMA user_version``. Each entry in
+``MIGRATIONS`` upgrades the database by one version inside its own
+transaction, so an existing file is upgraded in place and a failed step
+leaves it at the previous version.
+"""
+import sqlite3
+
+MIGRATIONS = [
+    (1, 'Create the base tables', [
+        """
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            student_id TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS instructors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            instructor_id TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_name TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            instructor_id TEXT NOT NULL,
+            FOREIGN KEY(instructor_id) REFERENCES instructors(instructor_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            FOREIGN KEY(student_id) REFERENCES students(student_id),
+            FOREIGN KEY(course_id) REFERENCES courses(course_id)
+        )
+        """,
+    ]),
+    (2, 'Add lookup indexes and unique IDs', [
+        # Keep the oldest row of any duplicated ID so the unique indexes can be built. The
+        # other rows may hold different data, so they are first copied to discarded_* tables
+        # to be reviewed by hand; duplicate registrations carry nothing but the pair itself.
+        'CREATE TABLE IF NOT EXISTS discarded_students AS SELECT * FROM students '
+        'WHERE id NOT IN (SELECT MIN(id) FROM students GROUP BY student_id)',
+        'CREATE TABLE IF NOT EXISTS discarded_instructors AS SELECT * FROM instructors '
+        'WHERE id NOT IN (SELECT MIN(id) FROM instructors GROUP BY instructor_id)',
+        'CREATE TABLE IF NOT EXISTS discarded_courses AS SELECT * FROM courses '
+        'WHERE id NOT IN (SELECT MIN(id) FROM courses GROUP BY course_id)',
+        'DELETE FROM students WHERE id NOT IN (SELECT MIN(id) FROM students GROUP BY student_id)',
+        'DELETE FROM instructors WHERE id NOT IN (SELECT MIN(id) FROM instructors GROUP BY instructor_id)',
+        'DELETE FROM courses WHERE id NOT IN (SELECT MIN(id) FROM courses GROUP BY course_id)',
+        'DELETE FROM registrations WHERE id NOT IN (SELECT MIN(id) FROM registrations GROUP BY student_id, course_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_students_student_id ON students(student_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_instructors_instructor_id ON instructors(instructor_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_courses_course_id ON courses(course_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_registrations_student_course ON registrations(student_id, course_id)',
+        'CREATE INDEX IF NOT EXISTS idx_registrations_course_id ON registrations(course_id)',
+        'CREATE INDEX IF NOT EXISTS idx_students_name ON students(name)',
+        'CREATE INDEX IF NOT EXISTS idx_instructors_name ON instructors(name)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_course_name ON courses(course_name)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_instructor_id ON courses(instructor_id)',
+    ]),
+    (3, 'Add a full-text search index', [
+        # One FTS5 table covers all three tables. Its rowid is derived from the source
+        # row (id * 3 + 0 for students, 1 for instructors, 2 for courses) so the
+        # triggers can find an entry by rowid instead of scanning the index.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED,
+            record_id,
+            name,
+            email,
+            prefix='2 3'
+        )
+        """,
+        "INSERT INTO search_index (rowid, kind, record_id, name, email) "
+        "SELECT id * 3, 'Student', student_id, name, email FROM students",
+        "INSERT INTO search_index (rowid, kind, record_id, name, email) "
+        "SELECT id * 3 + 1, 'Instructor', instructor_id, name, email FROM instructors",
+        "INSERT INTO search_index (rowid, kind, record_id, name, email) "
+        "SELECT id * 3 + 2, 'Course', course_id, course_name, '' FROM courses",
+        """
+        CREATE TRIGGER IF NOT EXISTS students_search_insert AFTER INSERT ON students BEGIN
+            INSERT INTO search_index (rowid, kind, record_id, name, email)
+            VALUES (new.id * 3, 'Student', new.student_id, new.name, new.email);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_search_update AFTER UPDATE ON students BEGIN
+            UPDATE search_index SET record_id = new.student_id, name = new.name, email = new.email
+            WHERE rowid = old.id * 3;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_search_delete AFTER DELETE ON students BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 3;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS instructors_search_insert AFTER INSERT ON instructors BEGIN
+            INSERT INTO search_index (rowid, kind, record_id, name, email)
+            VALUES (new.id * 3 + 1, 'Instructor', new.instructor_id, new.name, new.email);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS instructors_search_update AFTER UPDATE ON instructors BEGIN
+            UPDATE search_index SET record_id = new.instructor_id, name = new.name, email = new.email
+            WHERE rowid = old.id * 3 + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS instructors_search_delete AFTER DELETE ON instructors BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 3 + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_search_insert AFTER INSERT ON courses BEGIN
+            INSERT INTO search_index (rowid, kind, record_id, name, email)
+            VALUES (new.id * 3 + 2, 'Course', new.course_id, new.course_name, '');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_search_update AFTER UPDATE ON courses BEGIN
+            UPDATE search_index SET record_id = new.course_id, name = new.course_name
+            WHERE rowid = old.id * 3 + 2;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_search_delete AFTER DELETE ON courses BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 3 + 2;
+        END
+        """,
+    ]),
+    (4, 'Add a name vocabulary for fuzzy search', [
+        # A contentless FTS5 table of names only, sharing search_index's rowids, and
+        # an fts5vocab view listing its distinct words. Fuzzy search matches query
+        # words against the (small) vocabulary instead of against every record.
+        "CREATE VIRTUAL TABLE IF NOT EXISTS name_index USING fts5(name, content='')",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS name_terms USING fts5vocab(name_index, row)",
+        "INSERT INTO name_index (rowid, name) SELECT id * 3, name FROM students",
+        "INSERT INTO name_index (rowid, name) SELECT id * 3 + 1, name FROM instructors",
+        "INSERT INTO name_index (rowid, name) SELECT id * 3 + 2, course_name FROM courses",
+        # Contentless tables are changed with the 'delete' command, which needs the old text.
+        """
+        CREATE TRIGGER IF NOT EXISTS students_name_insert AFTER INSERT ON students BEGIN
+            INSERT INTO name_index (rowid, name) VALUES (new.id * 3, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_name_update AFTER UPDATE OF name ON students BEGIN
+            INSERT INTO name_index (name_index, rowid, name) VALUES ('delete', old.id * 3, old.name);
+            INSERT INTO name_index (rowid, name) VALUES (new.id * 3, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_name_delete AFTER DELETE ON students BEGIN
+            INSERT INTO name_index (name_index, rowid, name) VALUES ('delete', old.id * 3, old.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS instructors_name_insert AFTER INSERT ON instructors BEGIN
+            INSERT INTO name_index (rowid, name) VALUES (new.id * 3 + 1, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS instructors_name_update AFTER UPDATE OF name ON instructors BEGIN
+            INSERT INTO name_index (name_index, rowid, name) VALUES ('delete', old.id * 3 + 1, old.name);
+            INSERT INTO name_index (rowid, name) VALUES (new.id * 3 + 1, new.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS instructors_name_delete AFTER DELETE ON instructors BEGIN
+            INSERT INTO name_index (name_index, rowid, name) VALUES ('delete', old.id * 3 + 1, old.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_name_insert AFTER INSERT ON courses BEGIN
+            INSERT INTO name_index (rowid, name) VALUES (new.id * 3 + 2, new.course_name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_name_update AFTER UPDATE OF course_name ON courses BEGIN
+            INSERT INTO name_index (name_index, rowid, name) VALUES ('delete', old.id * 3 + 2, old.course_name);
+            INSERT INTO name_index (rowid, name) VALUES (new.id * 3 + 2, new.course_name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_name_delete AFTER DELETE ON courses BEGIN
+            INSERT INTO name_index (name_index, rowid, name) VALUES ('delete', old.id * 3 + 2, old.course_name);
+        END
+        """,
+    ]),
+    (5, 'Add enrollment and teaching-load counters', [
+        # Deleting a student or course now deletes its registrations (see the triggers
+        # below); drop the ones earlier deletes left behind so they are not counted. Their
+        # IDs may be the only record of those enrollments, so they are first copied to
+        # discarded_registrations, like the duplicates of migration 2.
+        'CREATE TABLE IF NOT EXISTS discarded_registrations AS SELECT * FROM registrations '
+        'WHERE student_id NOT IN (SELECT student_id FROM students) '
+        'OR course_id NOT IN (SELECT course_id FROM courses)',
+        'DELETE FROM registrations WHERE student_id NOT IN (SELECT student_id FROM students) '
+        'OR course_id NOT IN (SELECT course_id FROM courses)',
+        # Summary tables kept in step by triggers: students per course (the registrations
+        # grouped by course_id) and courses per instructor (the courses grouped by
+        # instructor_id). Reading a count is a primary-key lookup instead of a COUNT(*).
+        'CREATE TABLE IF NOT EXISTS course_stats (course_id TEXT PRIMARY KEY, students INTEGER NOT NULL) WITHOUT ROWID',
+        'CREATE TABLE IF NOT EXISTS instructor_stats (instructor_id TEXT PRIMARY KEY, courses INTEGER NOT NULL) WITHOUT ROWID',
+        'INSERT INTO course_stats (course_id, students) SELECT course_id, COUNT(*) FROM registrations GROUP BY course_id',
+        'INSERT INTO instructor_stats (instructor_id, courses) '
+        'SELECT instructor_id, COUNT(*) FROM courses GROUP BY instructor_id',
+        """
+        CREATE TRIGGER IF NOT EXISTS registrations_count_insert AFTER INSERT ON registrations BEGIN
+            INSERT INTO course_stats (course_id, students) VALUES (new.course_id, 1)
+            ON CONFLICT (course_id) DO UPDATE SET students = students + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS registrations_count_update AFTER UPDATE OF course_id ON registrations BEGIN
+            UPDATE course_stats SET students = students - 1 WHERE course_id = old.course_id;
+            INSERT INTO course_stats (course_id, students) VALUES (new.course_id, 1)
+            ON CONFLICT (course_id) DO UPDATE SET students = students + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS registrations_count_delete AFTER DELETE ON registrations BEGIN
+            UPDATE course_stats SET students = students - 1 WHERE course_id = old.course_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_count_insert AFTER INSERT ON courses BEGIN
+            INSERT INTO instructor_stats (instructor_id, courses) VALUES (new.instructor_id, 1)
+            ON CONFLICT (instructor_id) DO UPDATE SET courses = courses + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_count_update AFTER UPDATE OF instructor_id ON courses BEGIN
+            UPDATE instructor_stats SET courses = courses - 1 WHERE instructor_id = old.instructor_id;
+            INSERT INTO instructor_stats (instructor_id, courses) VALUES (new.instructor_id, 1)
+            ON CONFLICT (instructor_id) DO UPDATE SET courses = courses + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_count_delete AFTER DELETE ON courses BEGIN
+            UPDATE instructor_stats SET courses = courses - 1 WHERE instructor_id = old.instructor_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_registrations_delete AFTER DELETE ON students BEGIN
+            DELETE FROM registrations WHERE student_id = old.student_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS courses_registrations_delete AFTER DELETE ON courses BEGIN
+            DELETE FROM registrations WHERE course_id = old.course_id;
+        END
+        """,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    """
+    Returns the schema version recorded in the database.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+
+    Returns
+    -------
+    int
+        The current ``user_version``; 0 for a database that was never migrated.
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION):
+    """
+    Upgrades the database to ``target`` by applying every pending migration.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database. It must not be inside a transaction.
+    target : int
+        The schema version to stop at.
+
+    Returns
+    -------
+    int
+        The schema version after migrating.
+
+    Raises
+    ------
+    sqlite3.Error
+        If a migration fails; that migration is rolled back.
+    """
+    version = schema_version(conn)
+    for number, _description, statements in MIGRATIONS:
+        if number <= version or number > target:
+            continue
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        version = number
+    return version
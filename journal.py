@@ -0,0 +1,202 @@
+"""
+Append-only change journal on top of binary snapshots.
+
+Every add, edit, enroll, drop, assign and delete is recorded as one JSON line with
+an increasing sequence number. Saving appends the pending lines and fsyncs
+them, so its cost is proportional to the change. Once enough entries have
+built up the registry is compacted into a new snapshot (written atomically,
+see ``snapshot.write_snapshot``) that remembers the last sequence number it
+contains, and the journal is emptied.
+
+A registry opened from a snapshot keeps the file open and memory-mapped, and
+Windows refuses to replace a file that is open. Compaction therefore
+alternates between the snapshot path and a second file next to it, always
+writing the one the registry was not opened from.
+
+On startup the newer of the two snapshots is opened and only journal entries
+newer than its sequence number are replayed. A crash can leave at most a torn last line,
+which is discarded, or a journal that was not yet emptied after compaction,
+whose entries are skipped by sequence number.
+"""
+import json
+import os
+
+from OOP import SchoolRegistry
+from snapshot import Snapshot, open_registry, write_snapshot
+
+COMPACT_EVERY = 10000
+# Appended to the snapshot path to name the file that compaction alternates with.
+ALTERNATE_SUFFIX = '.alt'
+
+
+def apply_entry(registry, entry):
+    """
+    Applies one journal entry to ``registry``.
+
+    Args:
+        registry (SchoolRegistry): The registry to change.
+        entry (dict): A journal entry as written by ``JournaledStore.record``.
+    """
+    op = entry['op']
+    if op == 'add':
+        registry.add_record(entry['record'])
+    elif op == 'update':
+        record = entry['record']
+        if record['type'] == 'student':
+            registry.update_student(record['student_id'], record['name'], record['age'], record['email'])
+        else:
+            registry.update_instructor(record['instructor_id'], record['name'], record['age'], record['email'])
+    elif op == 'remove':
+        remove = {'student': registry.remove_student,
+                  'instructor': registry.remove_instructor,
+                  'course': registry.remove_course}[entry['type']]
+        remove(entry['id'])
+    elif op == 'enroll':
+        registry.enroll(entry['student_id'], entry['course_id'])
+    elif op == 'drop':
+        registry.drop(entry['student_id'], entry['course_id'])
+    elif op == 'assign':
+        registry.assign(entry['instructor_id'], entry['course_id'])
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+
+class JournaledStore:
+    """
+    Persists a registry as a snapshot plus a journal of later changes.
+
+    Attributes:
+        snapshot_path (str): File holding a compacted snapshot; compaction alternates
+            between it and ``snapshot_path + ALTERNATE_SUFFIX``.
+        journal_path (str): Append-only file of changes made since then.
+        compact_every (int): Number of journal entries that triggers compaction on save.
+        seq (int): Sequence number of the last recorded entry.
+    """
+    def __init__(self, snapshot_path, journal_path, compact_every=COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+        self.seq = 0
+        self._pending = []
+        self._journaled = 0
+        self._stale = False
+
+    def open(self, default_factory=SchoolRegistry):
+        """
+        Loads the snapshot (if any) and replays the journal tail on top of it.
+
+        Args:
+            default_factory (callable): Builds the starting registry when no
+                snapshot has been written yet.
+
+        Returns:
+            SchoolRegistry: The restored registry.
+        """
+        path = self.latest_snapshot()
+        if path is not None:
+            registry = open_registry(path)
+            self.seq = registry.snapshot.journal_seq
+        else:
+            registry = default_factory()
+        self._journaled = self._replay(registry)
+        return registry
+
+    def latest_snapshot(self):
+        """
+        Returns the path of the newest compacted snapshot, or None if there is none.
+        """
+        newest, newest_seq = None, -1
+        for path in (self.snapshot_path, self.snapshot_path + ALTERNATE_SUFFIX):
+            if os.path.exists(path):
+                with Snapshot(path) as snapshot:
+                    if snapshot.journal_seq > newest_seq:
+                        newest, newest_seq = path, snapshot.journal_seq
+        return newest
+
+    def _compaction_target(self, registry):
+        # The snapshot file the registry is not reading from, so it can be replaced.
+        snapshot = getattr(registry, 'snapshot', None)
+        if snapshot is not None and os.path.normcase(os.path.abspath(snapshot.path)) == \
+                os.path.normcase(os.path.abspath(self.snapshot_path)):
+            return self.snapshot_path + ALTERNATE_SUFFIX
+        return self.snapshot_path
+
+    def _replay(self, registry):
+        if not os.path.exists(self.journal_path):
+            return 0
+        replayed = 0
+        good_end = 0
+        with open(self.journal_path, 'rb') as file:
+            for line in file:
+                # A torn write can only affect the last line; drop it and anything after it.
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                good_end += len(line)
+                if entry['seq'] <= self.seq:
+                    continue
+                apply_entry(registry, entry)
+                self.seq = entry['seq']
+                replayed += 1
+        if good_end != os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as file:
+                file.truncate(good_end)
+                os.fsync(file.fileno())
+        return replayed
+
+    def record(self, op, **fields):
+        """
+        Queues a change to be written on the next ``save``.
+
+        Args:
+            op (str): One of ``add``, ``update``, ``remove``, ``enroll``, ``drop`` or ``assign``.
+            **fields: The entry payload, as read back by ``apply_entry``.
+        """
+        self.seq += 1
+        self._pending.append({'seq': self.seq, 'op': op, **fields})
+
+    def invalidate(self):
+        """
+        Marks the registry as replaced wholesale, so the next save compacts.
+        """
+        self._pending.clear()
+        self._stale = True
+
+    def save(self, registry, progress=None):
+        """
+        Appends the pending changes to the journal, compacting when due.
+
+        Args:
+            registry (SchoolRegistry): The registry the changes were made to.
+            progress (callable): Passed to ``write_snapshot`` when compacting.
+        """
+        if self._stale or self._journaled + len(self._pending) >= self.compact_every:
+            self.compact(registry, progress)
+            return
+        if not self._pending:
+            return
+        data = ''.join(json.dumps(entry) + '\n' for entry in self._pending).encode('utf-8')
+        with open(self.journal_path, 'ab') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self._journaled += len(self._pending)
+        self._pending.clear()
+
+    def compact(self, registry, progress=None):
+        """
+        Writes a full snapshot of ``registry`` and empties the journal.
+
+        The snapshot goes to whichever of the two snapshot files ``registry``
+        was not opened from. If ``progress`` (see ``write_snapshot``) stops the
+        write, the store is left as it was and the next save compacts again.
+        """
+        write_snapshot(self._compaction_target(registry), registry, journal_seq=self.seq, progress=progress)
+        with open(self.journal_path, 'wb') as file:
+            os.fsync(file.fileno())
+        self._journaled = 0
+        self._pending.clear()
+        self._stale = False
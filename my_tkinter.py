@@ -1,9 +1,68 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox, filedialog, simpledialog
-import sqlite3
-import csv
+import os
 from tkinter import Toplevel, Label, Button
+from db_migrations import migrate
+from school_db import (PAGE_SIZE, ConnectionPool, NameCache, QueryExecutor, enroll_students, export_csv,
+                       fetch_page, fetch_page_before, import_csv, fuzzy_search, read_id_file, search_records,
+                       view_counts)
+
+# The 'View All' list keeps at most this many rows in the Treeview at once.
+VIEW_WINDOW = 5 * PAGE_SIZE
+# Fetch another page once the visible rows come this close (as a fraction) to either end of the window.
+VIEW_PREFETCH = 0.1
+# How often (in milliseconds) the Tk loop checks background database jobs for results.
+JOB_POLL_MS = 50
+# What the 'Count' column of the 'View All' list counts for each record type.
+COUNT_UNITS = {'Instructor': 'course', 'Course': 'student'}
+
+
+def find_records(conn, text):
+    """
+    Runs the 'View All' search: full-text matches, or the closest names if there are none.
+
+    Returns:
+        tuple: ``(results, closest, counts)``, where ``results`` and ``closest`` are as returned
+        by ``search_records`` and ``fuzzy_search`` and ``counts`` is as returned by ``view_counts``.
+    """
+    results = search_records(conn, text)
+    closest = [] if results else fuzzy_search(conn, text)
+    records = [(record_id, kind) for record_id, _name, kind in results]
+    records += [(record_id, kind) for _score, record_id, _name, kind in closest]
+    return results, closest, view_counts(conn, records)
+
+
+def count_text(kind, count):
+    """
+    Formats a record's count for the 'Count' column, e.g. '3 students' for a course.
+
+    Returns:
+        str: The formatted count, or '' for record types without one.
+    """
+    unit = COUNT_UNITS.get(kind)
+    if unit is None or count is None:
+        return ''
+    return f"{count} {unit}{'' if count == 1 else 's'}"
+
+
+def dropdown_names(conn):
+    """
+    Returns the student names and course names offered in the 'Register for Course' tab.
+    """
+    students = [row[0] for row in conn.execute('SELECT name FROM students')]
+    courses = [row[0] for row in conn.execute('SELECT course_name FROM courses')]
+    return students, courses
+
+
+def enroll_id_file(conn, course_id, filename):
+    """
+    Enrolls the students listed in an ID file (see ``read_id_file``) in one course.
+
+    Returns:
+        dict: The report returned by ``enroll_students``.
+    """
+    return enroll_students(conn, course_id, read_id_file(filename))
 
 class DatabaseApp(tk.Tk):
     """
@@ -14,10 +73,15 @@ class DatabaseApp(tk.Tk):
     ----------
     tabs : ttk.Notebook
         Tabbed interface for managing students, instructors, courses, and registration.
-    db_connection : sqlite3.Connection
-        The SQLite connection object.
-    cursor : sqlite3.Cursor
-        The SQLite cursor object.
+    db : ConnectionPool
+        Pool of WAL-mode SQLite connections to the school database.
+    executor : QueryExecutor
+        Worker threads that run slow queries, imports and exports off the Tk thread.
+    jobs : dict
+        Background jobs still running, mapped to the callbacks that receive their results.
+    names : NameCache
+        Student and course name -> ID lookups made by `register_course`; its
+        ``hits`` and ``misses`` show how well it is sized.
     """
     def __init__(self):
         """
@@ -27,8 +91,12 @@ class DatabaseApp(tk.Tk):
         super().__init__()
         self.title('School Management System')
         self.geometry('600x400')
-        self.db_connection = None
-        self.cursor = None
+        self.db = ConnectionPool()
+        self.executor = QueryExecutor(self.db)
+        self.names = NameCache()
+        self.jobs = {}
+        self.view_job = None
+        self.file_job = None
         self.initialize_database()
         self.tabs = ttk.Notebook(self)
         self.tabs.pack(expand=1, fill='both')
@@ -52,63 +120,14 @@ class DatabaseApp(tk.Tk):
         self.create_register_course_widgets()
         self.create_view_all_widgets()
 
-    def get_db_connection(self):
-        """
-        Gets or creates a database connection.
-
-        Returns
-        -------
-        sqlite3.Connection
-            The connection object to the SQLite database.
-        """
-        if not self.db_connection:
-            self.db_connection = sqlite3.connect('school.db')
-            self.cursor = self.db_connection.cursor()
-        return self.db_connection
-
     def initialize_database(self):
         """
-        Initializes the database with the necessary tables if they do not already exist.
-        Creates tables for students, instructors, courses, and registrations.
-        """
-        conn = self.get_db_connection()
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                age INTEGER NOT NULL,
-                email TEXT NOT NULL,
-                student_id TEXT NOT NULL
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS instructors (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                age INTEGER NOT NULL,
-                email TEXT NOT NULL,
-                instructor_id TEXT NOT NULL
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS courses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                course_name TEXT NOT NULL,
-                course_id TEXT NOT NULL,
-                instructor_id TEXT NOT NULL,
-                FOREIGN KEY(instructor_id) REFERENCES instructors(instructor_id)
-            )
-        """)
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS registrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                course_id TEXT NOT NULL,
-                FOREIGN KEY(student_id) REFERENCES students(student_id),
-                FOREIGN KEY(course_id) REFERENCES courses(course_id)
-            )
-        """)
-        conn.commit()
+        Initializes the database schema, creating or upgrading it as needed.
+        Applies the pending migrations from `db_migrations`, which create the
+        students, instructors, courses, and registrations tables and their indexes.
+        """
+        with self.db.connection() as conn:
+            migrate(conn)
 
     def create_add_student_widgets(self):
         """
@@ -178,7 +197,8 @@ class DatabaseApp(tk.Tk):
     def create_register_course_widgets(self):
         """
         Creates and packs the widgets for the 'Register for Course' tab, 
-        including dropdowns for selecting a student and a course.
+        including dropdowns for selecting a student and a course, and a box
+        of student IDs for enrolling many students in the course at once.
         """
         tk.Label(self.register_course_tab, text='Select Student:').pack()
         self.student_dropdown = ttk.Combobox(self.register_course_tab)
@@ -189,6 +209,14 @@ class DatabaseApp(tk.Tk):
         self.course_dropdown.pack()
 
         tk.Button(self.register_course_tab, text='Register', command=self.register_course).pack()
+
+        tk.Label(self.register_course_tab, text='Or enroll many students (IDs, one per line):').pack()
+        self.bulk_ids = tk.Text(self.register_course_tab, height=5, width=30)
+        self.bulk_ids.pack()
+        bulk_frame = ttk.Frame(self.register_course_tab)
+        bulk_frame.pack()
+        tk.Button(bulk_frame, text='Enroll List', command=self.enroll_list).pack(side='left')
+        tk.Button(bulk_frame, text='Enroll from File...', command=self.enroll_file).pack(side='left')
         self.refresh_dropdowns()
 
     def create_view_all_widgets(self):
@@ -196,11 +224,21 @@ class DatabaseApp(tk.Tk):
         Creates and packs the widgets for the 'View All' tab, 
         including a table to display all students, instructors, and courses.
         """
-        self.view_all_table = ttk.Treeview(self.view_all_tab, columns=('ID', 'Name', 'Type'), show='headings')
+        table_frame = ttk.Frame(self.view_all_tab)
+        table_frame.pack(expand=1, fill='both')
+        self.view_all_table = ttk.Treeview(table_frame, columns=('ID', 'Name', 'Type', 'Count'), show='headings')
         self.view_all_table.heading('ID', text='ID')
         self.view_all_table.heading('Name', text='Name')
         self.view_all_table.heading('Type', text='Type')
-        self.view_all_table.pack(expand=1, fill='both')
+        self.view_all_table.heading('Count', text='Count')
+        self.view_scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.view_all_table.yview)
+        self.view_all_table.configure(yscrollcommand=self.on_view_scroll)
+        self.view_scrollbar.pack(side='right', fill='y')
+        self.view_all_table.pack(side='left', expand=1, fill='both')
+        self.view_paging = False
+        self.view_loading = False
+        self.view_at_start = True
+        self.view_at_end = True
 
         # Bind double-click event to the edit function
         self.view_all_table.bind('<Double-1>', self.edit)
@@ -211,19 +249,28 @@ class DatabaseApp(tk.Tk):
         self.search_entry = tk.Entry(self.view_all_tab)
         self.search_entry.pack(pady=5)
         tk.Button(self.view_all_tab, text='Search', command=self.search).pack()
+        self.search_status = tk.Label(self.view_all_tab, text='')
+        self.search_status.pack()
         tk.Button(self.view_all_tab, text='Delete', command=self.delete).pack(pady=5)
+        self.progress = ttk.Progressbar(self.view_all_tab, mode='determinate', maximum=100)
+        self.progress.pack(fill='x', padx=5, pady=5)
+        tk.Button(self.view_all_tab, text='Cancel', command=self.cancel_jobs).pack()
 
     def refresh_dropdowns(self):
         """
         Refreshes the student and course dropdown lists in the 'Register for Course' tab.
+
+        The names are read on a background thread and filled in when they arrive.
         """
-        conn = self.get_db_connection()
-        self.cursor.execute('SELECT name FROM students')
-        students = [row[0] for row in self.cursor.fetchall()]
-        self.student_dropdown['values'] = students
+        self.run_job(dropdown_names, on_done=self.show_dropdown_names,
+                     on_error=lambda e: messagebox.showerror('Error loading names', e))
 
-        self.cursor.execute('SELECT course_name FROM courses')
-        courses = [row[0] for row in self.cursor.fetchall()]
+    def show_dropdown_names(self, names):
+        """
+        Fills the dropdowns with the ``(students, courses)`` names read by `refresh_dropdowns`.
+        """
+        students, courses = names
+        self.student_dropdown['values'] = students
         self.course_dropdown['values'] = courses
 
     def add_student(self):
@@ -242,12 +289,12 @@ class DatabaseApp(tk.Tk):
         email=self.student_email.get()
         student_id=self.student_id.get()
         try:
-            conn=self.get_db_connection()
-            self.cursor.execute("""
-                INSERT INTO students (name, age, email,student_id) 
-                VALUES (?, ?, ?, ?)
-            """, (name, age,email, student_id))
-            conn.commit()
+            with self.db.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO students (name, age, email,student_id) 
+                    VALUES (?, ?, ?, ?)
+                """, (name, age,email, student_id))
+            self.names.invalidate('student', name)
             self.refresh_dropdowns()
             custom_popup = Toplevel()
             custom_popup.title("Success")
@@ -279,12 +326,12 @@ class DatabaseApp(tk.Tk):
         email=self.instructor_email.get()
         instructor_id=self.instructor_id.get()
         try:
-            conn=self.get_db_connection()
-            self.cursor.execute("""
-                INSERT INTO instructors (name, age, email,instructor_id) 
-                VALUES (?, ?, ?, ?)
-            """, (name, age,email, instructor_id))
-            conn.commit()
+            with self.db.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO instructors (name, age, email,instructor_id) 
+                    VALUES (?, ?, ?, ?)
+                """, (name, age,email, instructor_id))
+            self.names.invalidate('instructor', name)
             self.refresh_dropdowns()
             custom_popup = Toplevel()
             custom_popup.title("Success")
@@ -315,12 +362,12 @@ class DatabaseApp(tk.Tk):
         course_name=self.course_name.get()
         instructor_id=self.instructor_id_course.get()
         try:
-            conn=self.get_db_connection()
-            self.cursor.execute("""
-                INSERT INTO courses (course_id,course_name, instructor_id) 
-                VALUES (?, ?, ?)
-            """, (course_id,course_name,instructor_id))
-            conn.commit()
+            with self.db.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO courses (course_id,course_name, instructor_id) 
+                    VALUES (?, ?, ?)
+                """, (course_id,course_name,instructor_id))
+            self.names.invalidate('course', course_name)
             self.refresh_dropdowns()
             custom_popup = Toplevel()
             custom_popup.title("Success")
@@ -340,8 +387,8 @@ class DatabaseApp(tk.Tk):
         """
         Registers a student for a course.
 
-        Retrieves the selected student and course, fetches the corresponding student ID
-        and course ID from the database, and inserts the registration into the `registrations`
+        Retrieves the selected student and course, resolves the corresponding student ID
+        and course ID through the `names` cache, and inserts the registration into the `registrations`
         table. Displays a success popup upon completion or an error message if the registration fails.
 
         Raises:
@@ -350,16 +397,17 @@ class DatabaseApp(tk.Tk):
         student_name=self.student_dropdown.get()
         course_name=self.course_dropdown.get()
         try:
-            conn=self.get_db_connection()
-            self.cursor.execute("SELECT student_id FROM students WHERE name=?" ,(student_name,))
-            student_id= self.cursor.fetchone()[0]
-            self.cursor.execute("SELECT course_id FROM courses WHERE course_name=?" ,(course_name,))
-            course_id= self.cursor.fetchone()[0]
-            self.cursor.execute("""
-                INSERT INTO registrations (student_id, course_id)
-                VALUES(?,?)
-            """, (student_id, course_id))
-            conn.commit()
+            with self.db.transaction() as conn:
+                student_id = self.names.resolve(conn, 'student', student_name)
+                if student_id is None:
+                    raise ValueError(f'No student named {student_name!r}')
+                course_id = self.names.resolve(conn, 'course', course_name)
+                if course_id is None:
+                    raise ValueError(f'No course named {course_name!r}')
+                conn.execute("""
+                    INSERT INTO registrations (student_id, course_id)
+                    VALUES(?,?)
+                """, (student_id, course_id))
             custom_popup = Toplevel()
             custom_popup.title("Success")
             
@@ -372,133 +420,471 @@ class DatabaseApp(tk.Tk):
             close_button.pack(pady=10)
         except Exception as e:
             messagebox.showinfo('Error registering course', e)
+
+    def selected_course_id(self):
+        """
+        Returns the ID of the course selected in the 'Register for Course' tab.
+
+        Shows an error message and returns None if no existing course is selected.
+        """
+        course_name = self.course_dropdown.get()
+        with self.db.connection() as conn:
+            course_id = self.names.resolve(conn, 'course', course_name)
+        if course_id is None:
+            messagebox.showerror('Error enrolling students', 'Please select a course.')
+        return course_id
+
+    def enroll_list(self):
+        """
+        Enrolls every student whose ID is typed in the bulk box in the selected course.
+
+        IDs may be separated by newlines, spaces or commas. They are enrolled in
+        one transaction on a background thread by ``enroll_students``; students
+        already in the course are skipped. A summary popup is shown when done.
+        """
+        student_ids = self.bulk_ids.get('1.0', tk.END).replace(',', ' ').split()
+        if not student_ids:
+            messagebox.showwarning('Input Error', 'Please enter the IDs of the students to enroll.')
+            return
+        course_id = self.selected_course_id()
+        if course_id is not None:
+            self.run_job(enroll_students, course_id, student_ids, on_done=self.show_enrollment_summary,
+                         on_error=lambda e: messagebox.showerror('Error enrolling students', e))
+
+    def enroll_file(self):
+        """
+        Enrolls the students listed in a text or CSV file of IDs in the selected course.
+
+        The file holds one ID per line, or a roster CSV whose first column is the ID,
+        and is read and enrolled in one transaction on a background thread.
+        """
+        course_id = self.selected_course_id()
+        if course_id is None:
+            return
+        filename = filedialog.askopenfilename(filetypes=[("ID Files", "*.txt *.csv"), ("All Files", "*")])
+        if filename:
+            self.run_job(enroll_id_file, course_id, filename, on_done=self.show_enrollment_summary,
+                         on_error=lambda e: messagebox.showerror('Error enrolling students', e))
+
+    def show_enrollment_summary(self, report):
+        """
+        Shows a summary popup once `enroll_list` or `enroll_file` has finished.
+
+        Args:
+            report (dict): The enrollment report returned by ``enroll_students``.
+        """
+        summary = (f"Enrolled {report['enrolled']} students. {report['already_enrolled']} were already enrolled "
+                   f"and {report['repeated']} IDs were repeated in the list.")
+        if report['unknown']:
+            summary += (f"\n{len(report['unknown'])} IDs match no student, such as "
+                        f"{', '.join(report['unknown'][:5])}.")
+
+        custom_popup = Toplevel()
+        custom_popup.title("Success")
+
+        # Create a label with the centered message
+        message = Label(custom_popup, text=summary, font=('Arial', 12), padx=50, pady=20)
+        message.pack()
+
+        # Add a button to close the popup
+        close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
+        close_button.pack(pady=10)
     
     def refresh_view_all(self):
         """
         Refreshes the displayed list of students, instructors, and courses.
 
-        Clears the current view, fetches all records from the `students`, `instructors`, and
-        `courses` tables, and inserts them into the table view. Displays a success popup upon completion
-        or an error message if the operation fails.
+        Clears the current view and shows the first page of records from the `students`,
+        `instructors`, and `courses` tables. Further pages are fetched as the user scrolls
+        (see `on_view_scroll`), so a refresh costs the same however large the tables are.
+        The first page is read on a background thread, cancelling any search or refresh
+        still running. Displays a success popup upon completion or an error message if
+        the operation fails.
+        """
+        self.start_view_job('Loading...', fetch_page, on_done=self.show_first_page,
+                            on_error=lambda e: self.view_job_failed('Error refreshing data', e))
+
+    def show_first_page(self, rows):
+        """
+        Shows the first page of the 'View All' list once `refresh_view_all` has read it.
 
-        Raises:
-            Exception: If there's an error while refreshing the data from the database.
+        Args:
+            rows (list): ``(key, values)`` pairs, as returned by ``fetch_page``.
+        """
+        self.search_status.config(text='')
+        self.view_paging = True
+        self.view_at_start = True
+        self.view_at_end = False
+        self.show_view_page(rows, 1)
+        custom_popup = Toplevel()
+        custom_popup.title("Success")
+        
+        # Create a label with the centered message
+        message = Label(custom_popup, text="Success! Data refreshed successfully", font=('Arial', 12), padx=50, pady=20)
+        message.pack()
+
+        # Add a button to close the popup
+        close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
+        close_button.pack(pady=10)
+
+    def start_view_job(self, status, work, *args, on_done, on_error):
         """
+        Clears the 'View All' list and fills it from a background job.
+
+        A search or refresh still running is cancelled first, so results of a
+        stale query never reach the table.
+
+        Args:
+            status (str): Text shown below the search field while the job runs.
+            work (callable): The job, called as ``work(conn, *args)``.
+            on_done (callable): Called on the Tk thread with the job's result.
+            on_error (callable): Called on the Tk thread with the exception if the job fails.
+        """
+        if self.view_job is not None:
+            self.view_job.cancel()
+        self.view_paging = False
         self.view_all_table.delete(*self.view_all_table.get_children())
-        try:
-            conn= self.get_db_connection()
-            self.cursor.execute('SELECT student_id, name FROM students')
-            students= self.cursor.fetchall()
-            self.cursor.execute('SELECT instructor_id, name FROM instructors')
-            instructors= self.cursor.fetchall()
-            self.cursor.execute("SELECT course_id, course_name FROM courses")
-            courses= self.cursor.fetchall()
-
-            for record in students:
-                self.view_all_table.insert("","end", values=(*record,"Student"))
-
-            for record in instructors:
-                self.view_all_table.insert("","end", values=(*record,"Instructor"))
-            
-            for record in courses:
-                self.view_all_table.insert("","end", values=(*record,"Course"))
-            custom_popup = Toplevel()
-            custom_popup.title("Success")
-            
-            # Create a label with the centered message
-            message = Label(custom_popup, text="Success! Data refreshed successfully", font=('Arial', 12), padx=50, pady=20)
-            message.pack()
+        self.search_status.config(text=status)
+        self.view_job = self.run_job(work, *args, on_done=on_done, on_error=on_error)
 
-            # Add a button to close the popup
-            close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
-            close_button.pack(pady=10)
+    def view_job_failed(self, title, error):
+        """
+        Reports a failed refresh or search.
+        """
+        self.search_status.config(text='')
+        messagebox.showerror(title, error)
+
+    @staticmethod
+    def view_iid(key):
+        """
+        Returns the Treeview item ID for a row of the 'View All' list.
+
+        Parameters
+        ----------
+        key : tuple
+            The row's ``(table_index, id)`` key, as returned by ``fetch_page``.
+        """
+        return f'{key[0]}:{key[1]}'
+
+    @staticmethod
+    def view_key(iid):
+        """
+        Returns the ``(table_index, id)`` key of a 'View All' Treeview item.
+        """
+        table_index, rowid = iid.split(':')
+        return int(table_index), int(rowid)
+
+    def load_view_page(self, direction):
+        """
+        Fetches one page of the 'View All' list past either end of the rows on screen.
+
+        A page is a single keyset query on the primary key, cheap at any
+        depth, so it is read on the Tk thread and the scroll position can be
+        restored straight away.
+
+        Parameters
+        ----------
+        direction : int
+            1 to append the page below the current rows, -1 to insert it above them.
+
+        Returns
+        -------
+        int
+            The change in position of the rows that were already shown, as returned by `show_view_page`.
+        """
+        children = self.view_all_table.get_children()
+        with self.db.connection() as conn:
+            if direction > 0:
+                rows = fetch_page(conn, self.view_key(children[-1]) if children else None)
+            else:
+                rows = fetch_page_before(conn, self.view_key(children[0]))
+        return self.show_view_page(rows, direction)
+
+    def show_view_page(self, rows, direction):
+        """
+        Adds a page of rows to either end of the 'View All' list.
+
+        Rows beyond ``VIEW_WINDOW`` are dropped from the opposite end, so the
+        Treeview only ever holds the visible rows plus a buffer.
+
+        Parameters
+        ----------
+        rows : list
+            ``(key, values)`` pairs, as returned by ``fetch_page``.
+        direction : int
+            1 to append the page below the current rows, -1 to insert it above them.
+
+        Returns
+        -------
+        int
+            The change in position of the rows that were already shown: the
+            number of rows inserted above them minus the number dropped above them.
+        """
+        children = self.view_all_table.get_children()
+        if direction > 0:
+            self.view_at_end = len(rows) < PAGE_SIZE
+            for key, (record_id, name, kind, count) in rows:
+                self.view_all_table.insert("", "end", iid=self.view_iid(key),
+                                           values=(record_id, name, kind, count_text(kind, count)))
+        else:
+            self.view_at_start = len(rows) < PAGE_SIZE
+            for index, (key, (record_id, name, kind, count)) in enumerate(rows):
+                self.view_all_table.insert("", index, iid=self.view_iid(key),
+                                           values=(record_id, name, kind, count_text(kind, count)))
+
+        excess = len(children) + len(rows) - VIEW_WINDOW
+        if excess <= 0:
+            return len(rows) if direction < 0 else 0
+        if direction > 0:
+            self.view_all_table.delete(*children[:excess])
+            self.view_at_start = False
+            return -excess
+        self.view_all_table.delete(*children[len(children) - excess:])
+        self.view_at_end = False
+        return len(rows)
+
+    def on_view_scroll(self, first, last):
+        """
+        Updates the scrollbar and schedules a page fetch when the view nears either end.
+
+        Used as the Treeview's ``yscrollcommand``. Paging is off while search
+        results are shown.
+
+        Parameters
+        ----------
+        first, last : str
+            The visible fraction of the rows, as passed by Tk.
+        """
+        self.view_scrollbar.set(first, last)
+        if not self.view_paging or self.view_loading:
+            return
+        if float(last) >= 1 - VIEW_PREFETCH and not self.view_at_end:
+            direction = 1
+        elif float(first) <= VIEW_PREFETCH and not self.view_at_start:
+            direction = -1
+        else:
+            return
+        self.view_loading = True
+        self.after_idle(self.scroll_view_page, direction)
+
+    def scroll_view_page(self, direction):
+        """
+        Loads a page in ``direction`` and keeps the same rows on screen.
+        """
+        try:
+            top = float(self.view_all_table.yview()[0]) * len(self.view_all_table.get_children())
+            shift = self.load_view_page(direction)
+            total = len(self.view_all_table.get_children())
+            if total:
+                self.view_all_table.yview_moveto(max(round(top) + shift, 0) / total)
         except Exception as e:
-            messagebox.showerror('Error refreshing data', e)
+            self.view_paging = False
+            messagebox.showerror('Error loading records', e)
+        finally:
+            self.view_loading = False
     
     def export_to_csv(self):
         """
-        Exports the currently displayed data to a CSV file.
+        Exports the whole database to a CSV file.
+
+        Opens a file dialog to choose the location to save the CSV file, then streams every
+        student, instructor, course, and registration straight from the database to the file,
+        independent of what the table view currently shows. Files named `*.csv.gz` are
+        gzip-compressed. The export runs on a background thread while the progress bar tracks
+        it, and the Cancel button stops it and deletes the partial file. Displays a success
+        popup, or an error message if the export fails.
+        """
+        filename= filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[("CSV Files","*.csv"), ("Compressed CSV Files","*.csv.gz")])
+        if filename:
+            self.start_file_job(export_csv, filename, on_done=self.show_export_summary,
+                                on_error=lambda e: messagebox.showerror("Error exporting data", e),
+                                on_cancel=lambda: self.remove_partial_export(filename))
 
-        Opens a file dialog to choose the location to save the CSV file, writes the contents
-        of the table to the file, and displays a success popup. If the export fails, an error
-        message is displayed.
+    def show_export_summary(self, rows):
+        """
+        Shows a success popup once `export_to_csv` has written ``rows`` records.
+        """
+        custom_popup = Toplevel()
+        custom_popup.title("Success")
+        
+        # Create a label with the centered message
+        message = Label(custom_popup, text=f"Success! Exported {rows} records", font=('Arial', 12), padx=50, pady=20)
+        message.pack()
 
-        Raises:
-            Exception: If there's an error while exporting the data to the CSV file.
+        # Add a button to close the popup
+        close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
+        close_button.pack(pady=10)
+
+    def remove_partial_export(self, filename):
+        """
+        Deletes the file left behind by a cancelled export.
         """
         try:
-            filename= filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[("CSV Files","*.csv")])
-            if filename:
-                with open(filename,'w', newline='') as file:
-                    writer=csv.writer(file)
-                    writer.writerow(["ID","Name","Type"])
-                    for row in self.view_all_table.get_children():
-                        row_data= self.view_all_table.item(row,'values')
-                        writer.writerow(row_data)
-                custom_popup = Toplevel()
-            custom_popup.title("Success")
-            
-            # Create a label with the centered message
-            message = Label(custom_popup, text="Success! Course added successfully", font=('Arial', 12), padx=50, pady=20)
-            message.pack()
-
-            # Add a button to close the popup
-            close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
-            close_button.pack(pady=10)
-        except Exception as e:
-            messagebox.showerror("Error exporting data", e)
+            os.remove(filename)
+        except OSError:
+            pass
+        messagebox.showinfo("Export cancelled", "The export was cancelled.")
 
     def load(self):
         """
-        Loads data from a CSV file into the application.
+        Imports a roster CSV file into the database.
+
+        Opens a file dialog to select a CSV file with `Type`, `ID`, `Name`, `Age`, `Email`,
+        `Instructor ID` and `Course ID` columns, as written by `export_to_csv`. The file is streamed and validated in
+        batches and written to the students, instructors, and courses tables in one
+        transaction per batch, on a background thread, while the progress bar tracks how much
+        of the file has been read. The Cancel button stops the import after the current batch;
+        batches already written are kept. Displays a summary popup upon completion or an error
+        message if the import fails.
+        """
+        # Open a file dialog to select the CSV file
+        filename = filedialog.askopenfilename(defaultextension='.csv', filetypes=[("CSV Files", "*.csv")])
+        if filename:
+            self.start_file_job(import_csv, filename, on_done=self.show_import_summary,
+                                on_error=lambda e: messagebox.showerror("Error loading data", e),
+                                on_cancel=self.import_cancelled)
+
+    def show_import_summary(self, report):
+        """
+        Refreshes the dropdowns and shows a summary popup once `load` has finished.
+
+        Args:
+            report (dict): The import report returned by ``import_csv``.
+        """
+        self.names.invalidate()
+        self.refresh_dropdowns()
 
-        Opens a file dialog to select a CSV file, reads the file, and populates the table view
-        with the data from the file. Displays a success popup upon completion or an error message
-        if the operation fails.
+        summary = (f"Imported {report['students']} students, {report['instructors']} instructors, "
+                   f"{report['courses']} courses and {report['registrations']} registrations.\n"
+                   f"Skipped {report['duplicates']} existing IDs and {report['rejected']} invalid rows.")
+        if report['errors']:
+            line, errors = report['errors'][0]
+            summary += f"\nFirst invalid row (line {line}): {'; '.join(errors)}"
 
-        Raises:
-            Exception: If there's an error while loading data from the CSV file.
+        # Show summary popup
+        custom_popup = Toplevel()
+        custom_popup.title("Success")
+        
+        # Create a label with the centered message
+        message = Label(custom_popup, text=summary, font=('Arial', 12), padx=50, pady=20)
+        message.pack()
+        
+        # Add a button to close the popup
+        close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
+        close_button.pack(pady=10)
+
+    def import_cancelled(self):
         """
-        try:
-            # Open a file dialog to select the CSV file
-            filename = filedialog.askopenfilename(defaultextension='.csv', filetypes=[("CSV Files", "*.csv")])
-            if filename:
-                # Clear existing data in the table
-                for item in self.view_all_table.get_children():
-                    self.view_all_table.delete(item)
-                
-                with open(filename, 'r') as file:
-                    reader = csv.reader(file)
-                    header = next(reader)  # Skip the header row
-                    
-                    for row in reader:
-                        if len(row) == 3:  # Ensure that each row has 3 columns
-                            self.view_all_table.insert("", "end", values=row)
-                
-                # Show success popup
-                custom_popup = Toplevel()
-                custom_popup.title("Success")
-                
-                # Create a label with the centered message
-                message = Label(custom_popup, text="Data loaded successfully", font=('Arial', 12), padx=50, pady=20)
-                message.pack()
-                
-                # Add a button to close the popup
-                close_button = Button(custom_popup, text="OK", command=custom_popup.destroy)
-                close_button.pack(pady=10)
-        except Exception as e:
-            messagebox.showerror("Error loading data", e)
-    
-    def search(self):
+        Tells the user how much of a cancelled import was kept.
+        """
+        self.names.invalidate()
+        self.refresh_dropdowns()
+        rows_read = self.file_job.progress[0] if self.file_job.progress else 0
+        messagebox.showinfo("Import cancelled",
+                            f"The import was cancelled after reading {rows_read} rows. Rows already imported were kept.")
+
+    def start_file_job(self, work, filename, on_done, on_error, on_cancel):
         """
-        Searches for students, instructors, or courses by name or course name.
+        Runs an import or export on a background thread, tracked by the progress bar.
 
-        Retrieves the search term from the input field, searches in the `students`, `instructors`,
-        and `courses` tables for matches, and displays the results in the table view. If the search
-        fails, an error message is displayed.
+        Only one import or export runs at a time.
 
-        Raises:
-            Exception: If there's an error while searching the database.
+        Args:
+            work (callable): ``import_csv`` or ``export_csv``.
+            filename (str): The file to read or write.
+            on_done (callable): Called on the Tk thread with the job's result.
+            on_error (callable): Called on the Tk thread with the exception if the job fails.
+            on_cancel (callable): Called on the Tk thread if the job is cancelled.
+        """
+        if self.file_job is not None and not self.file_job.done():
+            messagebox.showwarning("Busy", "Another import or export is still running.")
+            return
+        self.progress['value'] = 0
+        self.file_job = self.run_job(work, filename, on_done=on_done, on_error=on_error,
+                                     on_cancel=on_cancel, with_progress=True)
+
+    def update_progress(self, rows_read, fraction):
+        """
+        Shows the progress of a long-running operation in the progress bar.
+
+        Args:
+            rows_read (int): Number of rows processed so far.
+            fraction (float): Share of the work done, between 0 and 1.
+        """
+        self.progress['value'] = 100 * fraction
+
+    def run_job(self, work, *args, on_done, on_error, on_cancel=None, with_progress=False):
+        """
+        Runs ``work(conn, *args)`` on the executor and delivers its outcome to the Tk thread.
+
+        Worker threads never touch widgets: `poll_jobs` checks the job with
+        ``after()`` every ``JOB_POLL_MS`` milliseconds and calls exactly one of
+        the callbacks once it finishes. A cancelled job's result is discarded.
+
+        Args:
+            work (callable): The function to run, given a pooled connection first.
+            on_done (callable): Called with the job's result.
+            on_error (callable): Called with the exception if the job fails.
+            on_cancel (callable): Called if the job is cancelled; optional.
+            with_progress (bool): Pass the job a ``progress`` callback, shown in the progress bar.
+
+        Returns:
+            QueryJob: The submitted job, which can be cancelled.
+        """
+        job = self.executor.submit(work, *args, with_progress=with_progress)
+        if not self.jobs:
+            self.after(JOB_POLL_MS, self.poll_jobs)
+        self.jobs[job] = (on_done, on_error, on_cancel, with_progress)
+        return job
+
+    def poll_jobs(self):
+        """
+        Delivers the results of finished background jobs and updates the progress bar.
+
+        Reschedules itself with ``after()`` while any job is still running.
+        """
+        for job, (on_done, on_error, on_cancel, with_progress) in list(self.jobs.items()):
+            if with_progress and job.progress is not None:
+                self.update_progress(*job.progress)
+            if not job.done():
+                continue
+            del self.jobs[job]
+            if job.cancelled:
+                if on_cancel is not None:
+                    on_cancel()
+                continue
+            try:
+                result = job.result()
+            except Exception as e:
+                on_error(e)
+            else:
+                if with_progress:
+                    self.update_progress(0, 1.0)
+                on_done(result)
+        if self.jobs:
+            self.after(JOB_POLL_MS, self.poll_jobs)
+
+    def cancel_jobs(self):
+        """
+        Cancels the running import or export and any search or refresh still in progress.
+        """
+        for job in (self.file_job, self.view_job):
+            if job is not None and not job.done():
+                job.cancel()
+        if self.view_job is not None and self.view_job.cancelled:
+            self.search_status.config(text='Cancelled.')
+    
+    def search(self):
+        """
+        Searches for students, instructors, or courses by name, email, or ID.
+
+        Retrieves the search term from the input field and looks it up in the database's
+        full-text index, where every word of the term must match the start of a word in the
+        record. The query runs on a background thread, and starting another search or a
+        refresh cancels it. The best matches are displayed in the table view,
+        most relevant first. If nothing matches, the names closest to the term (allowing for
+        typos) are displayed instead, best first, with their similarity scores shown below
+        the search button. If the search fails, an error message is displayed.
         """
         search_term = self.search_entry.get().strip()
         
@@ -506,33 +892,32 @@ class DatabaseApp(tk.Tk):
             messagebox.showwarning("Input Error", "Please enter a search term.")
             return
         
-        # Clear existing data in the table
-        for item in self.view_all_table.get_children():
-            self.view_all_table.delete(item)
+        self.start_view_job('Searching...', find_records, search_term, on_done=self.show_search_results,
+                            on_error=lambda e: self.view_job_failed("Error", f"An error occurred: {e}"))
 
-        conn = self.get_db_connection()
-        
-        try:
-            # Search in students table
-            self.cursor.execute("SELECT student_id, name, 'Student' FROM students WHERE name LIKE ?", (f"%{search_term}%",))
-            students = self.cursor.fetchall()
-            
-            # Search in instructors table
-            self.cursor.execute("SELECT instructor_id, name, 'Instructor' FROM instructors WHERE name LIKE ?", (f"%{search_term}%",))
-            instructors = self.cursor.fetchall()
-            
-            # Search in courses table
-            self.cursor.execute("SELECT course_id, course_name, 'Course' FROM courses WHERE course_name LIKE ?", (f"%{search_term}%",))
-            courses = self.cursor.fetchall()
-            
-            # Insert results into the table
-            for record in students + instructors + courses:
-                self.view_all_table.insert("", "end", values=record)
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {e}")
-        finally:
-            conn.close()
+    def show_search_results(self, found):
+        """
+        Shows the results of `search` in the table view.
+
+        Args:
+            found (tuple): ``(results, closest, counts)``, as returned by `find_records`.
+        """
+        results, closest, counts = found
+        self.search_status.config(text='')
+
+        # Insert results into the table
+        for record_id, name, kind in results:
+            count = count_text(kind, counts.get((record_id, kind)))
+            self.view_all_table.insert("", "end", values=(record_id, name, kind, count))
+
+        for score, record_id, name, kind in closest:
+            count = count_text(kind, counts.get((record_id, kind)))
+            self.view_all_table.insert("", "end", values=(record_id, name, kind, count))
+        if closest:
+            scores = ', '.join(f'{score:.2f}' for score, _id, _name, _kind in closest)
+            self.search_status.config(text=f'No exact matches. Closest names (scores {scores})')
+        elif not results:
+            self.search_status.config(text='No matches.')
 
     def edit(self,event):
         """
@@ -555,6 +940,9 @@ class DatabaseApp(tk.Tk):
         column = self.view_all_table.identify_column(event.x)
         column_id = column.split('#')[1]
         column_index = int(column_id) - 1
+        if self.view_all_table.heading(column_id, 'text') == 'Count':
+            # Counts are kept by the database, not edited
+            return
         
         # Get the current value of the cell
         current_value = self.view_all_table.item(item[0], 'values')[column_index]
@@ -582,7 +970,7 @@ class DatabaseApp(tk.Tk):
             Exception: If there's an error while updating the record.
         """
         values = self.view_all_table.item(item_id, 'values')
-        id_value, name_value, type_value = values
+        id_value, name_value, type_value = values[:3]
         
         # Determine which table to update
         if type_value == "Student":
@@ -602,10 +990,10 @@ class DatabaseApp(tk.Tk):
             return
         
         # Update the database
-        conn = self.get_db_connection()
         try:
-            self.cursor.execute(f"UPDATE {table} SET {name_field} = ? WHERE {id_field} = ?", (new_value, id_value))
-            conn.commit()
+            with self.db.transaction() as conn:
+                conn.execute(f"UPDATE {table} SET {name_field} = ? WHERE {id_field} = ?", (new_value, id_value))
+            self.names.invalidate(type_value.lower(), name_value, new_value)
             
             # Update the Treeview
             updated_values = list(values)
@@ -614,8 +1002,6 @@ class DatabaseApp(tk.Tk):
             
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
-        finally:
-            conn.close()
     
     def delete(self):
         """
@@ -636,7 +1022,7 @@ class DatabaseApp(tk.Tk):
         
         item_id = selected_item[0]
         item_values = self.view_all_table.item(item_id, 'values')
-        id_value, name_value, type_value = item_values
+        id_value, name_value, type_value = item_values[:3]
         
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete the {type_value} '{name_value}'?")
@@ -658,18 +1044,16 @@ class DatabaseApp(tk.Tk):
             return
         
         # Delete from the database
-        conn = self.get_db_connection()
         try:
-            self.cursor.execute(f"DELETE FROM {table} WHERE {id_field} = ?", (id_value,))
-            conn.commit()
+            with self.db.transaction() as conn:
+                conn.execute(f"DELETE FROM {table} WHERE {id_field} = ?", (id_value,))
+            self.names.invalidate(type_value.lower(), name_value)
             
             # Remove from the Treeview
             self.view_all_table.delete(item_id)
         
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
-        finally:
-            conn.close()
 
     def clear_instructor_inputs(self):
         """
@@ -700,6 +1084,8 @@ class DatabaseApp(tk.Tk):
 if __name__=="__main__":
     app=DatabaseApp()
     app.mainloop()
+    app.executor.shutdown()
+    app.db.close()
 
 
 
@@ -1,766 +1,862 @@
-import sys
-import csv
-import re
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import Qt
-from OOP import *
-
-class MainWindow(QMainWindow):
-    """
-    Main window for the School Management System.
-
-    This class provides the main interface for managing students, instructors,
-    courses, and school records. It includes functionality for adding, displaying,
-    editing, and saving data.
-
-    Attributes:
-        available_courses (list): A list of available courses.
-        instructors (list): A list of instructor objects.
-        students (list): A list of student objects.
-    """
-
-    def __init__(self):
-
-        """
-        Initializes the main window and sets up the user interface (UI).
-        """
-        super().__init__()
-        self.available_courses = []  
-        self.instructors = []  
-        self.students = []  
-        self.initUI()
-
-    def initUI(self):
-
-        """
-        Sets up the user interface of the application.
-
-        This method creates the main layout of the window, including tabs for
-        student, instructor, and course management. It also adds buttons for
-        saving, loading, and exporting data.
-
-        Tabs:
-            - Student: Form to add student data.
-            - Instructor: Form to add instructor data.
-            - Course: Form to add course data.
-            - Records: Displays school records.
-
-        Buttons:
-            - Save Data: Saves current data to a file.
-            - Load Data: Loads data from a file.
-            - Export to CSV: Exports current data to a CSV file.
-        """
-
-        self.setWindowTitle('School Management System')
-        self.setGeometry(100, 100, 800, 600)
-        self.setStyleSheet("background-color: lightblue;")
-        self.available_courses = [
-            {'course_id': 'CS101', 'course_name': 'Introduction to Computer Science'},
-            {'course_id': 'MATH101', 'course_name': 'Calculus I'},
-            {'course_id': 'PHYS101', 'course_name': 'Physics I'}
-        ]
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        layout = QVBoxLayout()
-        central_widget.setLayout(layout)
-
-        tabs = QTabWidget()
-        layout.addWidget(tabs)
-
-        tabs.addTab(self.createStudentForm(), 'Student')
-        tabs.addTab(self.createInstructorForm(), 'Instructor')
-        tabs.addTab(self.createCourseForm(), 'Course')
-        tabs.addTab(self.createRecordDisplay(), 'Records')
-
-        self.updateCourseDropdown()
-
-        self.save_button = QPushButton("Save Data")
-        self.load_button = QPushButton("Load Data")
-        self.save_button.setStyleSheet("background-color: blue; color: white;")
-        self.load_button.setStyleSheet("background-color: blue; color: white;")
-
-
-        
-        layout.addWidget(self.save_button)
-        layout.addWidget(self.load_button)
-
-        self.save_button.clicked.connect(self.saveData)
-        self.load_button.clicked.connect(self.loadData)
-
-        export_button = QPushButton("Export to CSV")
-        export_button.clicked.connect(self.export_to_csv)
-        export_button_layout = QHBoxLayout()
-        export_button_layout.addWidget(export_button)
-        layout.addLayout(export_button_layout)
-
-    def createStudentForm(self):
-
-        """
-        Creates the form for adding student details.
-
-        This method sets up the input fields for adding a new student, including
-        fields for name, age, email, and student ID. A dropdown allows for selecting
-        a course the student will be registered for.
-
-        Returns:
-            QWidget: The widget containing the student form layout.
-        """
-
-        form_widget = QWidget()
-        layout = QFormLayout()
-        
-        self.student_name = QLineEdit()
-        self.student_age = QLineEdit()
-        self.student_email = QLineEdit()
-        self.student_id = QLineEdit()
-        
-        layout.addRow(QLabel('Name:'), self.student_name)
-        layout.addRow(QLabel('Age:'), self.student_age)
-        layout.addRow(QLabel('Email:'), self.student_email)
-        layout.addRow(QLabel('ID:'), self.student_id)
-        
-        self.course_dropdown = QComboBox()
-        self.updateCourseDropdown()
-        layout.addRow(QLabel('Register for Course:'), self.course_dropdown)
-        
-        submit_button = QPushButton('Add Student')
-        submit_button.clicked.connect(self.addStudent)
-        layout.addWidget(submit_button)
-        
-        form_widget.setLayout(layout)
-        return form_widget
-
-    def createInstructorForm(self):
-
-        """
-        Creates the form for adding instructor details.
-
-        This method sets up the input fields for adding a new instructor, including
-        fields for name, age, email, and instructor ID. A dropdown allows for assigning
-        the instructor to a course.
-
-        Returns:
-            QWidget: The widget containing the instructor form layout.
-        """
-
-        form_widget = QWidget()
-        layout = QFormLayout()
-
-        self.instructor_name = QLineEdit()
-        self.instructor_age = QLineEdit()
-        self.instructor_email = QLineEdit()
-        self.instructor_id = QLineEdit()
-        
-        layout.addRow(QLabel('Name:'), self.instructor_name)
-        layout.addRow(QLabel('Age:'), self.instructor_age)
-        layout.addRow(QLabel('Email:'), self.instructor_email)
-        layout.addRow(QLabel('ID:'), self.instructor_id)
-        
-        self.instructor_course_dropdown = QComboBox()
-        self.updateCourseDropdown()  # Populate dropdown with courses
-        layout.addRow(QLabel('Assign Course:'), self.instructor_course_dropdown)
-
-        submit_button = QPushButton('Add Instructor')
-        submit_button.clicked.connect(self.addInstructor)
-        layout.addWidget(submit_button)
-        
-        form_widget.setLayout(layout)
-        return form_widget
-
-    def createCourseForm(self):
-
-        """
-        Creates the form for adding course details.
-
-        This method sets up the input fields for adding a new course, including
-        fields for course ID, course name, instructor, and enrolled students.
-
-        Returns:
-            QWidget: The widget containing the course form layout.
-        """
-
-        form_widget = QWidget()
-        layout = QFormLayout()
-        
-        self.course_id = QLineEdit()
-        self.course_name = QLineEdit()
-        self.course_instructor = QLineEdit()  
-        self.course_enrolled_students = QLineEdit()  
-        
-        layout.addRow(QLabel('Course ID:'), self.course_id)
-        layout.addRow(QLabel('Course Name:'), self.course_name)
-        layout.addRow(QLabel('Instructor ID:'), self.course_instructor)
-        layout.addRow(QLabel('Enrolled Students IDs:'), self.course_enrolled_students)
-        
-        submit_button = QPushButton('Add Course')
-        submit_button.clicked.connect(self.addCourse)
-        layout.addWidget(submit_button)
-        
-        form_widget.setLayout(layout)
-        return form_widget
-
-    def createRecordDisplay(self):
-
-        """
-        Creates and returns the layout for displaying and managing records.
-
-        This method sets up the layout containing the search field, buttons to edit
-        and delete records, and the table widget that displays the records.
-
-        Returns:
-            QWidget: The widget containing the record management interface.
-        """
-
-        form_widget = QWidget()
-        layout = QVBoxLayout()
-        
-        search_layout = QHBoxLayout()
-        self.search_field = QLineEdit()
-        self.search_field.setPlaceholderText('Search by name, ID, or course')
-        search_button = QPushButton('Search')
-        search_button.clicked.connect(self.searchRecords)
-        search_layout.addWidget(self.search_field)
-        search_layout.addWidget(search_button)
-        
-        layout.addLayout(search_layout)
-
-        button_layout = QHBoxLayout()
-        self.edit_button = QPushButton('Edit Record')
-        self.delete_button = QPushButton('Delete Record')
-        self.edit_button.clicked.connect(self.editRecord)
-        self.delete_button.clicked.connect(self.deleteRecord)
-        button_layout.addWidget(self.edit_button)
-        button_layout.addWidget(self.delete_button)
-        
-        layout.addLayout(button_layout)
-
-        self.table_widget = QTableWidget()
-        self.table_widget.setColumnCount(6)  
-        self.table_widget.setHorizontalHeaderLabels(['Type', 'ID', 'Name', 'Age', 'Email', 'Assigned Courses'])
-        layout.addWidget(self.table_widget)
-        
-        form_widget.setLayout(layout)
-        self.updateRecordDisplay()  
-        
-        return form_widget
-
-    def updateCourseDropdown(self):
-
-        """
-        Updates the dropdown menus for course selection in the student and instructor forms.
-
-        This method clears the existing dropdown items and populates them with the current
-        list of available courses. If the dropdowns already exist, it updates them.
-        """
-
-        if hasattr(self, 'course_dropdown'):
-            self.course_dropdown.clear()
-        
-        if hasattr(self, 'instructor_course_dropdown'):
-            self.instructor_course_dropdown.clear()
-        
-        for course in self.available_courses:
-            if hasattr(self, 'course_dropdown'):
-                self.course_dropdown.addItem(f"{course['course_id']} - {course['course_name']}", course['course_id'])
-            if hasattr(self, 'instructor_course_dropdown'):
-                self.instructor_course_dropdown.addItem(f"{course['course_id']} - {course['course_name']}", course['course_id'])
-
-
-    def addStudent(self):
-
-        """
-        Adds a new student to the list based on the input from the form.
-
-        This method retrieves the student's details from the input form (name, age, email, 
-        student ID, and selected course) and adds the student to the `students` list. It 
-        also displays a success message upon completion.
-
-        Raises:
-            ValueError: If any required field is missing or invalid.
-        """
-
-        selected_course_id = self.course_dropdown.currentData()
-        student_name = self.student_name.text()
-        student_age = self.student_age.text()
-        student_email = self.student_email.text()
-        student_id = self.student_id.text()
-        
-        student = Student(name=student_name, age=int(student_age), email=student_email, student_id=student_id)
-        self.students.append(student)
-        QMessageBox.information(self, 'Success', f'Student added successfully! Registered for course ID: {selected_course_id}')
-        self.updateRecordDisplay()
-        
-    def addInstructor(self):
-
-        """
-        Adds a new instructor to the list based on the input from the form.
-
-        This method retrieves the instructor's details from the input form (name, age, 
-        email, instructor ID, and assigned course) and adds the instructor to the 
-        `instructors` list. It also assigns the instructor to a course.
-
-        Raises:
-            ValueError: If any required field is missing or invalid.
-        """
-
-        selected_course_id = self.instructor_course_dropdown.currentData()
-        
-        instructor_name = self.instructor_name.text()
-        instructor_age = self.instructor_age.text()
-        instructor_email = self.instructor_email.text()
-        instructor_id = self.instructor_id.text()
-        
-        instructor = Instructor(name=instructor_name, age=int(instructor_age), email=instructor_email, instructor_id=instructor_id)
-        self.instructors.append(instructor)
-        
-        for course in self.available_courses:
-            if course['course_id'] == selected_course_id:
-                for inst in self.instructors:
-                    if inst.instructor_id == instructor_id:
-                        inst.assign_course(course)
-                        break
-                break
-        
-        QMessageBox.information(self, 'Success', f'Instructor added successfully! Assigned to course ID: {selected_course_id}')
-        self.updateRecordDisplay()
-
-    def addCourse(self):
-
-        """
-        Adds a new course to the available courses list based on the input from the form.
-
-        This method retrieves the course details (course ID, course name, instructor, and 
-        enrolled students) from the input form, creates the course, and assigns the students 
-        to it.
-
-        Raises:
-            ValueError: If any required field is missing or invalid.
-        """
-
-        course_id = self.course_id.text()
-        course_name = self.course_name.text()
-        instructor_id = self.course_instructor.text()
-        enrolled_students_ids = self.course_enrolled_students.text().split(',')
-
-        instructor = None
-        for inst in self.instructors:
-            if inst.instructor_id == instructor_id:
-                instructor = inst
-                break
-
-        if not instructor:
-            QMessageBox.warning(self, 'Error', 'Instructor not found!')
-            return
-
-        enrolled_students = []
-        for student_id in enrolled_students_ids:
-            student = next((s for s in self.students if s.student_id == student_id.strip()), None)
-            if student:
-                enrolled_students.append(student)
-                student.register_course(course_id)  
-
-        course = Course(course_id=course_id, course_name=course_name, instructor=instructor, enrolled_students=enrolled_students)
-        self.available_courses.append({
-            'course_id': course_id,
-            'course_name': course_name,
-            'instructor_id': instructor_id,
-            'enrolled_students_ids': enrolled_students_ids
-        })
-
-        QMessageBox.information(self, 'Success', 'Course added successfully!')
-        self.updateRecordDisplay()
-
-    def searchRecords(self):
-
-        """
-        Searches through the student, instructor, and course records based on the search term.
-
-        This method filters the records to display only those that match the search term 
-        (either by name, ID, or course). The matching records are displayed in the table widget.
-        """
-
-        search_term = self.search_field.text().lower()
-        self.table_widget.clear()
-        self.table_widget.setRowCount(0)
-        self.table_widget.setColumnCount(6)
-        self.table_widget.setHorizontalHeaderLabels(['Type', 'ID', 'Name', 'Age', 'Email', 'Assigned Courses'])
-
-        for student in self.students:
-            if (search_term in student.name.lower() or
-                search_term in student.student_id.lower()):
-                row_position = self.table_widget.rowCount()
-                self.table_widget.insertRow(row_position)
-                self.table_widget.setItem(row_position, 0, QTableWidgetItem('Student'))
-                self.table_widget.setItem(row_position, 1, QTableWidgetItem(student.student_id))
-                self.table_widget.setItem(row_position, 2, QTableWidgetItem(student.name))
-                self.table_widget.setItem(row_position, 3, QTableWidgetItem(str(student.age)))
-                self.table_widget.setItem(row_position, 4, QTableWidgetItem(student._email))
-                self.table_widget.setItem(row_position, 5, QTableWidgetItem('N/A'))
-
-        for instructor in self.instructors:
-            if (search_term in instructor.name.lower() or
-                search_term in instructor.instructor_id.lower()):
-                row_position = self.table_widget.rowCount()
-                self.table_widget.insertRow(row_position)
-                self.table_widget.setItem(row_position, 0, QTableWidgetItem('Instructor'))
-                self.table_widget.setItem(row_position, 1, QTableWidgetItem(instructor.instructor_id))
-                self.table_widget.setItem(row_position, 2, QTableWidgetItem(instructor.name))
-                self.table_widget.setItem(row_position, 3, QTableWidgetItem(str(instructor.age)))
-                self.table_widget.setItem(row_position, 4, QTableWidgetItem(instructor._email))
-                self.table_widget.setItem(row_position, 5, QTableWidgetItem(', '.join([c['course_name'] for c in self.available_courses if c['course_id'] in instructor.courses])))
-
-        for course in self.available_courses:
-            if (search_term in course['course_name'].lower() or
-                search_term in course['course_id'].lower()):
-                row_position = self.table_widget.rowCount()
-                self.table_widget.insertRow(row_position)
-                self.table_widget.setItem(row_position, 0, QTableWidgetItem('Course'))
-                self.table_widget.setItem(row_position, 1, QTableWidgetItem(course['course_id']))
-                self.table_widget.setItem(row_position, 2, QTableWidgetItem(course['course_name']))
-                self.table_widget.setItem(row_position, 3, QTableWidgetItem('N/A'))  # Placeholder for course info
-                self.table_widget.setItem(row_position, 4, QTableWidgetItem('N/A'))  # Placeholder for course info
-                self.table_widget.setItem(row_position, 5, QTableWidgetItem('N/A'))  # Placeholder for enrolled students
-
-
-    def updateRecordDisplay(self):
-        
-        """
-        Updates the table widget to display the current student, instructor, and course records.
-
-        This method clears the table widget and repopulates it with the latest records from
-        the `students`, `instructors`, and `available_courses` lists.
-        """
-
-        self.table_widget.setRowCount(0)
-            
-        for student in self.students:
-            row_position = self.table_widget.rowCount()
-            self.table_widget.insertRow(row_position)
-            self.table_widget.setItem(row_position, 0, QTableWidgetItem('Student'))
-            self.table_widget.setItem(row_position, 1, QTableWidgetItem(student.student_id))
-            self.table_widget.setItem(row_position, 2, QTableWidgetItem(student.name))
-            self.table_widget.setItem(row_position, 3, QTableWidgetItem(str(student.age)))
-            self.table_widget.setItem(row_position, 4, QTableWidgetItem(student._email))
-
-        for instructor in self.instructors:
-            row_position = self.table_widget.rowCount()
-            self.table_widget.insertRow(row_position)
-            self.table_widget.setItem(row_position, 0, QTableWidgetItem(instructor.instructor_id))
-            self.table_widget.setItem(row_position, 1, QTableWidgetItem(instructor.name))
-            self.table_widget.setItem(row_position, 2, QTableWidgetItem(str(instructor.age)))
-            self.table_widget.setItem(row_position, 3, QTableWidgetItem(instructor._email))
-            self.table_widget.setItem(row_position, 4, QTableWidgetItem('Instructor'))
-
-        for course in self.available_courses:
-            row_position = self.table_widget.rowCount()
-            self.table_widget.insertRow(row_position)
-            self.table_widget.setItem(row_position, 0, QTableWidgetItem('Course'))
-            self.table_widget.setItem(row_position, 1, QTableWidgetItem(course['course_id']))
-            self.table_widget.setItem(row_position, 2, QTableWidgetItem(course['course_name']))
-            self.table_widget.setItem(row_position, 3, QTableWidgetItem('N/A'))  # No direct age info for courses
-            self.table_widget.setItem(row_position, 4, QTableWidgetItem('N/A'))  # No direct email info for courses
-
-            instructor_id = course.get('instructor_id', 'N/A')
-            enrolled_students_ids = course.get('enrolled_students_ids', [])
-            additional_info = f"Instructor ID: {instructor_id}\nEnrolled Students: {', '.join(enrolled_students_ids)}"
-            self.table_widget.setItem(row_position, 5, QTableWidgetItem(additional_info))
-
-    def editRecord(self):
-
-        """
-        Allows the user to edit the selected student or instructor record.
-
-        This method retrieves the selected record from the table, opens a dialog for the user
-        to update the details (name, age, email), and updates the record upon confirmation.
-        """
-
-        selected_row = self.table_widget.currentRow()
-        if selected_row < 0:
-            QMessageBox.warning(self, 'Edit Record', 'No record selected!')
-            return
-        
-        record_type = self.table_widget.item(selected_row, 4).text()
-        record_id = self.table_widget.item(selected_row, 0).text()
-        
-        if record_type == 'Student':
-            student = next((s for s in self.students if s.student_id == record_id), None)
-            if student:
-                # Open a dialog or new form to edit the student record
-                new_name, ok = QInputDialog.getText(self, 'Edit Student', 'Enter new name:', text=student.name)
-                if ok and new_name.strip():
-                    student.name = new_name.strip()
-                else:
-                    QMessageBox.warning(self, 'Edit Student', 'Invalid name!')
-                    return
-                new_age, ok = QInputDialog.getText(self, 'Edit Student', 'Enter new age:', text=str(student.age))
-                booll=new_age.isdigit() and int(new_age) > 0
-                if ok and booll:
-                    student.age = int(new_age)
-                else:
-                    QMessageBox.warning(self, 'Edit Student', 'Invalid age!')
-                    return
-
-            new_email, ok = QInputDialog.getText(self, 'Edit Student', 'Enter new email:', text=student._email)
-            booll= re.match(r"[^@]+@[^@]+\.[^@]+", new_email) is not None
-            if ok and booll:
-                student._email = new_email
-            else:
-                QMessageBox.warning(self, 'Edit Student', 'Invalid email!')
-                return
-        elif record_type == 'Instructor':
-            instructor = next((i for i in self.instructors if i.instructor_id == record_id), None)
-            if instructor:
-                # Open a dialog or new form to edit the instructor record
-                new_name, ok = QInputDialog.getText(self, 'Edit Instructor', 'Enter new name:', text=instructor.name)
-                if ok and new_name.strip():
-                    instructor.name = new_name.strip()
-                else:
-                    QMessageBox.warning(self, 'Edit Instructor', 'Invalid name!')
-                    return
-                new_age, ok = QInputDialog.getText(self, 'Edit Instructor', 'Enter new age:', text=str(instructor.age))
-                booll=new_age.isdigit() and int(new_age) > 0
-            if ok and booll:
-                instructor.age = int(new_age)
-            else:
-                QMessageBox.warning(self, 'Edit Instructor', 'Invalid age!')
-                return
-
-            new_email, ok = QInputDialog.getText(self, 'Edit Instructor', 'Enter new email:', text=instructor._email)
-            booll= re.match(r"[^@]+@[^@]+\.[^@]+", new_email) is not None
-            if ok and booll:
-                instructor._email = new_email
-            else:
-                QMessageBox.warning(self, 'Edit Instructor', 'Invalid email!')
-                return
-        self.updateRecordDisplay()
-    
-    def deleteRecord(self):
-
-        """
-        Deletes the selected student or instructor record from the list.
-
-        This method removes the selected record from either the `students` or `instructors` list 
-        and updates the table widget to reflect the changes.
-        """
-
-        selected_row = self.table_widget.currentRow()
-        if selected_row < 0:
-            QMessageBox.warning(self, 'Delete Record', 'No record selected!')
-            return
-        
-        record_type = self.table_widget.item(selected_row, 4).text()
-        record_id = self.table_widget.item(selected_row, 0).text()
-        
-        if record_type == 'Student':
-            self.students = [s for s in self.students if s.student_id != record_id]
-        elif record_type == 'Instructor':
-            self.instructors = [i for i in self.instructors if i.instructor_id != record_id]
-        
-        self.updateRecordDisplay()
-        QMessageBox.information(self, 'Success', f'{record_type} record deleted successfully!')
-
-    def saveData(self):
-
-        """
-        Saves the current data to a JSON file.
-
-        This method collects the student, instructor, and course records from the application's
-        lists and serializes them into a JSON file. It handles any file I/O exceptions that may occur
-        and notifies the user upon success or failure.
-
-        Raises:
-            Exception: If an error occurs during the file save operation.
-        """
-
-        try:
-            data = {
-                'students': [],
-                'instructors': [],
-                'courses': []
-            }
-
-            for student in self.students:
-                data['students'].append({
-                    'student_id': student.student_id,
-                    'name': student.name,
-                    'age': student.age,
-                    'email': student._email,
-                    'registered_courses': [course.course_id for course in student.registered_courses]
-                })
-
-            for instructor in self.instructors:
-                data['instructors'].append({
-                    'instructor_id': instructor.instructor_id,
-                    'name': instructor.name,
-                    'assigned_courses': [course.course_id for course in instructor.assigned_courses]
-                })
-
-            for course in self.available_courses:
-                data['courses'].append({
-                    'course_id': course['course_id'],
-                    'course_name': course['course_name'],
-                    'instructor_id': course['instructor'].instructor_id if course.get('instructor') else None,
-                    'enrolled_students': [student.student_id for student in course.get('enrolled_students', [])]
-                })
-
-            with open('school_data.json', 'w') as file:
-                json.dump(data, file)
-
-            QMessageBox.information(self, 'Success', 'Data saved successfully!')
-
-        except Exception as e:
-            QMessageBox.critical(self, 'Error', f"An error occurred while saving data: {str(e)}")
-
-    def loadData(self):
-        
-        """
-        Loads data from a JSON file.
-
-        This method reads a JSON file selected by the user and populates the application's
-        records with the loaded data. The data is applied to the student, instructor, and course lists,
-        and the interface is updated to reflect the new state.
-
-        Raises:
-            Exception: If an error occurs during the file read operation.
-        """
-
-        file_name, _ = QFileDialog.getOpenFileName(self, "Open Data", "", "JSON Files (*.json)")
-        if file_name:
-                with open(file_name, 'r') as file:
-                    data = json.load(file)
-
-                self.students = []
-                self.instructors = []
-                self.available_courses = []
-
-                for instructor_data in data.get('instructors', []):
-                    instructor = Instructor(
-                        instructor_id=instructor_data.get('instructor_id', ''),
-                        name=instructor_data.get('name', ''),
-                        age=instructor_data.get('age', None),  # Use None or a default value if 'age' is missing
-                        _email=instructor_data.get('email', '')
-                    )
-                    self.instructors.append(instructor)
-
-                for student_data in data.get('students', []):
-                    student = Student(
-                        student_id=student_data.get('student_id', ''),
-                        name=student_data.get('name', ''),
-                        age=student_data.get('age', None),  # Use None or a default value if 'age' is missing
-                        _email=student_data.get('email', '')
-                    )
-                    self.students.append(student)
-
-                for course_data in data.get('courses', []):
-                    instructor = next((inst for inst in self.instructors if inst.instructor_id == course_data.get('instructor_id')), None)
-                    
-                    course = Course(
-                        course_id=course_data.get('course_id', ''),
-                        course_name=course_data.get('course_name', ''),
-                        instructor=instructor,
-                        enrolled_students=course_data.get('enrolled_students')
-                    )
-                    
-                    for student_id in course_data.get('enrolled_students_ids', []):
-                        student = next((stud for stud in self.students if stud.student_id == student_id), None)
-                        if student:
-                            course.add_student(student)
-                            student.registered_courses.append(course)
-
-                    self.available_courses.append(course)
-                    if instructor:
-                        instructor.assigned_courses.append(course)
-
-                self.updateRecordDisplay()
-                QMessageBox.information(self, "Success", "Data loaded successfully!")
-
-    def export_to_csv(self):
-
-        """
-        Exports the current school data to a CSV file.
-
-        This method allows the user to save the student, instructor, and course
-        records into a CSV file, with each type of data written into a separate row.
-
-        Raises:
-            Exception: If an error occurs during the exporting process.
-        """
-
-        # Prompt user to select file location
-        file_name, _ = QFileDialog.getSaveFileName(self, "Save CSV File", "", "CSV Files (*.csv)")
-        if file_name:
-            try:
-                with open(file_name, 'w', newline='') as file:
-                    writer = csv.writer(file)
-                    # Write header
-                    writer.writerow(["Type", "ID", "Name", "Age", "Email", "Instructor", "Course Name", "Students"])
-
-                    # Write student records
-                    for student in self.students:
-                        writer.writerow([
-                            "Student", 
-                            student.student_id, 
-                            student.name, 
-                            student.age, 
-                            student._email, 
-                            '', 
-                            '', 
-                            ''
-                        ])
-
-                    # Write instructor records
-                    for instructor in self.instructors:
-                        writer.writerow([
-                            "Instructor", 
-                            instructor.instructor_id, 
-                            instructor.name, 
-                            instructor.age, 
-                            instructor._email, 
-                            '', 
-                            '', 
-                            ''
-                        ])
-
-                    # Write course records
-                    for course in self.available_courses:
-                        # Check if course is a dictionary or object
-                        if isinstance(course, dict):
-                            enrolled_students_list = ', '.join(
-                                student['name'] for student in course.get('enrolled_students', [])
-                            )
-                            writer.writerow([
-                                "Course", 
-                                course.get('course_id', ''), 
-                                course.get('course_name', ''), 
-                                '', 
-                                '', 
-                                course.get('instructor', {}).get('name', ''), 
-                                course.get('course_name', ''), 
-                                enrolled_students_list
-                            ])
-                        else:
-                            enrolled_students_list = ', '.join(
-                                student.name for student in course.enrolled_students
-                            )
-                            writer.writerow([
-                                "Course", 
-                                course.course_id, 
-                                course.course_name, 
-                                '', 
-                                '', 
-                                course.instructor.name if course.instructor else '', 
-                                course.course_name, 
-                                enrolled_students_list
-                            ])
-
-                QMessageBox.information(self, "Success", "Data exported successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to export data: {str(e)}")
-
-
-
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    mainWindow = MainWindow()
-    mainWindow.show()
-    sys.exit(app.exec_())
+import sys
+import csv
+import json
+import os
+import re
+from itertools import chain, islice
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
+from OOP import *
+from background_jobs import Job
+from journal import JournaledStore
+from record_model import RecordSortProxy, RecordTableModel
+from snapshot import open_registry
+from text_search import TrigramIndex
+
+DATA_FILE = 'school_data.snap'
+JOURNAL_FILE = 'school_data.journal'
+# Milliseconds of typing pause before the search field is applied.
+SEARCH_DELAY_MS = 150
+# Records added to the search index per idle-time step.
+INDEX_CHUNK = 1000
+# Rows written to the CSV file between progress reports.
+EXPORT_CHUNK = 1000
+
+class MainWindow(QMainWindow):
+    """
+    Main window for the School Management System.
+
+    This class provides the main interface for managing students, instructors,
+    courses, and school records. It includes functionality for adding, displaying,
+    editing, and saving data.
+
+    Attributes:
+        registry (SchoolRegistry): Students, instructors, and courses indexed by their IDs.
+        store (JournaledStore): Persists the registry as a snapshot plus a journal of changes.
+        job (Job): The load, save, or export running in the background, or None.
+    """
+
+    def __init__(self):
+
+        """
+        Initializes the main window, restores the saved data, and sets up the user interface (UI).
+        """
+        super().__init__()
+        self.store = JournaledStore(DATA_FILE, JOURNAL_FILE)
+        self.registry = self.store.open(self.defaultRegistry)
+        self.job = None
+        self.job_message = ''
+        self.job_cancel_on_close = True
+        self.initUI()
+
+    @staticmethod
+    def defaultRegistry():
+
+        """
+        Creates the registry used before any data has been saved.
+
+        Returns:
+            SchoolRegistry: A registry holding the default course catalogue.
+        """
+
+        registry = SchoolRegistry()
+        registry.add_course(Course(course_id='CS101', course_name='Introduction to Computer Science', instructor=None))
+        registry.add_course(Course(course_id='MATH101', course_name='Calculus I', instructor=None))
+        registry.add_course(Course(course_id='PHYS101', course_name='Physics I', instructor=None))
+        return registry
+
+    def initUI(self):
+
+        """
+        Sets up the user interface of the application.
+
+        This method creates the main layout of the window, including tabs for
+        student, instructor, and course management. It also adds buttons for
+        saving, loading, and exporting data.
+
+        Tabs:
+            - Student: Form to add student data.
+            - Instructor: Form to add instructor data.
+            - Course: Form to add course data.
+            - Records: Displays school records.
+
+        Buttons:
+            - Save Data: Saves current data to a file.
+            - Load Data: Loads data from a file.
+            - Export to CSV: Exports current data to a CSV file.
+            - Cancel: Stops a load, save, or export running in the background.
+        """
+
+        self.setWindowTitle('School Management System')
+        self.setGeometry(100, 100, 800, 600)
+        self.setStyleSheet("background-color: lightblue;")
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout()
+        central_widget.setLayout(layout)
+
+        tabs = QTabWidget()
+        layout.addWidget(tabs)
+
+        student_form = self.createStudentForm()
+        instructor_form = self.createInstructorForm()
+        course_form = self.createCourseForm()
+        tabs.addTab(student_form, 'Student')
+        tabs.addTab(instructor_form, 'Instructor')
+        tabs.addTab(course_form, 'Course')
+        tabs.addTab(self.createRecordDisplay(), 'Records')
+
+        self.updateCourseDropdown()
+
+        self.save_button = QPushButton("Save Data")
+        self.load_button = QPushButton("Load Data")
+        self.save_button.setStyleSheet("background-color: blue; color: white;")
+        self.load_button.setStyleSheet("background-color: blue; color: white;")
+
+
+        
+        layout.addWidget(self.save_button)
+        layout.addWidget(self.load_button)
+
+        self.save_button.clicked.connect(self.saveData)
+        self.load_button.clicked.connect(self.loadData)
+
+        export_button = QPushButton("Export to CSV")
+        export_button.clicked.connect(self.export_to_csv)
+        export_button_layout = QHBoxLayout()
+        export_button_layout.addWidget(export_button)
+        layout.addLayout(export_button_layout)
+
+        self.job_progress = QProgressBar()
+        self.job_progress.setRange(0, 100)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancelJob)
+        job_layout = QHBoxLayout()
+        job_layout.addWidget(self.job_progress)
+        job_layout.addWidget(self.cancel_button)
+        layout.addLayout(job_layout)
+        self.job_progress.hide()
+        self.cancel_button.hide()
+
+        # Controls that change or replace the registry are disabled while a background job reads it.
+        self.job_locked_widgets = [student_form, instructor_form, course_form, self.edit_button,
+                                   self.delete_button, self.save_button, self.load_button, export_button]
+
+    def createStudentForm(self):
+
+        """
+        Creates the form for adding student details.
+
+        This method sets up the input fields for adding a new student, including
+        fields for name, age, email, and student ID. A dropdown allows for selecting
+        a course the student will be registered for.
+
+        Returns:
+            QWidget: The widget containing the student form layout.
+        """
+
+        form_widget = QWidget()
+        layout = QFormLayout()
+        
+        self.student_name = QLineEdit()
+        self.student_age = QLineEdit()
+        self.student_email = QLineEdit()
+        self.student_id = QLineEdit()
+        
+        layout.addRow(QLabel('Name:'), self.student_name)
+        layout.addRow(QLabel('Age:'), self.student_age)
+        layout.addRow(QLabel('Email:'), self.student_email)
+        layout.addRow(QLabel('ID:'), self.student_id)
+        
+        self.course_dropdown = QComboBox()
+        self.updateCourseDropdown()
+        layout.addRow(QLabel('Register for Course:'), self.course_dropdown)
+        
+        submit_button = QPushButton('Add Student')
+        submit_button.clicked.connect(self.addStudent)
+        layout.addWidget(submit_button)
+        
+        form_widget.setLayout(layout)
+        return form_widget
+
+    def createInstructorForm(self):
+
+        """
+        Creates the form for adding instructor details.
+
+        This method sets up the input fields for adding a new instructor, including
+        fields for name, age, email, and instructor ID. A dropdown allows for assigning
+        the instructor to a course.
+
+        Returns:
+            QWidget: The widget containing the instructor form layout.
+        """
+
+        form_widget = QWidget()
+        layout = QFormLayout()
+
+        self.instructor_name = QLineEdit()
+        self.instructor_age = QLineEdit()
+        self.instructor_email = QLineEdit()
+        self.instructor_id = QLineEdit()
+        
+        layout.addRow(QLabel('Name:'), self.instructor_name)
+        layout.addRow(QLabel('Age:'), self.instructor_age)
+        layout.addRow(QLabel('Email:'), self.instructor_email)
+        layout.addRow(QLabel('ID:'), self.instructor_id)
+        
+        self.instructor_course_dropdown = QComboBox()
+        self.updateCourseDropdown()  # Populate dropdown with courses
+        layout.addRow(QLabel('Assign Course:'), self.instructor_course_dropdown)
+
+        submit_button = QPushButton('Add Instructor')
+        submit_button.clicked.connect(self.addInstructor)
+        layout.addWidget(submit_button)
+        
+        form_widget.setLayout(layout)
+        return form_widget
+
+    def createCourseForm(self):
+
+        """
+        Creates the form for adding course details.
+
+        This method sets up the input fields for adding a new course, including
+        fields for course ID, course name, instructor, and enrolled students.
+
+        Returns:
+            QWidget: The widget containing the course form layout.
+        """
+
+        form_widget = QWidget()
+        layout = QFormLayout()
+        
+        self.course_id = QLineEdit()
+        self.course_name = QLineEdit()
+        self.course_instructor = QLineEdit()  
+        self.course_enrolled_students = QLineEdit()  
+        
+        layout.addRow(QLabel('Course ID:'), self.course_id)
+        layout.addRow(QLabel('Course Name:'), self.course_name)
+        layout.addRow(QLabel('Instructor ID:'), self.course_instructor)
+        layout.addRow(QLabel('Enrolled Students IDs:'), self.course_enrolled_students)
+        
+        submit_button = QPushButton('Add Course')
+        submit_button.clicked.connect(self.addCourse)
+        layout.addWidget(submit_button)
+        
+        form_widget.setLayout(layout)
+        return form_widget
+
+    def createRecordDisplay(self):
+
+        """
+        Creates and returns the layout for displaying and managing records.
+
+        This method sets up the layout containing the search field, buttons to edit
+        and delete records, and the table view that displays the records. The view reads
+        from a `RecordTableModel` over the registry through a `RecordSortProxy`, which
+        sorts by column. The search is applied as the user types, once typing pauses
+        for `SEARCH_DELAY_MS`.
+
+        Returns:
+            QWidget: The widget containing the record management interface.
+        """
+
+        form_widget = QWidget()
+        layout = QVBoxLayout()
+        
+        search_layout = QHBoxLayout()
+        self.search_field = QLineEdit()
+        self.search_field.setPlaceholderText('Search by name, ID, or course')
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.searchRecords)
+        self.search_field.textChanged.connect(lambda _text: self.search_timer.start())
+        self.index_timer = QTimer(self)
+        self.index_timer.timeout.connect(self.buildSearchIndex)
+        search_layout.addWidget(self.search_field)
+        
+        layout.addLayout(search_layout)
+
+        button_layout = QHBoxLayout()
+        self.edit_button = QPushButton('Edit Record')
+        self.delete_button = QPushButton('Delete Record')
+        self.edit_button.clicked.connect(self.editRecord)
+        self.delete_button.clicked.connect(self.deleteRecord)
+        button_layout.addWidget(self.edit_button)
+        button_layout.addWidget(self.delete_button)
+        
+        layout.addLayout(button_layout)
+
+        self.search_index = TrigramIndex()
+        self.record_model = RecordTableModel(parent=self)
+        self.record_proxy = RecordSortProxy(self)
+        self.record_proxy.setSourceModel(self.record_model)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.record_proxy)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.sortByColumn(-1, Qt.AscendingOrder)
+        layout.addWidget(self.table_view)
+        
+        form_widget.setLayout(layout)
+        self.updateRecordDisplay()  
+        
+        return form_widget
+
+    def updateCourseDropdown(self):
+
+        """
+        Updates the dropdown menus for course selection in the student and instructor forms.
+
+        This method clears the existing dropdown items and populates them with the current
+        list of available courses. If the dropdowns already exist, it updates them.
+        """
+
+        if hasattr(self, 'course_dropdown'):
+            self.course_dropdown.clear()
+        
+        if hasattr(self, 'instructor_course_dropdown'):
+            self.instructor_course_dropdown.clear()
+        
+        for course in self.registry.courses.values():
+            if hasattr(self, 'course_dropdown'):
+                self.course_dropdown.addItem(f"{course.course_id} - {course.course_name}", course.course_id)
+            if hasattr(self, 'instructor_course_dropdown'):
+                self.instructor_course_dropdown.addItem(f"{course.course_id} - {course.course_name}", course.course_id)
+
+
+    def addStudent(self):
+
+        """
+        Adds a new student to the list based on the input from the form.
+
+        This method retrieves the student's details from the input form (name, age, email, 
+        student ID, and selected course), adds the student to the registry and registers
+        them for the selected course. It also displays a success message upon completion.
+
+        Raises:
+            ValueError: If any required field is missing or invalid.
+        """
+
+        selected_course_id = self.course_dropdown.currentData()
+        student_name = self.student_name.text()
+        student_age = self.student_age.text()
+        student_email = self.student_email.text()
+        student_id = self.student_id.text()
+        
+        try:
+            student = Student(name=student_name, age=int(student_age), email=student_email, student_id=student_id)
+            self.registry.add_student(student)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Error', str(e))
+            return
+        self.store.record('add', record=to_record(student))
+        if self.registry.enroll(student_id, selected_course_id):
+            self.store.record('enroll', student_id=student_id, course_id=selected_course_id)
+        QMessageBox.information(self, 'Success', f'Student added successfully! Registered for course ID: {selected_course_id}')
+        
+    def addInstructor(self):
+
+        """
+        Adds a new instructor to the list based on the input from the form.
+
+        This method retrieves the instructor's details from the input form (name, age, 
+        email, instructor ID, and assigned course) and adds the instructor to the 
+        registry. It also assigns the instructor to a course.
+
+        Raises:
+            ValueError: If any required field is missing or invalid.
+        """
+
+        selected_course_id = self.instructor_course_dropdown.currentData()
+        
+        instructor_name = self.instructor_name.text()
+        instructor_age = self.instructor_age.text()
+        instructor_email = self.instructor_email.text()
+        instructor_id = self.instructor_id.text()
+        
+        try:
+            instructor = Instructor(name=instructor_name, age=int(instructor_age), email=instructor_email, instructor_id=instructor_id)
+            self.registry.add_instructor(instructor)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Error', str(e))
+            return
+        
+        self.store.record('add', record=to_record(instructor))
+        if self.registry.assign(instructor_id, selected_course_id):
+            self.store.record('assign', instructor_id=instructor_id, course_id=selected_course_id)
+        
+        QMessageBox.information(self, 'Success', f'Instructor added successfully! Assigned to course ID: {selected_course_id}')
+
+    def addCourse(self):
+
+        """
+        Adds a new course to the registry based on the input from the form.
+
+        This method retrieves the course details (course ID, course name, instructor, and 
+        enrolled students) from the input form, creates the course, and assigns the students 
+        to it.
+
+        Raises:
+            ValueError: If any required field is missing or invalid.
+        """
+
+        course_id = self.course_id.text()
+        course_name = self.course_name.text()
+        instructor_id = self.course_instructor.text()
+        enrolled_students_ids = self.course_enrolled_students.text().split(',')
+
+        instructor = self.registry.get_instructor(instructor_id)
+        if not instructor:
+            QMessageBox.warning(self, 'Error', 'Instructor not found!')
+            return
+
+        try:
+            course = self.registry.add_course(Course(course_id=course_id, course_name=course_name, instructor=None))
+        except ValueError as e:
+            QMessageBox.warning(self, 'Error', str(e))
+            return
+
+        self.registry.assign(instructor_id, course_id)
+        for student_id in enrolled_students_ids:
+            self.registry.enroll(student_id.strip(), course_id)
+        self.store.record('add', record=to_record(course, self.registry.enrollments))
+
+        QMessageBox.information(self, 'Success', 'Course added successfully!')
+        self.updateCourseDropdown()
+
+    def searchRecords(self):
+
+        """
+        Searches through the student, instructor, and course records based on the search term.
+
+        This method filters the records to display only those that match the search term 
+        (either by name or ID). Matches are looked up in the trigram `search_index` rather
+        than by scanning every record, and records added or edited while the search is
+        active are shown or hidden as they start or stop matching. If nothing contains the
+        term, the closest names are shown instead, best first, with their similarity scores
+        in the status bar. A search made before the index is built only covers the records
+        indexed so far; it is run again once `buildSearchIndex` finishes.
+        """
+
+        self.statusBar().clearMessage()
+        search_term = self.search_field.text().strip()
+        if not search_term:
+            self.record_model.setFilter(None)
+            return
+        message = ''
+        matches = self.search_index.search(search_term)
+        if matches:
+            self.record_model.setFilter(matches, lambda key: self.search_index.matches(key, search_term))
+        else:
+            closest = self.search_index.fuzzySearch(search_term)
+            self.record_model.setFilter([key for _score, key, _name in closest])
+            if closest:
+                scores = ', '.join(f'{name} ({score:.2f})' for score, _key, name in closest)
+                message = f'No exact matches. Closest names: {scores}'
+            else:
+                message = 'No matches.'
+        if not self.search_index.complete:
+            message = f'{message} Still indexing records; results will update when done.'.strip()
+        if message:
+            self.statusBar().showMessage(message)
+
+    def updateRecordDisplay(self):
+        
+        """
+        Updates the table view to display the current student, instructor, and course records.
+
+        This method points the search index and the table model at the registry again and
+        clears the search field. Cells are only built for the rows that are on screen.
+        """
+
+        # The index subscribes first so it is current when the model's filter consults it.
+        self.search_index.attach(self.registry)
+        self.record_model.setRegistry(self.registry)
+        self.index_timer.start(0)
+        self.search_timer.stop()
+        self.search_field.blockSignals(True)
+        self.search_field.clear()
+        self.search_field.blockSignals(False)
+
+    def buildSearchIndex(self):
+
+        """
+        Indexes the next `INDEX_CHUNK` records for search while the application is idle.
+        """
+
+        if self.search_index.build(INDEX_CHUNK):
+            self.index_timer.stop()
+            # A search made while indexing only saw part of the records.
+            if self.search_field.text().strip():
+                self.searchRecords()
+
+    def selectedRecordKey(self):
+
+        """
+        Returns the type and ID of the record selected in the table.
+
+        Returns:
+            tuple: ('Student', 'Instructor' or 'Course', record ID), or None if no row is selected.
+        """
+
+        index = self.table_view.currentIndex()
+        if not index.isValid():
+            return None
+        return self.record_model.recordKey(self.record_proxy.mapToSource(index).row())
+
+    def editRecord(self):
+
+        """
+        Allows the user to edit the selected student or instructor record.
+
+        This method retrieves the selected record from the table, opens a dialog for the user
+        to update the details (name, age, email), and updates the record upon confirmation.
+        The new age and email are validated by the registry like those of a new record.
+        """
+
+        selected = self.selectedRecordKey()
+        if selected is None:
+            QMessageBox.warning(self, 'Edit Record', 'No record selected!')
+            return
+        
+        record_type, record_id = selected
+        
+        if record_type == 'Student':
+            person = self.registry.get_student(record_id)
+        elif record_type == 'Instructor':
+            person = self.registry.get_instructor(record_id)
+        else:
+            QMessageBox.warning(self, 'Edit Record', 'Only students and instructors can be edited!')
+            return
+        if person is None:
+            QMessageBox.warning(self, 'Edit Record', f'{record_type} not found!')
+            return
+
+        title = f'Edit {record_type}'
+        new_name, ok = QInputDialog.getText(self, title, 'Enter new name:', text=person.name)
+        if not (ok and new_name.strip()):
+            QMessageBox.warning(self, title, 'Invalid name!')
+            return
+        new_age, ok = QInputDialog.getText(self, title, 'Enter new age:', text=str(person.age))
+        booll=new_age.isdigit() and int(new_age) > 0
+        if not (ok and booll):
+            QMessageBox.warning(self, title, 'Invalid age!')
+            return
+
+        new_email, ok = QInputDialog.getText(self, title, 'Enter new email:', text=person._email)
+        booll= re.match(r"[^@]+@[^@]+\.[^@]+", new_email) is not None
+        if not (ok and booll):
+            QMessageBox.warning(self, title, 'Invalid email!')
+            return
+
+        update = self.registry.update_student if record_type == 'Student' else self.registry.update_instructor
+        try:
+            update(record_id, new_name.strip(), int(new_age), new_email)
+        except ValueError as e:
+            QMessageBox.warning(self, title, str(e))
+            return
+        self.store.record('update', record=to_record(person))
+    
+    def deleteRecord(self):
+
+        """
+        Deletes the selected student, instructor, or course record from the registry.
+
+        This method removes the selected record from the registry, unlinking it from
+        related records, and updates the table view to reflect the changes.
+        """
+
+        selected = self.selectedRecordKey()
+        if selected is None:
+            QMessageBox.warning(self, 'Delete Record', 'No record selected!')
+            return
+        
+        record_type, record_id = selected
+        
+        if record_type == 'Student':
+            self.registry.remove_student(record_id)
+        elif record_type == 'Instructor':
+            self.registry.remove_instructor(record_id)
+        elif record_type == 'Course':
+            self.registry.remove_course(record_id)
+            self.updateCourseDropdown()
+        self.store.record('remove', type=record_type.lower(), id=record_id)
+        
+        QMessageBox.information(self, 'Success', f'{record_type} record deleted successfully!')
+
+    def saveData(self):
+
+        """
+        Saves the changes made since the last save.
+
+        This method appends the pending add, edit, and delete entries to `JOURNAL_FILE`,
+        so the cost of a save is proportional to the change. Every few thousand entries,
+        or after a different file was loaded, the whole registry is compacted into the
+        `DATA_FILE` snapshot (or the file it alternates with) instead. The save runs as a
+        background job; cancelling a compaction leaves the previous snapshot in place. It
+        handles any file I/O exceptions that may occur and notifies the user upon success
+        or failure.
+        """
+
+        # Closing the window waits for a save instead of cancelling it.
+        self.startJob(Job(self.store.save, self.registry), 'Saving data...',
+                      onFinished=lambda _result: QMessageBox.information(self, 'Success', 'Data saved successfully!'),
+                      onFailed=lambda e: QMessageBox.critical(self, 'Error', f"An error occurred while saving data: {str(e)}"),
+                      onCancelled=lambda: QMessageBox.information(self, 'Cancelled', 'Save cancelled. The previous save was kept.'),
+                      cancelOnClose=False)
+
+    @staticmethod
+    def readRegistry(file_name, progress):
+
+        """
+        Builds a new registry from a snapshot, NDJSON, or JSON file.
+
+        Runs on a worker thread for `loadData`, so it must not touch any widget.
+
+        Args:
+            file_name (str): The file to read.
+            progress (callable): Called as ``progress(records_read, fraction)``.
+
+        Returns:
+            tuple: The new `SchoolRegistry` and the number of invalid records skipped.
+        """
+
+        if file_name.endswith('.snap'):
+            return open_registry(file_name), 0
+        registry = SchoolRegistry()
+        if file_name.endswith('.ndjson'):
+            size = os.path.getsize(file_name) or 1
+            with open(file_name, 'rb') as file:
+                records = (json.loads(line) for line in file if line.strip())
+                skipped = registry.load_records(records, progress=lambda read: progress(read, min(file.tell() / size, 1.0)))
+            return registry, skipped
+        document = Person.load_data(file_name)
+        total = sum(len(document.get(kind, [])) for kind in ('students', 'instructors', 'courses')) or 1
+        skipped = registry.load_graph(document, progress=lambda read: progress(read, read / total))
+        return registry, skipped
+
+    def loadData(self):
+        
+        """
+        Loads data from a snapshot, NDJSON, or JSON file.
+
+        This method reads the file selected by the user and populates the application's
+        registry with the loaded data. Snapshots are memory-mapped and their records are
+        only built when they are looked up or displayed. NDJSON files are streamed record
+        by record; legacy JSON documents with `students`, `instructors`, and `courses` lists
+        are parsed whole. Students and instructors read from NDJSON or JSON are validated in
+        bulk and rows failing validation are skipped. The file is read into a new registry
+        by a background job, so the window stays responsive and a cancelled load leaves the
+        current data untouched. The interface is then updated to reflect the new state.
+        """
+
+        file_name, _ = QFileDialog.getOpenFileName(self, "Open Data", "", "Data Files (*.snap *.ndjson *.json)")
+        if file_name:
+                self.startJob(Job(self.readRegistry, file_name), 'Loading data...',
+                              onFinished=self.showLoadedRegistry,
+                              onFailed=lambda e: QMessageBox.critical(self, "Error", f"Failed to load data: {str(e)}"),
+                              onCancelled=lambda: QMessageBox.information(self, "Cancelled", "Load cancelled."))
+
+    def showLoadedRegistry(self, loaded):
+
+        """
+        Replaces the registry with the one read by `loadData` and refreshes the interface.
+
+        Args:
+            loaded (tuple): The new registry and the number of invalid records skipped.
+        """
+
+        # The registry was built while nothing listened to it; the table and index
+        # pick it up with a single reset instead of one insert per record.
+        previous = self.registry
+        self.registry, skipped = loaded
+        self.store.invalidate()
+        self.updateCourseDropdown()
+        self.updateRecordDisplay()
+        # Release the file and memory map the old registry was reading from.
+        if getattr(previous, 'snapshot', None) is not None:
+            previous.snapshot.close()
+        message = "Data loaded successfully!"
+        if skipped:
+            message += f" Skipped {skipped} invalid records."
+        QMessageBox.information(self, "Success", message)
+
+    @staticmethod
+    def writeCsv(file_name, registry, progress):
+
+        """
+        Writes the students, instructors, and courses of a registry to a CSV file.
+
+        Runs on a worker thread for `export_to_csv`, so it must not touch any widget.
+
+        Args:
+            file_name (str): The CSV file to write.
+            registry (SchoolRegistry): The records to export.
+            progress (callable): Called as ``progress(rows_written, fraction)`` every `EXPORT_CHUNK` rows.
+
+        Returns:
+            int: The number of records written.
+        """
+
+        total = len(registry.students) + len(registry.instructors) + len(registry.courses) or 1
+        rows = chain(
+            # Student records
+            (["Student", student.student_id, student.name, student.age, student._email, '', '', '']
+             for student in registry.students.values()),
+            # Instructor records
+            (["Instructor", instructor.instructor_id, instructor.name, instructor.age, instructor._email, '', '', '']
+             for instructor in registry.instructors.values()),
+            # Course records
+            (["Course", course.course_id, course.course_name, '', '',
+              course.instructor.name if course.instructor else '', course.course_name,
+              ', '.join(student.name for student in registry.roster(course.course_id))]
+             for course in registry.courses.values()),
+        )
+        written = 0
+        with open(file_name, 'w', newline='') as file:
+            writer = csv.writer(file)
+            # Write header
+            writer.writerow(["Type", "ID", "Name", "Age", "Email", "Instructor", "Course Name", "Students"])
+            while True:
+                chunk = list(islice(rows, EXPORT_CHUNK))
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                written += len(chunk)
+                progress(written, written / total)
+        return written
+
+    def export_to_csv(self):
+
+        """
+        Exports the current school data to a CSV file.
+
+        This method allows the user to save the student, instructor, and course
+        records into a CSV file, with each type of data written into a separate row.
+        The file is written by a background job; a cancelled export deletes the
+        partly written file.
+        """
+
+        # Prompt user to select file location
+        file_name, _ = QFileDialog.getSaveFileName(self, "Save CSV File", "", "CSV Files (*.csv)")
+        if file_name:
+            self.startJob(Job(self.writeCsv, file_name, self.registry), 'Exporting data...',
+                          onFinished=lambda _rows: QMessageBox.information(self, "Success", "Data exported successfully!"),
+                          onFailed=lambda e: QMessageBox.critical(self, "Error", f"Failed to export data: {str(e)}"),
+                          onCancelled=lambda: self.removePartialExport(file_name))
+
+    def removePartialExport(self, file_name):
+
+        """
+        Deletes the file left by a cancelled export and tells the user.
+        """
+
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+        QMessageBox.information(self, "Cancelled", "Export cancelled.")
+
+    def startJob(self, job, message, onFinished, onFailed, onCancelled, cancelOnClose=True):
+
+        """
+        Runs a load, save, or export in the background and shows its progress.
+
+        While the job runs, the progress bar and Cancel button are shown and the
+        controls that change the registry are disabled, so the job never reads
+        records that are being edited. Searching, sorting, and scrolling the
+        records stay available. Only one job runs at a time.
+
+        Args:
+            job (Job): The job to run.
+            message (str): Status bar text shown while the job runs.
+            onFinished (callable): Called with the job's result.
+            onFailed (callable): Called with the exception if the job fails.
+            onCancelled (callable): Called if the job stops because it was cancelled.
+            cancelOnClose (bool): Whether closing the window cancels the job rather than waiting for it.
+        """
+
+        self.job = job
+        self.job_message = message
+        self.job_cancel_on_close = cancelOnClose
+        # endJob is connected first so the controls are back before a result dialog opens.
+        job.signals.progress.connect(self.showJobProgress)
+        job.signals.finished.connect(lambda _result: self.endJob())
+        job.signals.failed.connect(lambda _error: self.endJob())
+        job.signals.cancelled.connect(self.endJob)
+        job.signals.finished.connect(onFinished)
+        job.signals.failed.connect(onFailed)
+        job.signals.cancelled.connect(onCancelled)
+        for widget in self.job_locked_widgets:
+            widget.setEnabled(False)
+        self.job_progress.setValue(0)
+        self.job_progress.show()
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.show()
+        self.statusBar().showMessage(message)
+        QThreadPool.globalInstance().start(job)
+
+    def showJobProgress(self, count, fraction):
+
+        """
+        Shows the progress reported by the running job.
+
+        Args:
+            count (int): Records processed so far.
+            fraction (float): Share of the work done, between 0 and 1.
+        """
+
+        self.job_progress.setValue(int(100 * fraction))
+        self.statusBar().showMessage(f'{self.job_message} {count} records')
+
+    def endJob(self):
+
+        """
+        Hides the progress bar and enables the controls again once the job has ended.
+        """
+
+        self.job = None
+        self.job_progress.hide()
+        self.cancel_button.hide()
+        self.statusBar().clearMessage()
+        for widget in self.job_locked_widgets:
+            widget.setEnabled(True)
+
+    def cancelJob(self):
+
+        """
+        Asks the running job to stop; it ends at its next progress report.
+        """
+
+        if self.job is not None:
+            self.job.cancel()
+            self.cancel_button.setEnabled(False)
+            self.statusBar().showMessage(f'{self.job_message} cancelling')
+
+    def closeEvent(self, event):
+
+        """
+        Stops or finishes the running job before the window closes.
+
+        Args:
+            event (QCloseEvent): The close event.
+        """
+
+        if self.job is not None:
+            if self.job_cancel_on_close:
+                self.job.cancel()
+            QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    mainWindow = MainWindow()
+    mainWindow.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,360 @@
+"""
+Qt model/view classes for the PyQt record table.
+
+``RecordTableModel`` exposes the students, instructors and courses of a
+``SchoolRegistry`` as table rows without copying them into widget items:
+it keeps one ``(type, ID)`` key per row and builds cell text in ``data()``
+only for the cells the view actually paints. It listens to the registry's
+change events and patches just the affected rows, and can be narrowed to
+the results of a search. ``RecordSortProxy`` sits between the model and the
+view to sort by column.
+"""
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from snapshot import SnapshotTable
+from text_search import RECORD_TYPES
+
+COLUMNS = ['Type', 'ID', 'Name', 'Age', 'Email', 'Assigned Courses']
+SORT_ROLE = Qt.UserRole
+
+
+def studentRow(student, enrollments):
+    """
+    Returns the table cell values for a student record, listing its courses from ``enrollments``.
+    """
+    courses = ', '.join(enrollments.courses_of(student.student_id))
+    return ['Student', student.student_id, student.name, str(student.age), student._email, courses or 'N/A']
+
+
+def instructorRow(instructor):
+    """
+    Returns the table cell values for an instructor record.
+    """
+    courses = ', '.join(course.course_name for course in instructor.assigned_courses)
+    return ['Instructor', instructor.instructor_id, instructor.name, str(instructor.age), instructor._email, courses or 'N/A']
+
+
+def courseRow(course, enrollments):
+    """
+    Returns the table cell values for a course record, listing its students from ``enrollments``.
+    """
+    instructor_id = course.instructor.instructor_id if course.instructor else 'N/A'
+    enrolled_students_ids = ', '.join(enrollments.students_of(course.course_id))
+    count = enrollments.student_count(course.course_id)
+    additional_info = f"Instructor ID: {instructor_id}\nEnrolled Students ({count}): {enrolled_students_ids}"
+    return ['Course', course.course_id, course.course_name, 'N/A', 'N/A', additional_info]
+
+
+def _listIndex(keys):
+    # Returns a lookup of the position of a key in ``keys``, indexing them on the first lookup.
+    index = None
+
+    def row_of(key):
+        nonlocal index
+        if index is None:
+            index = dict(zip(keys, range(len(keys))))
+        return index.get(key)
+    return row_of
+
+
+def _tablePart(record_type, table):
+    # Returns the ``_RowKeys`` part of a registry table, in its own row order.
+    if isinstance(table, SnapshotTable):
+        size, id_of, row_of = table.num_rows, table.key_of, table.row_of
+    else:
+        ids = list(table)
+        size, id_of, row_of = len(ids), ids.__getitem__, _listIndex(ids)
+
+    def key_of(row):
+        return record_type, id_of(row)
+
+    def key_row(key):
+        return row_of(key[1]) if key[0] == record_type else None
+    return size, key_of, key_row
+
+
+class _RowKeys:
+    """
+    The ``(type, ID)`` key of each table row, read on demand instead of copied into a list.
+
+    Rows start out as the rows of each part in turn. Appending and removing a
+    row take constant time: a removed row is filled with the last row, and
+    keys that are no longer at their original row are tracked in ``_at``
+    (row -> key) and ``_moved`` (key -> row).
+
+    Args:
+        parts (list): ``(size, key_of, row_of)`` for each part: its number of
+            rows, a function returning the key of one of its rows, and one
+            returning the row of a key, or None if the key is not in the part.
+    """
+
+    def __init__(self, parts=()):
+        self._parts = []
+        start = 0
+        for size, key_of, row_of in parts:
+            self._parts.append((start, size, key_of, row_of))
+            start += size
+        self._count = start
+        self._at = {}
+        self._moved = {}
+
+    @classmethod
+    def ofRegistry(cls, registry):
+        """
+        Returns the keys of the students, instructors and courses of ``registry``.
+
+        Snapshot tables are read through their row order, so opening a large
+        snapshot reads no keys; other tables only have their IDs listed.
+        """
+        tables = [('Student', registry.students), ('Instructor', registry.instructors), ('Course', registry.courses)]
+        keys = cls([_tablePart(record_type, table) for record_type, table in tables])
+        for record_type, table in tables:
+            if isinstance(table, SnapshotTable):
+                removed, added = table.overlay()
+                for record_id in removed:
+                    keys.remove(keys.rowOf((record_type, record_id)))
+                for record_id in added:
+                    keys.append((record_type, record_id))
+        return keys
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, row):
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        key = self._at.get(row)
+        if key is not None:
+            return key
+        for start, size, key_of, _row_of in self._parts:
+            if row < start + size:
+                return key_of(row - start)
+
+    def rowOf(self, key):
+        """
+        Returns the row of ``key``, or None.
+        """
+        row = self._moved.get(key)
+        if row is not None:
+            return row
+        for start, _size, _key_of, row_of in self._parts:
+            part_row = row_of(key)
+            if part_row is not None:
+                row = start + part_row
+                return row if row < self._count and row not in self._at else None
+        return None
+
+    def append(self, key):
+        row = self._count
+        self._at[row] = key
+        self._moved[key] = row
+        self._count += 1
+
+    def remove(self, row):
+        """
+        Removes ``row`` by moving the last row into its place.
+        """
+        last = self._count - 1
+        self._moved.pop(self[row], None)
+        if row != last:
+            key = self[last]
+            self._at[row] = key
+            self._moved[key] = row
+        self._at.pop(last, None)
+        self._count = last
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Table model over the records of a ``SchoolRegistry``.
+
+    Rows list the students, then the instructors, then the courses, in the
+    order of the registry's tables (file order for a snapshot); records added
+    afterwards are appended, and the last row takes the place of a removed
+    one. Row keys are read from the tables only for the rows the view asks
+    for, and records are looked up in the registry and turned into cell
+    values then. ``setFilter`` narrows the rows to a set of keys, such as
+    search results.
+
+    Attributes:
+        registry (SchoolRegistry): The registry whose records are shown.
+    """
+
+    def __init__(self, registry=None, parent=None):
+        super().__init__(parent)
+        self.registry = None
+        self._all = _RowKeys()
+        self._keys = self._all
+        self._accepts = None
+        if registry is not None:
+            self.setRegistry(registry)
+
+    def setRegistry(self, registry):
+        """
+        Shows every record of ``registry``, replacing the current rows, and follows its changes.
+
+        Args:
+            registry (SchoolRegistry): The registry to display.
+        """
+        self.beginResetModel()
+        if self.registry is not None:
+            self.registry.unsubscribe(self.recordChanged)
+        self.registry = registry
+        self._all = _RowKeys.ofRegistry(registry)
+        self._keys = self._all
+        self._accepts = None
+        registry.subscribe(self.recordChanged)
+        self.endResetModel()
+
+    def setFilter(self, keys, accepts=None):
+        """
+        Shows only the records in ``keys``; None shows every record.
+
+        Args:
+            keys (set or list): ``(type, ID)`` keys of the records to show, or None.
+                A set is shown in table order, a list (such as ranked search
+                results) in its own order.
+            accepts (callable): Called with the key of a record that is added or
+                edited while the filter is set; returns whether it should be shown.
+                Defaults to membership in ``keys``.
+        """
+        self.beginResetModel()
+        if keys is None:
+            self._keys = self._all
+            self._accepts = None
+        else:
+            position = self._all.rowOf
+            shown = [key for key in keys if position(key) is not None]
+            if not isinstance(keys, list):
+                shown.sort(key=position)
+            self._keys = _RowKeys([(len(shown), shown.__getitem__, _listIndex(shown))])
+            self._accepts = accepts or set(shown).__contains__
+        self.endResetModel()
+
+    def rowOf(self, key):
+        """
+        Returns the row showing the ``(type, ID)`` key, or None if it is not in the table.
+        """
+        return self._keys.rowOf(key)
+
+    def _appendRow(self, key):
+        row = len(self._keys)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.append(key)
+        self.endInsertRows()
+
+    def _removeRow(self, row):
+        # The last row moves into the removed one's place.
+        last = len(self._keys) - 1
+        self.beginRemoveRows(QModelIndex(), last, last)
+        self._keys.remove(row)
+        self.endRemoveRows()
+        if row != last:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+    def recordChanged(self, event, kind, record_id):
+        """
+        Patches the table after a registry change; subscribed by ``setRegistry``.
+
+        Inserts append one row, updates repaint one row and removals move the
+        last row into the removed one's place, all in constant time, with or
+        without a filter. While a filter is set, added and edited records are
+        shown or hidden according to its ``accepts`` callable.
+
+        Args:
+            event (str): 'inserted', 'updated' or 'removed'.
+            kind (str): 'student', 'instructor' or 'course'.
+            record_id (str): The ID of the changed record.
+        """
+        key = (RECORD_TYPES[kind], record_id)
+        filtered = self._keys is not self._all
+        if event == 'inserted':
+            if not filtered:
+                self._appendRow(key)
+                return
+            self._all.append(key)
+            if self._accepts(key):
+                self._appendRow(key)
+            return
+
+        row = self.rowOf(key)
+        if event == 'removed':
+            if filtered:
+                position = self._all.rowOf(key)
+                if position is not None:
+                    self._all.remove(position)
+            if row is not None:
+                self._removeRow(row)
+        elif not filtered or self._accepts(key):
+            if row is None:
+                self._appendRow(key)
+            else:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+        elif row is not None:
+            self._removeRow(row)
+
+    def recordKey(self, row):
+        """
+        Returns the ``(type, ID)`` key of a row, with type 'Student', 'Instructor' or 'Course'.
+        """
+        return self._keys[row]
+
+    def record(self, row):
+        """
+        Returns the student, instructor or course shown in a row, or None if it no longer exists.
+        """
+        record_type, record_id = self._keys[row]
+        if record_type == 'Student':
+            return self.registry.get_student(record_id)
+        if record_type == 'Instructor':
+            return self.registry.get_instructor(record_id)
+        return self.registry.get_course(record_id)
+
+    def rowValues(self, row):
+        """
+        Returns the cell texts of a row, in column order.
+        """
+        record = self.record(row)
+        if record is None:
+            return [self._keys[row][0], self._keys[row][1], '', '', '', '']
+        record_type = self._keys[row][0]
+        if record_type == 'Instructor':
+            return instructorRow(record)
+        row_of = studentRow if record_type == 'Student' else courseRow
+        return row_of(record, self.registry.enrollments)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.rowValues(index.row())[index.column()]
+        if role == SORT_ROLE:
+            value = self.rowValues(index.row())[index.column()]
+            # Sort ages numerically, with courses ('N/A') first.
+            if COLUMNS[index.column()] == 'Age':
+                return int(value) if value.isdigit() else -1
+            return value.lower()
+        return None
+
+
+class RecordSortProxy(QSortFilterProxyModel):
+    """
+    Proxy that sorts the record table by the clicked column.
+
+    Ages sort numerically; every other column sorts as text, ignoring case.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
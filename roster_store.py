@@ -0,0 +1,297 @@
+"""
+Columnar, array-backed roster store for analytics over large rosters.
+
+Records are held as parallel NumPy arrays (one row per student, instructor or
+course) and every string is interned once in a shared ``StringPool``, so the
+arrays only hold small integer indices. Enrollments are stored in CSR form:
+the courses of student row ``r`` are ``enroll_courses[enroll_indptr[r]:enroll_indptr[r + 1]]``.
+"""
+import sqlite3
+
+import numpy as np
+
+
+class StringPool:
+    """
+    Interns strings and hands out a stable integer index for each distinct value.
+    """
+    def __init__(self):
+        self.strings = []
+        self._index = {}
+
+    def intern(self, value):
+        """
+        Returns the index of ``value``, adding it to the pool if needed.
+        """
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def lookup(self, value):
+        """
+        Returns the index of ``value``, or -1 if it was never interned.
+        """
+        return self._index.get(value, -1)
+
+    def __getitem__(self, index):
+        return self.strings[index]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class _ColumnBuilder:
+    """
+    Accumulates rows as plain lists before they are frozen into arrays.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.ids = []
+        self.names = []
+        self.ages = []
+        self.emails = []
+        self.rows = {}
+
+    def add(self, record_id, name, age=0, email=''):
+        intern = self.pool.intern
+        self.rows[record_id] = len(self.ids)
+        self.ids.append(intern(record_id))
+        self.names.append(intern(name))
+        self.ages.append(age)
+        self.emails.append(intern(email))
+
+
+class RosterStore:
+    """
+    Immutable columnar snapshot of students, instructors, courses and enrollments.
+
+    Attributes
+    ----------
+    strings : StringPool
+        Interned IDs, names and emails referenced by the index arrays.
+    student_ids, student_names, student_emails : numpy.ndarray
+        ``int32`` indices into ``strings``, one entry per student row.
+    student_ages : numpy.ndarray
+        ``int32`` student ages.
+    instructor_ids, instructor_names, instructor_emails, instructor_ages : numpy.ndarray
+        The same columns for instructors.
+    course_ids, course_names : numpy.ndarray
+        ``int32`` indices into ``strings``, one entry per course row.
+    course_instructor : numpy.ndarray
+        ``int32`` instructor row teaching each course, or -1 if unassigned.
+    enroll_indptr : numpy.ndarray
+        ``int64`` CSR row pointer with one more entry than there are students.
+    enroll_courses : numpy.ndarray
+        ``int32`` course rows, grouped by student row.
+    """
+    def __init__(self, strings, students, instructors, courses, course_instructor, edges):
+        self.strings = strings
+        self.student_ids, self.student_names, self.student_ages, self.student_emails = self._freeze(students)
+        self.instructor_ids, self.instructor_names, self.instructor_ages, self.instructor_emails = self._freeze(instructors)
+        self.course_ids = np.array(courses.ids, dtype=np.int32)
+        self.course_names = np.array(courses.names, dtype=np.int32)
+        self.course_instructor = np.array(course_instructor, dtype=np.int32)
+        self._student_rows = students.rows
+        self._instructor_rows = instructors.rows
+        self._course_rows = courses.rows
+
+        student_rows = np.array(edges[0], dtype=np.int32)
+        course_rows = np.array(edges[1], dtype=np.int32)
+        order = np.argsort(student_rows, kind='stable')
+        self.enroll_courses = course_rows[order]
+        counts = np.bincount(student_rows, minlength=len(self.student_ids))
+        self.enroll_indptr = np.zeros(len(self.student_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.enroll_indptr[1:])
+
+    @staticmethod
+    def _freeze(columns):
+        return (np.array(columns.ids, dtype=np.int32),
+                np.array(columns.names, dtype=np.int32),
+                np.array(columns.ages, dtype=np.int32),
+                np.array(columns.emails, dtype=np.int32))
+
+    @classmethod
+    def from_objects(cls, students, instructors, courses, enrollments):
+        """
+        Builds a store from ``OOP.py`` ``Student``, ``Instructor`` and ``Course`` objects.
+
+        Parameters
+        ----------
+        students, instructors, courses : iterable
+            The model objects. Course assignments are read from ``Course.instructor``.
+        enrollments : OOP.EnrollmentGraph
+            The enrollments between the students and courses.
+
+        Returns
+        -------
+        RosterStore
+        """
+        pool = StringPool()
+        student_cols, instructor_cols, course_cols = _ColumnBuilder(pool), _ColumnBuilder(pool), _ColumnBuilder(pool)
+
+        for instructor in instructors:
+            instructor_cols.add(instructor.instructor_id, instructor.name, instructor.age, instructor._email)
+        course_instructor = []
+        for course in courses:
+            course_cols.add(course.course_id, course.course_name)
+            instructor_id = course.instructor.instructor_id if course.instructor is not None else None
+            course_instructor.append(instructor_cols.rows.get(instructor_id, -1))
+
+        edge_students, edge_courses = [], []
+        for student in students:
+            row = len(student_cols.ids)
+            student_cols.add(student.student_id, student.name, student.age, student._email)
+            for course_id in enrollments.courses_of(student.student_id):
+                course_row = course_cols.rows.get(course_id)
+                if course_row is not None:
+                    edge_students.append(row)
+                    edge_courses.append(course_row)
+
+        return cls(pool, student_cols, instructor_cols, course_cols, course_instructor, (edge_students, edge_courses))
+
+    @classmethod
+    def from_registry(cls, registry):
+        """
+        Builds a store from a ``SchoolRegistry``.
+        """
+        return cls.from_objects(registry.students.values(), registry.instructors.values(), registry.courses.values(),
+                                registry.enrollments)
+
+    @classmethod
+    def from_sqlite(cls, database):
+        """
+        Builds a store from the ``school.db`` tables.
+
+        Rows are streamed from the cursors, so no intermediate list of tuples
+        is built for any table.
+
+        Parameters
+        ----------
+        database : str or sqlite3.Connection
+            Path to the database file, or an open connection.
+
+        Returns
+        -------
+        RosterStore
+        """
+        conn = sqlite3.connect(database) if isinstance(database, str) else database
+        try:
+            pool = StringPool()
+            student_cols, instructor_cols, course_cols = _ColumnBuilder(pool), _ColumnBuilder(pool), _ColumnBuilder(pool)
+
+            for instructor_id, name, age, email in conn.execute(
+                    'SELECT instructor_id, name, age, email FROM instructors ORDER BY id'):
+                instructor_cols.add(instructor_id, name, age, email)
+            course_instructor = []
+            for course_id, course_name, instructor_id in conn.execute(
+                    'SELECT course_id, course_name, instructor_id FROM courses ORDER BY id'):
+                course_cols.add(course_id, course_name)
+                course_instructor.append(instructor_cols.rows.get(instructor_id, -1))
+            for student_id, name, age, email in conn.execute(
+                    'SELECT student_id, name, age, email FROM students ORDER BY id'):
+                student_cols.add(student_id, name, age, email)
+
+            edge_students, edge_courses = [], []
+            student_rows, course_rows = student_cols.rows, course_cols.rows
+            for student_id, course_id in conn.execute('SELECT student_id, course_id FROM registrations'):
+                student_row = student_rows.get(student_id)
+                course_row = course_rows.get(course_id)
+                if student_row is not None and course_row is not None:
+                    edge_students.append(student_row)
+                    edge_courses.append(course_row)
+        finally:
+            if conn is not database:
+                conn.close()
+
+        return cls(pool, student_cols, instructor_cols, course_cols, course_instructor, (edge_students, edge_courses))
+
+    @property
+    def num_students(self):
+        return len(self.student_ids)
+
+    @property
+    def num_instructors(self):
+        return len(self.instructor_ids)
+
+    @property
+    def num_courses(self):
+        return len(self.course_ids)
+
+    def student_row(self, student_id):
+        """
+        Returns the row of ``student_id``, or None if it is not in the store.
+        """
+        return self._student_rows.get(student_id)
+
+    def instructor_row(self, instructor_id):
+        """
+        Returns the row of ``instructor_id``, or None if it is not in the store.
+        """
+        return self._instructor_rows.get(instructor_id)
+
+    def course_row(self, course_id):
+        """
+        Returns the row of ``course_id``, or None if it is not in the store.
+        """
+        return self._course_rows.get(course_id)
+
+    def labels(self, indices):
+        """
+        Resolves an array of string-pool indices back to Python strings.
+        """
+        strings = self.strings.strings
+        return [strings[i] for i in indices]
+
+    def courses_of(self, student_row):
+        """
+        Returns the course rows the given student row is enrolled in.
+        """
+        return self.enroll_courses[self.enroll_indptr[student_row]:self.enroll_indptr[student_row + 1]]
+
+    def age_histogram(self, bins=10, range=None, instructors=False):
+        """
+        Computes a histogram of student (or instructor) ages.
+
+        Parameters
+        ----------
+        bins : int or sequence of scalars
+            Passed through to ``numpy.histogram``.
+        range : tuple, optional
+            Lower and upper range of the bins.
+        instructors : bool
+            Histogram instructor ages instead of student ages.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            The bin counts and the bin edges.
+        """
+        ages = self.instructor_ages if instructors else self.student_ages
+        return np.histogram(ages, bins=bins, range=range)
+
+    def enrollment_counts(self):
+        """
+        Returns the number of enrolled students per course row.
+        """
+        return np.bincount(self.enroll_courses, minlength=self.num_courses)
+
+    def registration_counts(self):
+        """
+        Returns the number of registered courses per student row.
+        """
+        return np.diff(self.enroll_indptr)
+
+    def instructor_load(self):
+        """
+        Returns the number of courses taught per instructor row.
+        """
+        assigned = self.course_instructor[self.course_instructor >= 0]
+        return np.bincount(assigned, minlength=self.num_instructors)
+
+    def students_without_registrations(self):
+        """
+        Returns the rows of students who are not registered for any course.
+        """
+        return np.flatnonzero(self.enroll_indptr[1:] == self.enroll_indptr[:-1])
@@ -0,0 +1,528 @@
+"""
+Headless asyncio HTTP API over ``school.db``.
+
+Serves students, instructors, courses and registrations as JSON using only
+the standard library: a small HTTP/1.1 server on ``asyncio`` streams with
+keep-alive. Records use the field names of ``OOP.to_record``, and bulk
+inserts are validated with ``Person.validate_many`` and written with the
+same statements as ``school_db.import_csv``, so the API agrees with the
+model and with the Tkinter app.
+
+SQL never runs on the event loop. Queries go to a ``school_db.QueryExecutor``
+with a fixed number of worker threads, and no more jobs than workers are
+handed to it at once; further requests wait on the loop. Concurrent
+identical reads share one query, and single-record lookups made in the
+same loop iteration are batched into one ``IN (...)`` query per table.
+
+Endpoints::
+
+    GET  /students, /instructors, /courses      ?after=<id>&limit=<n>, ordered by ID
+    GET  /students/<id>, /instructors/<id>, /courses/<id>
+    POST /students/lookup (and the others)      {"ids": [...]} -> {"found": [...], "missing": [...]}
+    POST /students, /instructors, /courses      a JSON list of records, inserted in one transaction
+    GET  /registrations                         ?student_id=<id> or ?course_id=<id>
+    POST /registrations                         a JSON list of {"student_id": ..., "course_id": ...}
+    GET  /search                                ?q=<text>, full-text with a fuzzy fallback
+    GET  /stats                                 request, query, batching and coalescing counters
+
+Usage::
+
+    python school_api.py [--host 127.0.0.1] [--port 8080] [--db school.db] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import logging
+from collections import Counter
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from OOP import Person
+from db_migrations import migrate
+from school_db import (DATABASE, ConnectionPool, QueryExecutor, fuzzy_search, insert_rows, registration_errors,
+                       search_records)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 4
+DEFAULT_PAGE = 100
+MAX_PAGE = 1000
+# IDs per ``IN (...)`` query, well under SQLite's bound-parameter limit.
+LOOKUP_BATCH = 500
+MAX_BODY = 16 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+# Resource name -> record type, table, ID column and the columns of a record, in ``to_record`` order.
+RESOURCES = {
+    'students': ('student', 'students', 'student_id', ('student_id', 'name', 'age', 'email')),
+    'instructors': ('instructor', 'instructors', 'instructor_id', ('instructor_id', 'name', 'age', 'email')),
+    'courses': ('course', 'courses', 'course_id', ('course_id', 'course_name', 'instructor_id')),
+}
+
+
+class HttpError(Exception):
+    """
+    An error reported to the client with an HTTP status and a JSON ``error`` message.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _records(conn, resource, rows):
+    # Turns rows of RESOURCES columns into records; courses also get their enrolled student IDs.
+    kind, _table, _id_column, columns = RESOURCES[resource]
+    records = [{'type': kind, **dict(zip(columns, row))} for row in rows]
+    if resource == 'courses' and records:
+        enrolled = {record['course_id']: record.setdefault('enrolled_students', []) for record in records}
+        marks = ', '.join('?' * len(enrolled))
+        for course_id, student_id in conn.execute(
+                f'SELECT course_id, student_id FROM registrations WHERE course_id IN ({marks}) ORDER BY id',
+                list(enrolled)):
+            enrolled[course_id].append(student_id)
+    return records
+
+
+def fetch_records(conn, resource, ids):
+    """
+    Reads the records of a resource by ID, ``LOOKUP_BATCH`` IDs per query.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    resource : str
+        'students', 'instructors' or 'courses'.
+    ids : list of str
+        The IDs to read.
+
+    Returns
+    -------
+    dict
+        Records by ID; IDs that do not exist are left out.
+    """
+    _kind, table, id_column, columns = RESOURCES[resource]
+    found = {}
+    for start in range(0, len(ids), LOOKUP_BATCH):
+        chunk = ids[start:start + LOOKUP_BATCH]
+        rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table} "
+                            f"WHERE {id_column} IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+        for record in _records(conn, resource, rows):
+            found[record[id_column]] = record
+    return found
+
+
+def list_records(conn, resource, after=None, limit=DEFAULT_PAGE):
+    """
+    Reads one page of a resource in ID order, seeking on the unique ID index.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    resource : str
+        'students', 'instructors' or 'courses'.
+    after : str, optional
+        The last ID of the previous page; ``None`` starts from the first.
+    limit : int
+        The maximum number of records.
+
+    Returns
+    -------
+    list of dict
+        The records.
+    """
+    _kind, table, id_column, columns = RESOURCES[resource]
+    rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE {id_column} > ? "
+                        f"ORDER BY {id_column} LIMIT ?", ('' if after is None else after, limit)).fetchall()
+    return _records(conn, resource, rows)
+
+
+def find_registrations(conn, student_id=None, course_id=None):
+    """
+    Reads the registrations of one student or of one course.
+
+    Returns
+    -------
+    list of dict
+        ``{'student_id': ..., 'course_id': ...}`` pairs in registration order.
+    """
+    column, value = ('student_id', student_id) if student_id is not None else ('course_id', course_id)
+    rows = conn.execute(f'SELECT student_id, course_id FROM registrations WHERE {column} = ? ORDER BY id', (value,))
+    return [{'student_id': student, 'course_id': course} for student, course in rows]
+
+
+def find_matches(conn, text):
+    """
+    Searches names, emails and IDs, falling back to the closest names when nothing matches.
+
+    Returns
+    -------
+    dict
+        ``results``: records with ``type``, ``id`` and ``name`` (and ``score`` for
+        fuzzy matches), and ``fuzzy``: whether the results are closest names.
+    """
+    results = search_records(conn, text)
+    if results:
+        return {'fuzzy': False, 'results': [{'type': kind.lower(), 'id': record_id, 'name': name}
+                                            for record_id, name, kind in results]}
+    return {'fuzzy': True, 'results': [{'type': kind.lower(), 'id': record_id, 'name': name, 'score': score}
+                                       for score, record_id, name, kind in fuzzy_search(conn, text)]}
+
+
+def _record_errors(resource, records):
+    # Validation messages per record, as lists; students and instructors use Person.validate_many.
+    if resource in ('students', 'instructors'):
+        id_column = RESOURCES[resource][2]
+        errors = Person.validate_many(records)
+        for record, messages in zip(records, errors):
+            if not isinstance(record.get(id_column), str) or not record[id_column]:
+                messages.append(f'Missing {id_column}')
+            if not isinstance(record.get('name'), str) or not record['name']:
+                messages.append('Missing name')
+        return errors
+    fields = ('course_id', 'course_name', 'instructor_id') if resource == 'courses' else ('student_id', 'course_id')
+    return [[f'Missing {field}' for field in fields if not isinstance(record.get(field), str) or not record[field]]
+            for record in records]
+
+
+def insert_records(conn, resource, records):
+    """
+    Validates and inserts a list of records in one transaction.
+
+    Records that fail validation, and registrations whose student or course
+    does not exist, are reported and skipped; records whose ID (or
+    student/course pair) already exists are counted as duplicates.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database. It must not be inside a transaction.
+    resource : str
+        'students', 'instructors', 'courses' or 'registrations'.
+    records : list of dict
+        Records with the fields of ``OOP.to_record``; registrations have
+        ``student_id`` and ``course_id``.
+
+    Returns
+    -------
+    dict
+        ``inserted`` and ``duplicates`` counts, and ``rejected``: a list of
+        ``{'index': ..., 'errors': [...]}`` for the invalid records and unknown references.
+    """
+    rejected = []
+    rows = []
+    indexes = []
+    for index, (record, errors) in enumerate(zip(records, _record_errors(resource, records))):
+        if errors:
+            rejected.append({'index': index, 'errors': errors})
+        elif resource == 'courses':
+            rows.append((record['course_name'], record['course_id'], record['instructor_id']))
+        elif resource == 'registrations':
+            rows.append((record['student_id'], record['course_id']))
+            indexes.append(index)
+        else:
+            id_column = RESOURCES[resource][2]
+            rows.append((record['name'], record['age'], record['email'], record[id_column]))
+    kind = 'registration' if resource == 'registrations' else RESOURCES[resource][0]
+    with conn:
+        if resource == 'registrations' and rows:
+            checked = registration_errors(conn, rows)
+            rejected.extend({'index': index, 'errors': errors} for index, errors in zip(indexes, checked) if errors)
+            rejected.sort(key=lambda item: item['index'])
+            rows = [row for row, errors in zip(rows, checked) if not errors]
+        inserted = insert_rows(conn, kind, rows) if rows else 0
+    return {'inserted': inserted, 'duplicates': len(rows) - inserted, 'rejected': rejected}
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+class SchoolApi:
+    """
+    Request handling for the HTTP API; see the module docstring for the endpoints.
+
+    Attributes
+    ----------
+    executor : QueryExecutor
+        The worker threads that run every query.
+    stats : collections.Counter
+        Counts of ``requests``, ``queries`` run, single-record ``lookups``,
+        lookup ``batches`` and reads ``coalesced`` into a query already in flight.
+    """
+    def __init__(self, pool, workers=DEFAULT_WORKERS):
+        self.executor = QueryExecutor(pool, workers)
+        self.stats = Counter()
+        self._slots = asyncio.Semaphore(workers)
+        self._inflight = {}
+        self._lookups = {resource: {} for resource in RESOURCES}
+
+    async def query(self, work, *args):
+        """
+        Runs ``work(conn, *args)`` on the executor once a worker is free.
+        """
+        async with self._slots:
+            self.stats['queries'] += 1
+            return await asyncio.wrap_future(self.executor.submit(work, *args).future)
+
+    async def read(self, key, work, *args):
+        """
+        Runs a read, or joins the identical read (same ``key``) already in flight.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self.query(work, *args))
+            task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def lookup(self, resource, record_id):
+        """
+        Returns a future for one record, read together with the other lookups of this loop iteration.
+
+        The future resolves to the record, or None if it does not exist.
+        """
+        self.stats['lookups'] += 1
+        waiting = self._lookups[resource]
+        future = waiting.get(record_id)
+        if future is None:
+            future = waiting[record_id] = asyncio.get_running_loop().create_future()
+            if len(waiting) == 1:
+                asyncio.get_running_loop().call_soon(self._flush_lookups, resource)
+        else:
+            self.stats['coalesced'] += 1
+        return asyncio.shield(future)
+
+    def _flush_lookups(self, resource):
+        waiting, self._lookups[resource] = self._lookups[resource], {}
+        ids = list(waiting)
+        for start in range(0, len(ids), LOOKUP_BATCH):
+            chunk = ids[start:start + LOOKUP_BATCH]
+            self.stats['batches'] += 1
+            task = asyncio.ensure_future(self.query(fetch_records, resource, chunk))
+            task.add_done_callback(partial(self._deliver_lookups, {record_id: waiting[record_id] for record_id in chunk}))
+
+    @staticmethod
+    def _deliver_lookups(futures, task):
+        if task.cancelled():
+            for future in futures.values():
+                future.cancel()
+            return
+        error = task.exception()
+        found = {} if error is not None else task.result()
+        for record_id, future in futures.items():
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(found.get(record_id))
+
+    async def handle(self, reader, writer):
+        """
+        Serves one client connection; the ``asyncio.start_server`` callback.
+
+        Requests on a connection are answered in order. HTTP/1.1 connections
+        stay open until the client sends ``Connection: close``; request bodies
+        need a ``Content-Length``.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    writer.write(_response(HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line'}, False))
+                    break
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if 'chunked' in headers.get('transfer-encoding', '').lower():
+                    status, payload, keep_alive = HTTPStatus.LENGTH_REQUIRED, {'error': 'Content-Length required'}, False
+                else:
+                    try:
+                        length = int(headers.get('content-length') or 0)
+                    except ValueError:
+                        length = -1
+                    if not 0 <= length <= MAX_BODY:
+                        status, payload, keep_alive = (HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                                       {'error': 'Missing or oversized request body'}, False)
+                    else:
+                        body = await reader.readexactly(length) if length else b''
+                        status, payload = await self.dispatch(method, target, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        """
+        Answers one request.
+
+        Returns
+        -------
+        tuple
+            The ``HTTPStatus`` and the JSON-serializable response payload.
+        """
+        self.stats['requests'] += 1
+        parts = urlsplit(target)
+        path = [unquote(part) for part in parts.path.split('/') if part]
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        try:
+            if method not in ('GET', 'POST'):
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'Method not allowed: {method}')
+            data = None
+            if method == 'POST':
+                try:
+                    data = json.loads(body or b'null')
+                except ValueError:
+                    raise HttpError(HTTPStatus.BAD_REQUEST, 'Request body is not valid JSON')
+            return await self.route(method, path, query, data)
+        except HttpError as e:
+            return e.status, {'error': str(e)}
+        except Exception:
+            # The details stay in the server log; they can name tables, paths or data.
+            logger.exception('Error answering %s %s', method, target)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal server error'}
+
+    async def route(self, method, path, query, data):
+        """
+        Calls the endpoint for a request; see the module docstring.
+
+        Raises
+        ------
+        HttpError
+            If the path, method or input is not valid.
+        """
+        if path == ['stats'] and method == 'GET':
+            return HTTPStatus.OK, dict(self.stats)
+
+        if path == ['search'] and method == 'GET':
+            text = query.get('q', '').strip()
+            if not text:
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'Missing search text: q')
+            return HTTPStatus.OK, await self.read(('search', text), find_matches, text)
+
+        if path == ['registrations']:
+            if method == 'POST':
+                return HTTPStatus.OK, await self.query(insert_records, 'registrations', _record_list(data))
+            student_id, course_id = query.get('student_id'), query.get('course_id')
+            if (student_id is None) == (course_id is None):
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'Give exactly one of student_id and course_id')
+            return HTTPStatus.OK, await self.read(('registrations', student_id, course_id),
+                                                  find_registrations, student_id, course_id)
+
+        if not path or path[0] not in RESOURCES or len(path) > 2:
+            raise HttpError(HTTPStatus.NOT_FOUND, 'No such endpoint')
+        resource = path[0]
+
+        if len(path) == 1:
+            if method == 'POST':
+                return HTTPStatus.OK, await self.query(insert_records, resource, _record_list(data))
+            try:
+                limit = int(query.get('limit', DEFAULT_PAGE))
+            except ValueError:
+                limit = 0
+            if not 1 <= limit <= MAX_PAGE:
+                raise HttpError(HTTPStatus.BAD_REQUEST, f'limit must be between 1 and {MAX_PAGE}')
+            after = query.get('after')
+            return HTTPStatus.OK, await self.read(('list', resource, after, limit), list_records, resource, after, limit)
+
+        if path[1] == 'lookup' and method == 'POST':
+            ids = data.get('ids') if isinstance(data, dict) else None
+            if not isinstance(ids, list) or not all(isinstance(record_id, str) for record_id in ids):
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected {"ids": [...]} with string IDs')
+            ids = list(dict.fromkeys(ids))
+            records = await asyncio.gather(*(self.lookup(resource, record_id) for record_id in ids))
+            return HTTPStatus.OK, {'found': [record for record in records if record is not None],
+                                   'missing': [record_id for record_id, record in zip(ids, records) if record is None]}
+
+        if method != 'GET':
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'Method not allowed: {method}')
+        record = await self.lookup(resource, path[1])
+        if record is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f'{RESOURCES[resource][0].capitalize()} not found: {path[1]}')
+        return HTTPStatus.OK, record
+
+    def close(self):
+        """
+        Stops the worker threads, cancelling queries that have not finished.
+        """
+        self.executor.shutdown()
+
+
+def _record_list(data):
+    if not isinstance(data, list) or not all(isinstance(record, dict) for record in data):
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected a JSON list of records')
+    return data
+
+
+async def serve(api, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Starts listening for API requests.
+
+    Parameters
+    ----------
+    api : SchoolApi
+        The request handler.
+    host : str
+        The address to bind; the loopback address by default.
+    port : int
+        The port to bind; 0 picks a free one.
+
+    Returns
+    -------
+    asyncio.Server
+        The running server; ``server.sockets[0].getsockname()`` gives the bound address.
+    """
+    return await asyncio.start_server(api.handle, host, port)
+
+
+async def _main(arguments):
+    pool = ConnectionPool(arguments.db, size=arguments.workers)
+    with pool.connection() as conn:
+        migrate(conn)
+    api = SchoolApi(pool, arguments.workers)
+    server = await serve(api, arguments.host, arguments.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f'Serving {arguments.db} on http://{host}:{port}', flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+        pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve school.db as a JSON HTTP API.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--db', default=DATABASE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
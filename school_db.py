@@ -0,0 +1,952 @@
+"""
+Data-access helpers for ``school.db`` shared by the Tkinter app and tools.
+"""
+import csv
+import gzip
+import os
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+from OOP import Person
+from text_search import FUZZY_CANDIDATES, FUZZY_LIMIT, edit_distance, max_distance, rank_names
+
+DATABASE = 'school.db'
+
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -64000),
+    ('mmap_size', 268435456),
+    ('temp_store', 'MEMORY'),
+)
+
+
+class ConnectionPool:
+    """
+    A small pool of reusable SQLite connections.
+
+    Connections are opened lazily, up to ``size`` of them, with WAL journaling,
+    tuned pragmas and a busy timeout. A connection is used by one thread at a
+    time but may be handed to any thread, so the pool is safe to share with
+    background workers.
+
+    Attributes
+    ----------
+    path : str
+        The database file.
+    size : int
+        The maximum number of open connections.
+    busy_timeout : float
+        Seconds a connection waits on a locked database before failing.
+    """
+    def __init__(self, path=DATABASE, size=4, busy_timeout=5.0):
+        self.path = path
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        for name, value in PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def acquire(self, timeout=None):
+        """
+        Takes a connection from the pool, opening one if the pool is not full.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for a connection when all are in use.
+
+        Returns
+        -------
+        sqlite3.Connection
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError('Connection pool is closed')
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except sqlite3.Error:
+                    self._opened -= 1
+                    raise
+        return self._idle.get(timeout=timeout)
+
+    def release(self, conn):
+        """
+        Returns a connection to the pool, rolling back any unfinished transaction.
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the duration of a ``with`` block.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Borrows a connection and commits on success or rolls back on error.
+        """
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def close(self):
+        """
+        Closes every idle connection; connections still in use close on release.
+        """
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class Cancelled(Exception):
+    """
+    Raised by a ``QueryJob`` that was cancelled while it ran.
+    """
+
+
+class QueryJob:
+    """
+    A unit of database work submitted to a ``QueryExecutor``.
+
+    Attributes
+    ----------
+    future : concurrent.futures.Future
+        Resolves to the work's return value, or raises its exception
+        (``Cancelled`` if the job was cancelled while it ran).
+    progress : tuple or None
+        The last ``(count, fraction_done)`` passed to ``report``.
+    """
+    def __init__(self):
+        self.future = None
+        self.progress = None
+        self._cancelled = threading.Event()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        """
+        Whether ``cancel`` has been called.
+        """
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Cancels the job.
+
+        A job still waiting for a worker never runs. A running job has its
+        current SQL statement interrupted, and its next ``report`` call raises
+        ``Cancelled``, so batched work stops at the end of the current batch.
+        """
+        self._cancelled.set()
+        self.future.cancel()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def report(self, count, fraction):
+        """
+        Records progress; passed to the work as its ``progress`` callback.
+
+        Raises
+        ------
+        Cancelled
+            If the job has been cancelled.
+        """
+        if self.cancelled:
+            raise Cancelled()
+        self.progress = (count, fraction)
+
+    def done(self):
+        """
+        Returns True once the job has finished, failed or been cancelled.
+        """
+        return self.future.done()
+
+    def result(self):
+        """
+        Returns the work's return value, raising its exception if it failed.
+        """
+        return self.future.result()
+
+
+class QueryExecutor:
+    """
+    Runs database work on background threads so a GUI never blocks on SQLite.
+
+    Each job borrows a connection from ``pool`` for as long as it runs, and
+    hands back a ``QueryJob`` whose future the caller polls from its own
+    thread; nothing here touches GUI objects.
+
+    Attributes
+    ----------
+    pool : ConnectionPool
+        The pool jobs borrow their connections from.
+    """
+    def __init__(self, pool, workers=2):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='school-db')
+        self._jobs = set()
+        self._lock = threading.Lock()
+
+    def submit(self, work, *args, with_progress=False, **kwargs):
+        """
+        Schedules ``work(conn, *args, **kwargs)`` on a worker thread.
+
+        Parameters
+        ----------
+        work : callable
+            The function to run. Its first argument is a connection from the pool.
+        with_progress : bool
+            Also pass ``progress=job.report``, for work that reports progress
+            the way ``import_csv`` and ``export_csv`` do.
+
+        Returns
+        -------
+        QueryJob
+        """
+        job = QueryJob()
+        if with_progress:
+            kwargs['progress'] = job.report
+        with self._lock:
+            self._jobs.add(job)
+        job.future = self._executor.submit(self._run, job, work, args, kwargs)
+        job.future.add_done_callback(lambda _future: self._forget(job))
+        return job
+
+    def _forget(self, job):
+        with self._lock:
+            self._jobs.discard(job)
+
+    def _run(self, job, work, args, kwargs):
+        if job.cancelled:
+            raise Cancelled()
+        with self.pool.connection() as conn:
+            with job._lock:
+                job._conn = conn
+            try:
+                return work(conn, *args, **kwargs)
+            except sqlite3.OperationalError:
+                # conn.interrupt() surfaces as an 'interrupted' OperationalError.
+                if job.cancelled:
+                    raise Cancelled() from None
+                raise
+            finally:
+                with job._lock:
+                    job._conn = None
+
+    def shutdown(self, cancel=True):
+        """
+        Stops the worker threads, waiting for running jobs to finish.
+
+        Parameters
+        ----------
+        cancel : bool
+            Cancel every unfinished job first.
+        """
+        if cancel:
+            with self._lock:
+                jobs = list(self._jobs)
+            for job in jobs:
+                job.cancel()
+        self._executor.shutdown(wait=True)
+
+
+NAME_CACHE_SIZE = 1024
+
+_ID_BY_NAME = {
+    'student': 'SELECT student_id FROM students WHERE name = ?',
+    'instructor': 'SELECT instructor_id FROM instructors WHERE name = ?',
+    'course': 'SELECT course_id FROM courses WHERE course_name = ?',
+}
+
+
+class NameCache:
+    """
+    Bounded read-through LRU cache of name -> ID lookups.
+
+    ``resolve`` answers repeated lookups of the same names (the dropdown
+    selections of the 'Register for Course' tab) from memory, and evicts the
+    least recently used name once ``maxsize`` names are cached. Names that do
+    not exist are not cached. Whoever writes a name must call ``invalidate``
+    for it, since the cache cannot see changes made to the database.
+
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of cached names.
+    hits : int
+        Lookups answered from the cache.
+    misses : int
+        Lookups that had to query the database.
+    """
+    def __init__(self, maxsize=NAME_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def resolve(self, conn, kind, name):
+        """
+        Returns the ID of the record named ``name``, reading it through the cache.
+
+        Parameters
+        ----------
+        conn : sqlite3.Connection
+            The connection to query on a miss.
+        kind : str
+            'student', 'instructor' or 'course'.
+        name : str
+            The student or instructor name, or the course name.
+
+        Returns
+        -------
+        str or None
+            The ID of the first record with that name, or None if there is none.
+        """
+        key = (kind, name)
+        with self._lock:
+            record_id = self._ids.get(key)
+            if record_id is not None:
+                self._ids.move_to_end(key)
+                self.hits += 1
+                return record_id
+            self.misses += 1
+        row = conn.execute(_ID_BY_NAME[kind], (name,)).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            self._ids[key] = row[0]
+            self._ids.move_to_end(key)
+            if len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+        return row[0]
+
+    def invalidate(self, kind=None, *names):
+        """
+        Forgets cached lookups after records were added, renamed or deleted.
+
+        Parameters
+        ----------
+        kind : str, optional
+            'student', 'instructor' or 'course'; None forgets every lookup.
+        *names : str
+            The names whose lookups to forget; none forgets every name of ``kind``.
+        """
+        with self._lock:
+            if kind is None:
+                self._ids.clear()
+            elif names:
+                for name in names:
+                    self._ids.pop((kind, name), None)
+            else:
+                for key in [key for key in self._ids if key[0] == kind]:
+                    del self._ids[key]
+
+    def info(self):
+        """
+        Returns the ``hits``, ``misses``, ``size`` and ``maxsize`` of the cache, for sizing it.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._ids), 'maxsize': self.maxsize}
+
+
+IMPORT_BATCH = 10000
+MAX_REPORTED_ERRORS = 100
+
+_INSERTS = {
+    'student': 'INSERT OR IGNORE INTO students (name, age, email, student_id) VALUES (?, ?, ?, ?)',
+    'instructor': 'INSERT OR IGNORE INTO instructors (name, age, email, instructor_id) VALUES (?, ?, ?, ?)',
+    'course': 'INSERT OR IGNORE INTO courses (course_name, course_id, instructor_id) VALUES (?, ?, ?)',
+    # Only registrations whose student and course exist, so course_stats never counts an orphan.
+    'registration': 'INSERT OR IGNORE INTO registrations (student_id, course_id) SELECT ?1, ?2 '
+                    'WHERE EXISTS (SELECT 1 FROM students WHERE student_id = ?1) '
+                    'AND EXISTS (SELECT 1 FROM courses WHERE course_id = ?2)',
+}
+
+
+def insert_rows(conn, kind, rows):
+    """
+    Inserts rows into the table for ``kind``, skipping rows whose ID already exists.
+
+    Registrations are also skipped when their student or course does not
+    exist, so the trigger-maintained counts only ever count real enrollments.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection; the caller commits.
+    kind : str
+        'student', 'instructor', 'course' or 'registration'.
+    rows : list of tuple
+        ``(name, age, email, id)`` for students and instructors,
+        ``(course_name, course_id, instructor_id)`` for courses and
+        ``(student_id, course_id)`` for registrations.
+
+    Returns
+    -------
+    int
+        The number of rows inserted.
+    """
+    # rowcount, unlike total_changes, leaves out the rows written by the search triggers.
+    return conn.executemany(_INSERTS[kind], rows).rowcount
+
+
+def _existing_ids(conn, table, id_column, ids, chunk=500):
+    # The subset of ids found in table, looked up chunk IDs per query.
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), chunk):
+        part = ids[start:start + chunk]
+        found.update(row[0] for row in conn.execute(
+            f"SELECT {id_column} FROM {table} WHERE {id_column} IN ({', '.join('?' * len(part))})", part))
+    return found
+
+
+def registration_errors(conn, rows):
+    """
+    Checks that the student and course of each registration exist.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    rows : list of tuple
+        ``(student_id, course_id)`` pairs.
+
+    Returns
+    -------
+    list of list of str
+        The error messages for each pair, in order; empty for a valid pair.
+    """
+    students = _existing_ids(conn, 'students', 'student_id', {student_id for student_id, _ in rows})
+    courses = _existing_ids(conn, 'courses', 'course_id', {course_id for _, course_id in rows})
+    errors = []
+    for student_id, course_id in rows:
+        messages = []
+        if student_id not in students:
+            messages.append(f'Unknown student ID {student_id}')
+        if course_id not in courses:
+            messages.append(f'Unknown course ID {course_id}')
+        errors.append(messages)
+    return errors
+
+
+def read_id_file(filename):
+    """
+    Reads student IDs from a text or CSV file for ``enroll_students``.
+
+    Each line holds one ID, or a CSV row whose first cell is the ID (so the
+    'ID' column of an exported roster works too). Blank lines and an ``ID`` or
+    ``Student ID`` header line are skipped.
+
+    Parameters
+    ----------
+    filename : str
+        The file to read.
+
+    Returns
+    -------
+    list of str
+        The IDs in file order, duplicates included.
+    """
+    with open(filename, newline='', encoding='utf-8-sig') as file:
+        ids = [row[0].strip() for row in csv.reader(file) if row and row[0].strip()]
+    if ids and _normalize_header(ids[0]) in ('id', 'student_id'):
+        del ids[0]
+    return ids
+
+
+def enroll_students(conn, course_id, student_ids):
+    """
+    Registers many students for one course in a single transaction.
+
+    The IDs are loaded into a temporary table, which also drops repeated IDs,
+    and one join sorts them into unknown students, existing registrations
+    and new ones. Only the new registrations are inserted, with one
+    ``executemany``, and the transaction is committed once.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database. It must not be inside a transaction.
+    course_id : str
+        The course to enroll the students in.
+    student_ids : iterable of str
+        The IDs of the students to enroll.
+
+    Returns
+    -------
+    dict
+        ``enrolled``, ``already_enrolled`` and ``repeated`` (IDs given more than
+        once) counts, and ``unknown``: the IDs that match no student.
+
+    Raises
+    ------
+    ValueError
+        If there is no course ``course_id``.
+    """
+    if conn.execute('SELECT 1 FROM courses WHERE course_id = ?', (course_id,)).fetchone() is None:
+        raise ValueError(f'No course with ID {course_id!r}')
+    student_ids = list(student_ids)
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS enroll_ids (student_id TEXT PRIMARY KEY)')
+    with conn:
+        conn.execute('DELETE FROM temp.enroll_ids')
+        conn.executemany('INSERT OR IGNORE INTO temp.enroll_ids (student_id) VALUES (?)',
+                         ((student_id,) for student_id in student_ids))
+        unknown, enrolled, new = [], 0, []
+        for student_id, known, registered in conn.execute(
+                'SELECT e.student_id, s.student_id IS NOT NULL, r.student_id IS NOT NULL FROM temp.enroll_ids e '
+                'LEFT JOIN students s ON s.student_id = e.student_id '
+                'LEFT JOIN registrations r ON r.student_id = e.student_id AND r.course_id = ?', (course_id,)):
+            if not known:
+                unknown.append(student_id)
+            elif registered:
+                enrolled += 1
+            else:
+                new.append((student_id, course_id))
+        inserted = insert_rows(conn, 'registration', new) if new else 0
+        conn.execute('DELETE FROM temp.enroll_ids')
+    distinct = len(unknown) + enrolled + len(new)
+    return {'enrolled': inserted, 'already_enrolled': enrolled + len(new) - inserted,
+            'repeated': len(student_ids) - distinct, 'unknown': unknown}
+
+
+def _normalize_header(name):
+    return (name or '').strip().lower().replace(' ', '_')
+
+
+def _to_record(row):
+    age = (row.get('age') or '').strip()
+    return {
+        'type': (row.get('type') or '').strip().lower(),
+        'id': (row.get('id') or '').strip(),
+        'name': (row.get('name') or '').strip(),
+        'age': int(age) if age.isdigit() else age,
+        'email': (row.get('email') or '').strip(),
+        'instructor_id': (row.get('instructor_id') or '').strip(),
+        'course_id': (row.get('course_id') or '').strip(),
+    }
+
+
+def import_csv(conn, filename, batch_size=IMPORT_BATCH, progress=None):
+    """
+    Streams a roster CSV into the students, instructors, courses and registrations tables.
+
+    The file needs a header row; columns are matched by name, ignoring case
+    and spaces: ``Type`` (Student, Instructor or Course), ``ID``, ``Name``,
+    ``Age``, ``Email``, ``Instructor ID`` for courses and ``Course ID`` for
+    registrations (whose ``ID`` is the student ID). Students and
+    instructors are checked with ``Person.validate_many``. Valid rows are
+    written with ``executemany``, one transaction per batch; rows whose ID
+    already exists are skipped. Registrations whose student or course does
+    not exist once the batch's other rows are written are rejected.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database to import into. It must not be
+        inside a transaction.
+    filename : str
+        Path of the CSV file.
+    batch_size : int
+        Rows validated and committed per transaction.
+    progress : callable, optional
+        Called after each batch as ``progress(rows_read, fraction_of_file_read)``.
+        An exception it raises stops the import; the batches already
+        committed are kept.
+
+    Returns
+    -------
+    dict
+        Counts of inserted ``students``, ``instructors``, ``courses`` and ``registrations``, the
+        number of ``duplicates`` skipped, the number of ``rejected`` rows, and
+        ``errors``: up to ``MAX_REPORTED_ERRORS`` ``(line, messages)`` pairs.
+    """
+    report = {'students': 0, 'instructors': 0, 'courses': 0, 'registrations': 0,
+              'duplicates': 0, 'rejected': 0, 'errors': []}
+    total_size = os.path.getsize(filename) or 1
+    rows_read = 0
+
+    with open(filename, 'r', newline='') as file:
+        reader = csv.DictReader(file)
+        reader.fieldnames = [_normalize_header(name) for name in reader.fieldnames or []]
+        while True:
+            batch = [_to_record(row) for row in islice(reader, batch_size)]
+            if not batch:
+                break
+            first_line = rows_read + 2
+            rows_read += len(batch)
+
+            values = {'student': [], 'instructor': [], 'course': [], 'registration': []}
+            registration_lines = []
+            for offset, (record, errors) in enumerate(zip(batch, Person.validate_many(batch))):
+                kind = record['type']
+                if kind == 'course':
+                    errors = [] if record['instructor_id'] else ['Missing instructor ID']
+                elif kind == 'registration':
+                    errors = [] if record['course_id'] else ['Missing course ID']
+                elif kind not in values:
+                    errors = [f"Unknown record type: {record['type'] or '(blank)'}"]
+                if not record['id']:
+                    errors = errors + ['Missing ID']
+                if errors:
+                    report['rejected'] += 1
+                    if len(report['errors']) < MAX_REPORTED_ERRORS:
+                        report['errors'].append((first_line + offset, errors))
+                elif kind == 'course':
+                    values['course'].append((record['name'], record['id'], record['instructor_id']))
+                elif kind == 'registration':
+                    values['registration'].append((record['id'], record['course_id']))
+                    registration_lines.append(first_line + offset)
+                else:
+                    values[kind].append((record['name'], record['age'], record['email'], record['id']))
+
+            with conn:
+                for kind, rows in values.items():
+                    if kind == 'registration' and rows:
+                        checked = registration_errors(conn, rows)
+                        for line, errors in zip(registration_lines, checked):
+                            if errors:
+                                report['rejected'] += 1
+                                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                                    report['errors'].append((line, errors))
+                        rows = [row for row, errors in zip(rows, checked) if not errors]
+                    if rows:
+                        inserted = insert_rows(conn, kind, rows)
+                        report[kind + 's'] += inserted
+                        report['duplicates'] += len(rows) - inserted
+            if progress is not None:
+                progress(rows_read, min(file.buffer.tell() / total_size, 1.0))
+    return report
+
+
+EXPORT_BATCH = 5000
+EXPORT_HEADER = ['Type', 'ID', 'Name', 'Age', 'Email', 'Instructor ID', 'Course ID']
+
+_EXPORT_QUERIES = [
+    ('students', "SELECT 'Student', student_id, name, age, email, '', '' FROM students ORDER BY id"),
+    ('instructors', "SELECT 'Instructor', instructor_id, name, age, email, '', '' FROM instructors ORDER BY id"),
+    ('courses', "SELECT 'Course', course_id, course_name, '', '', instructor_id, '' FROM courses ORDER BY id"),
+    ('registrations', "SELECT 'Registration', student_id, '', '', '', '', course_id FROM registrations ORDER BY id"),
+]
+
+
+def export_csv(conn, filename, compress=None, batch_size=EXPORT_BATCH, progress=None):
+    """
+    Streams every table of the database to a CSV file.
+
+    Rows are read from SQL cursors ``batch_size`` at a time with ``fetchmany``
+    and written straight to the file, so memory use does not grow with the
+    size of the database. The output uses the column layout read by
+    ``import_csv``.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database to export.
+    filename : str
+        Path of the CSV file to write.
+    compress : bool, optional
+        Gzip the output. Defaults to True when ``filename`` ends in ``.gz``.
+    batch_size : int
+        Rows fetched per ``fetchmany`` call.
+    progress : callable, optional
+        Called after each batch as ``progress(rows_written, fraction_done)``.
+        An exception it raises stops the export, leaving a partial file.
+
+    Returns
+    -------
+    int
+        The number of data rows written.
+    """
+    if compress is None:
+        compress = filename.endswith('.gz')
+    opener = gzip.open if compress else open
+
+    written = 0
+    with opener(filename, 'wt', newline='') as file:
+        total = sum(conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table, _ in _EXPORT_QUERIES) or 1
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_HEADER)
+        for _table, query in _EXPORT_QUERIES:
+            cursor = conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                written += len(rows)
+                if progress is not None:
+                    progress(written, min(written / total, 1.0))
+    return written
+
+
+PAGE_SIZE = 200
+
+# Tables shown in the 'View All' list, in display order: table, ID column, name column, label,
+# and the summary table and column (schema version 5) holding the row's count, if any.
+VIEW_TABLES = (
+    ('students', 'student_id', 'name', 'Student', None),
+    ('instructors', 'instructor_id', 'name', 'Instructor', ('instructor_stats', 'courses')),
+    ('courses', 'course_id', 'course_name', 'Course', ('course_stats', 'students')),
+)
+
+
+def _view_query(table_index):
+    # SELECT of one VIEW_TABLES table for the 'View All' list, with its count joined from the summary table.
+    table, id_column, name_column, _label, counter = VIEW_TABLES[table_index]
+    if counter is None:
+        return f'SELECT t.id, t.{id_column}, t.{name_column}, NULL FROM {table} AS t '
+    stats, count_column = counter
+    return (f'SELECT t.id, t.{id_column}, t.{name_column}, COALESCE(c.{count_column}, 0) FROM {table} AS t '
+            f'LEFT JOIN {stats} AS c ON c.{id_column} = t.{id_column} ')
+
+
+def view_counts(conn, records):
+    """
+    Reads the 'View All' counts of search results from the summary tables.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    records : iterable of tuple
+        ``(record_id, label)`` pairs, with label 'Student', 'Instructor' or 'Course'.
+
+    Returns
+    -------
+    dict
+        ``(record_id, label)`` -> the number of courses an instructor teaches or
+        students a course has; students have no count and are left out.
+    """
+    wanted = {}
+    for record_id, label in records:
+        wanted.setdefault(label, set()).add(record_id)
+    counts = {}
+    for _table, id_column, _name_column, label, counter in VIEW_TABLES:
+        ids = list(wanted.get(label, ()))
+        if counter is None or not ids:
+            continue
+        stats, count_column = counter
+        for record_id in ids:
+            counts[record_id, label] = 0
+        for start in range(0, len(ids), SEARCH_LIMIT):
+            chunk = ids[start:start + SEARCH_LIMIT]
+            for record_id, count in conn.execute(f"SELECT {id_column}, {count_column} FROM {stats} "
+                                                 f"WHERE {id_column} IN ({', '.join('?' * len(chunk))})", chunk):
+                counts[record_id, label] = count
+    return counts
+
+
+def fetch_page(conn, after=None, limit=PAGE_SIZE):
+    """
+    Reads the next page of the 'View All' list with keyset pagination.
+
+    The list is every row of ``VIEW_TABLES`` in order, each table sorted by
+    its ``id`` primary key. A row's position is its key ``(table_index, id)``;
+    each query seeks on the primary key (``WHERE id > ? ORDER BY id LIMIT ?``),
+    so a page costs the same no matter how deep into the list it is. Counts
+    come from the trigger-maintained summary tables, one primary-key lookup
+    per row, so no registrations or courses are counted.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    after : tuple, optional
+        Key of the last row already shown; ``None`` starts from the top.
+    limit : int
+        The maximum number of rows to return.
+
+    Returns
+    -------
+    list of tuple
+        ``(key, (record_id, name, label, count))`` pairs in list order, where
+        ``count`` is the number of students in a course or courses taught by an
+        instructor, and None for students.
+    """
+    table_index, last_id = after or (0, 0)
+    rows = []
+    while table_index < len(VIEW_TABLES) and len(rows) < limit:
+        label = VIEW_TABLES[table_index][3]
+        cursor = conn.execute(_view_query(table_index) + 'WHERE t.id > ? ORDER BY t.id LIMIT ?',
+                              (last_id, limit - len(rows)))
+        rows.extend(((table_index, rowid), (record_id, name, label, count))
+                    for rowid, record_id, name, count in cursor)
+        table_index += 1
+        last_id = 0
+    return rows
+
+
+def fetch_page_before(conn, before, limit=PAGE_SIZE):
+    """
+    Reads the page of the 'View All' list that ends just above ``before``.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    before : tuple
+        Key of the first row already shown.
+    limit : int
+        The maximum number of rows to return.
+
+    Returns
+    -------
+    list of tuple
+        ``(key, (record_id, name, label, count))`` pairs in list order, as ``fetch_page``.
+    """
+    table_index, first_id = before
+    rows = []
+    while table_index >= 0 and len(rows) < limit:
+        label = VIEW_TABLES[table_index][3]
+        where = 'WHERE t.id < ? ' if first_id is not None else ''
+        params = (first_id, limit - len(rows)) if first_id is not None else (limit - len(rows),)
+        cursor = conn.execute(_view_query(table_index) + f'{where}ORDER BY t.id DESC LIMIT ?', params)
+        rows.extend(((table_index, rowid), (record_id, name, label, count))
+                    for rowid, record_id, name, count in cursor)
+        table_index -= 1
+        first_id = None
+    rows.reverse()
+    return rows
+
+
+SEARCH_LIMIT = 500
+
+
+def fts_query(text):
+    """
+    Turns free text typed by the user into an FTS5 query.
+
+    Each whitespace-separated word becomes a quoted prefix term, so
+    ``"ali sm"`` matches records with a word starting with ``ali`` and a word
+    starting with ``sm``. Quoting keeps FTS5 operators and punctuation in the
+    input from being parsed as query syntax.
+
+    Parameters
+    ----------
+    text : str
+        The search text.
+
+    Returns
+    -------
+    str
+        The query, or an empty string if ``text`` has no words.
+    """
+    return ' '.join('"' + word.replace('"', '""') + '"*' for word in text.split())
+
+
+def search_records(conn, text, limit=SEARCH_LIMIT):
+    """
+    Searches student and instructor names, emails and IDs, and course names and IDs.
+
+    Uses the ``search_index`` FTS5 table (schema version 3), which triggers keep
+    in step with the base tables. Every word of ``text`` must match, as a
+    prefix, somewhere in the record; results are ordered by relevance.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    text : str
+        The search text.
+    limit : int
+        The maximum number of results.
+
+    Returns
+    -------
+    list of tuple
+        ``(record_id, name, kind)`` rows, with kind 'Student', 'Instructor' or 'Course'.
+    """
+    query = fts_query(text)
+    if not query:
+        return []
+    return conn.execute('SELECT record_id, name, kind FROM search_index WHERE search_index MATCH ? '
+                        'ORDER BY rank LIMIT ?', (query, limit)).fetchall()
+
+
+def _similar_terms(conn, word):
+    # Words of the name vocabulary within max_distance(word) edits of ``word``. The
+    # first letter is taken as typed, which keeps the scan to one key range.
+    limit = max_distance(word)
+    rows = conn.execute('SELECT term FROM name_terms WHERE term >= ? AND term < ?',
+                        (word[0], chr(ord(word[0]) + 1)))
+    return [term for term, in rows
+            if abs(len(term) - len(word)) <= limit and edit_distance(word, term, limit) <= limit]
+
+
+def fuzzy_search(conn, text, limit=FUZZY_LIMIT):
+    """
+    Finds the students, instructors and courses whose names are closest to ``text``, tolerating typos.
+
+    Each word of the query is matched against the distinct words of all names
+    (the ``name_terms`` vocabulary, schema version 4) by edit distance. One
+    FTS5 query then collects the ``FUZZY_CANDIDATES`` best records containing
+    a close word for every query word, and only those are re-ranked against
+    the whole query with ``text_search.rank_names``. No step compares every
+    name, so the cost depends on the vocabulary and not on the number of records.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        An open connection to the database.
+    text : str
+        The search text.
+    limit : int
+        The maximum number of results.
+
+    Returns
+    -------
+    list of tuple
+        ``(score, record_id, name, kind)`` rows, best first, with ``score`` between 0 and 1.
+    """
+    words = re.findall(r'\w+', text.lower())
+    groups = [terms for terms in (_similar_terms(conn, word) for word in words) if terms]
+    if not groups:
+        return []
+    match = ' AND '.join('(' + ' OR '.join(f'"{term}"' for term in terms) + ')' for terms in groups)
+    candidates = conn.execute(
+        'SELECT search_index.kind, search_index.record_id, search_index.name '
+        'FROM (SELECT rowid FROM name_index WHERE name_index MATCH ? ORDER BY rank LIMIT ?) AS hits '
+        'JOIN search_index ON search_index.rowid = hits.rowid', (match, FUZZY_CANDIDATES))
+    ranked = rank_names(' '.join(words), (((kind, record_id), name) for kind, record_id, name in candidates), limit)
+    return [(score, record_id, name, kind) for score, (kind, record_id), name in ranked]
@@ -0,0 +1,595 @@
+"""
+Compact binary snapshots of a ``SchoolRegistry`` with lazy, memory-mapped loading.
+
+File layout (little-endian, every section 8-byte aligned)::
+
+    header        magic, version, row counts, journal sequence and section offsets
+    instructors   fixed-width PERSON_ROW per instructor
+    students      fixed-width STUDENT_ROW per student
+    courses       fixed-width COURSE_ROW per course
+    roster        uint32 student rows, grouped by course
+    schedule      uint32 course rows, grouped by student
+    student_index uint32 student rows sorted by student ID
+    instr_index   uint32 instructor rows sorted by instructor ID
+    heap          UTF-8 string bytes referenced by (offset, length) pairs
+
+``open_registry`` maps the file and returns a registry whose student and
+instructor tables only build ``Student``/``Instructor`` objects for the rows
+that are actually looked up or iterated. Courses are few and are built when
+the file is opened. Enrollments are answered from the roster and schedule
+sections by a ``SnapshotEnrollments`` graph, which only copies the
+enrollments of a student or course into memory once they change.
+"""
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping, ValuesView
+
+from OOP import Course, EnrollmentGraph, Instructor, SchoolRegistry, Student
+
+MAGIC = b'SCHSNAP\0'
+VERSION = 2
+
+PREAMBLE = struct.Struct('<8sI')
+HEADER_V1 = struct.Struct('<8sIIIIQ8Q')
+HEADER = struct.Struct('<8sIIIIQQ8Q')
+PERSON_ROW = struct.Struct('<QIQIQIi')
+STUDENT_ROW = struct.Struct('<QIQIQIiQI')
+COURSE_ROW = struct.Struct('<QIQIiQI')
+INDEX_ITEM = 4
+# Records written between progress reports in ``write_snapshot``.
+PROGRESS_EVERY = 10000
+
+
+class SnapshotError(Exception):
+    """
+    Raised when a file is not a snapshot this module can read.
+    """
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _reporting(items, progress, done, total):
+    # Yields ``items``, calling progress(records_done, fraction) every PROGRESS_EVERY of them.
+    for count, item in enumerate(items, 1):
+        yield item
+        if progress is not None and count % PROGRESS_EVERY == 0:
+            progress(done + count, (done + count) / total)
+
+
+class _HeapWriter:
+    def __init__(self):
+        self.data = bytearray()
+
+    def add(self, text):
+        raw = (text or '').encode('utf-8')
+        offset = len(self.data)
+        self.data += raw
+        return offset, len(raw)
+
+
+def write_snapshot(path, registry, journal_seq=0, progress=None):
+    """
+    Writes every record of ``registry`` to a binary snapshot at ``path``.
+
+    The file is written next to ``path`` and moved into place with
+    ``os.replace``, so readers never see a partially written snapshot.
+
+    Args:
+        path (str): Destination file name.
+        registry (SchoolRegistry): The registry to save.
+        journal_seq (int): Sequence number of the last journal entry already
+            reflected in ``registry``; see ``journal.JournaledStore``.
+        progress (callable): Called as ``progress(records_done, fraction)`` every
+            ``PROGRESS_EVERY`` records. An exception it raises stops the write
+            and leaves any existing snapshot at ``path`` untouched.
+    """
+    heap = _HeapWriter()
+    instructors = list(registry.instructors.values())
+    students = list(registry.students.values())
+    courses = list(registry.courses.values())
+    total = len(instructors) + len(students) + len(courses) or 1
+    enrollments = registry.enrollments
+    instructor_rows = {id(instructor): row for row, instructor in enumerate(instructors)}
+    student_rows = {student.student_id: row for row, student in enumerate(students)}
+    course_rows = {course.course_id: row for row, course in enumerate(courses)}
+
+    instructor_table = bytearray()
+    for instructor in _reporting(instructors, progress, 0, total):
+        instructor_table += PERSON_ROW.pack(*heap.add(instructor.instructor_id), *heap.add(instructor.name),
+                                            *heap.add(instructor._email), instructor.age)
+
+    roster = []
+    course_table = bytearray()
+    for course in _reporting(courses, progress, len(instructors), total):
+        enrolled = [student_rows[s] for s in enrollments.students_of(course.course_id) if s in student_rows]
+        instructor_row = instructor_rows.get(id(course.instructor), -1)
+        course_table += COURSE_ROW.pack(*heap.add(course.course_id), *heap.add(course.course_name),
+                                        instructor_row, len(roster), len(enrolled))
+        roster.extend(enrolled)
+
+    schedule = []
+    student_table = bytearray()
+    for student in _reporting(students, progress, len(instructors) + len(courses), total):
+        registered = [course_rows[c] for c in enrollments.courses_of(student.student_id) if c in course_rows]
+        student_table += STUDENT_ROW.pack(*heap.add(student.student_id), *heap.add(student.name),
+                                          *heap.add(student._email), student.age, len(schedule), len(registered))
+        schedule.extend(registered)
+
+    student_index = sorted(range(len(students)), key=lambda row: students[row].student_id.encode('utf-8'))
+    instructor_index = sorted(range(len(instructors)), key=lambda row: instructors[row].instructor_id.encode('utf-8'))
+
+    sections = [
+        bytes(instructor_table),
+        bytes(student_table),
+        bytes(course_table),
+        struct.pack(f'<{len(roster)}I', *roster),
+        struct.pack(f'<{len(schedule)}I', *schedule),
+        struct.pack(f'<{len(student_index)}I', *student_index),
+        struct.pack(f'<{len(instructor_index)}I', *instructor_index),
+        bytes(heap.data),
+    ]
+    offsets = []
+    position = _align(HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    if progress is not None:
+        progress(total, 1.0)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(instructors), len(students), len(courses), len(roster),
+                                journal_seq, *offsets))
+        for offset, section in zip(offsets, sections):
+            file.write(b'\0' * (offset - file.tell()))
+            file.write(section)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Rows are decoded on demand, so only the pages holding the rows (and their
+    strings) that are actually read get loaded from disk.
+
+    Attributes:
+        num_instructors (int): Number of instructor rows.
+        num_students (int): Number of student rows.
+        num_courses (int): Number of course rows.
+        num_edges (int): Number of enrollments.
+        journal_seq (int): Last journal entry included in the snapshot (0 for version 1 files).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"Empty snapshot file: {path}")
+        magic, version = PREAMBLE.unpack_from(self._map, 0) if self._map.size() >= PREAMBLE.size else (None, None)
+        header = {1: HEADER_V1, 2: HEADER}.get(version)
+        if magic != MAGIC or header is None or self._map.size() < header.size:
+            self._map.close()
+            self._file.close()
+            raise SnapshotError(f"Not a readable snapshot: {path}")
+        fields = header.unpack_from(self._map, 0)
+        self.num_instructors, self.num_students, self.num_courses, self.num_edges = fields[2:6]
+        self.journal_seq = fields[6] if version >= 2 else 0
+        (self._instructors_at, self._students_at, self._courses_at, roster_at, schedule_at,
+         student_index_at, instructor_index_at, self._heap_at) = fields[-8:]
+        view = self._view = memoryview(self._map)
+        self._roster = view[roster_at:roster_at + self.num_edges * INDEX_ITEM].cast('I')
+        self._schedule = view[schedule_at:schedule_at + self.num_edges * INDEX_ITEM].cast('I')
+        self._student_index = view[student_index_at:student_index_at + self.num_students * INDEX_ITEM].cast('I')
+        self._instructor_index = view[instructor_index_at:instructor_index_at + self.num_instructors * INDEX_ITEM].cast('I')
+
+    def close(self):
+        """
+        Releases the memory map and the underlying file.
+
+        Rosters handed out by ``roster`` keep the map alive; if any are still
+        referenced the map is left for the garbage collector to release.
+        """
+        for view in (self._roster, self._schedule, self._student_index, self._instructor_index, self._view):
+            view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _text(self, offset, length):
+        start = self._heap_at + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def _raw(self, offset, length):
+        start = self._heap_at + offset
+        return self._map[start:start + length]
+
+    def instructor(self, row):
+        """
+        Returns ``(instructor_id, name, email, age)`` for an instructor row.
+        """
+        id_off, id_len, name_off, name_len, email_off, email_len, age = PERSON_ROW.unpack_from(
+            self._map, self._instructors_at + row * PERSON_ROW.size)
+        return self._text(id_off, id_len), self._text(name_off, name_len), self._text(email_off, email_len), age
+
+    def student(self, row):
+        """
+        Returns ``(student_id, name, email, age)`` for a student row.
+        """
+        id_off, id_len, name_off, name_len, email_off, email_len, age, _, _ = STUDENT_ROW.unpack_from(
+            self._map, self._students_at + row * STUDENT_ROW.size)
+        return self._text(id_off, id_len), self._text(name_off, name_len), self._text(email_off, email_len), age
+
+    def course(self, row):
+        """
+        Returns ``(course_id, course_name, instructor_row)`` for a course row.
+        """
+        id_off, id_len, name_off, name_len, instructor_row, _, _ = COURSE_ROW.unpack_from(
+            self._map, self._courses_at + row * COURSE_ROW.size)
+        return self._text(id_off, id_len), self._text(name_off, name_len), instructor_row
+
+    def student_id(self, row):
+        id_off, id_len = STUDENT_ROW.unpack_from(self._map, self._students_at + row * STUDENT_ROW.size)[:2]
+        return self._text(id_off, id_len)
+
+    def instructor_id(self, row):
+        id_off, id_len = PERSON_ROW.unpack_from(self._map, self._instructors_at + row * PERSON_ROW.size)[:2]
+        return self._text(id_off, id_len)
+
+    def student_name(self, row):
+        name_off, name_len = STUDENT_ROW.unpack_from(self._map, self._students_at + row * STUDENT_ROW.size)[2:4]
+        return self._text(name_off, name_len)
+
+    def instructor_name(self, row):
+        name_off, name_len = PERSON_ROW.unpack_from(self._map, self._instructors_at + row * PERSON_ROW.size)[2:4]
+        return self._text(name_off, name_len)
+
+    def roster(self, course_row):
+        """
+        Returns the student rows enrolled in a course row, as a zero-copy view.
+        """
+        start, count = COURSE_ROW.unpack_from(self._map, self._courses_at + course_row * COURSE_ROW.size)[5:]
+        return self._roster[start:start + count]
+
+    def schedule(self, student_row):
+        """
+        Returns the course rows a student row is registered for, as a zero-copy view.
+        """
+        start, count = STUDENT_ROW.unpack_from(self._map, self._students_at + student_row * STUDENT_ROW.size)[7:]
+        return self._schedule[start:start + count]
+
+    def _search(self, index, table_at, row_struct, key):
+        target = key.encode('utf-8')
+        low, high = 0, len(index)
+        while low < high:
+            middle = (low + high) // 2
+            row = index[middle]
+            id_off, id_len = row_struct.unpack_from(self._map, table_at + row * row_struct.size)[:2]
+            if self._raw(id_off, id_len) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(index):
+            row = index[low]
+            id_off, id_len = row_struct.unpack_from(self._map, table_at + row * row_struct.size)[:2]
+            if self._raw(id_off, id_len) == target:
+                return row
+        return None
+
+    def find_student(self, student_id):
+        """
+        Returns the row of ``student_id`` by binary search, or None.
+        """
+        return self._search(self._student_index, self._students_at, STUDENT_ROW, student_id)
+
+    def find_instructor(self, instructor_id):
+        """
+        Returns the row of ``instructor_id`` by binary search, or None.
+        """
+        return self._search(self._instructor_index, self._instructors_at, PERSON_ROW, instructor_id)
+
+
+class SnapshotTable(MutableMapping):
+    """
+    Dict-like ID -> object table backed by snapshot rows.
+
+    Objects are built the first time their ID is looked up and cached, so the
+    same ID always yields the same object, even when a background thread (such
+    as a save) reads the table while the GUI thread does. Added and removed
+    entries are kept in an overlay; the snapshot itself is never modified.
+    ``names`` reads every entry's name without building any objects.
+    """
+    def __init__(self, size, key_of, find_row, build, name_of):
+        self._size = size
+        self._key_of = key_of
+        self._name_of = name_of
+        self._find_row = find_row
+        self._build = build
+        self._loaded = {}
+        self._rows = {}
+        self._added = {}
+        self._removed = {}
+        self._build_lock = threading.Lock()
+
+    def _load(self, key, row):
+        # Builds and caches the object for ``row`` unless another thread just did.
+        with self._build_lock:
+            obj = self._loaded.get(key)
+            if obj is None:
+                obj = self._loaded[key] = self._build(row)
+                self._rows[key] = row
+            return obj
+
+    def row_of(self, key):
+        """
+        Returns the snapshot row of ``key`` (even if removed since opening), or None.
+
+        Rows of objects already built are remembered, so they are not searched for again.
+        """
+        row = self._rows.get(key)
+        return row if row is not None else self._find_row(key)
+
+    @property
+    def num_rows(self):
+        """
+        The number of snapshot rows, including rows removed since opening.
+        """
+        return self._size
+
+    def key_of(self, row):
+        """
+        Returns the key of a snapshot row, including rows removed since opening.
+        """
+        return self._key_of(row)
+
+    def overlay(self):
+        """
+        Returns ``(removed, added)``: the keys removed from the snapshot rows and
+        the keys added after them since opening, in the order they were changed.
+        """
+        return list(self._removed), list(self._added)
+
+    def by_row(self, row):
+        """
+        Returns the object for a snapshot row, including rows removed since opening.
+        """
+        key = self._key_of(row)
+        obj = self._loaded.get(key)
+        if obj is None:
+            obj = self._removed.get(key)
+        if obj is None:
+            obj = self._load(key, row)
+        return obj
+
+    def __getitem__(self, key):
+        obj = self._added.get(key)
+        if obj is not None:
+            return obj
+        obj = self._loaded.get(key)
+        if obj is not None:
+            return obj
+        if key in self._removed:
+            raise KeyError(key)
+        row = self._find_row(key)
+        if row is None:
+            raise KeyError(key)
+        return self._load(key, row)
+
+    def __contains__(self, key):
+        if key in self._added or key in self._loaded:
+            return True
+        return key not in self._removed and self._find_row(key) is not None
+
+    def __setitem__(self, key, obj):
+        if key not in self._removed and self._find_row(key) is not None:
+            self._loaded[key] = obj
+        else:
+            self._added[key] = obj
+
+    def __delitem__(self, key):
+        if key in self._added:
+            del self._added[key]
+            return
+        obj = self[key]
+        del self._loaded[key]
+        self._removed[key] = obj
+
+    def __iter__(self):
+        removed = self._removed
+        for row in range(self._size):
+            key = self._key_of(row)
+            if key not in removed:
+                yield key
+        yield from list(self._added)
+
+    def __len__(self):
+        return self._size - len(self._removed) + len(self._added)
+
+    def values(self):
+        return _SnapshotValues(self)
+
+    def names(self):
+        """
+        Yields ``(key, name)`` for every entry, reading names from the snapshot for
+        rows whose objects have not been built; objects already built (and
+        possibly edited since) supply their own ``name``.
+        """
+        removed, loaded = self._removed, self._loaded
+        for row in range(self._size):
+            key = self._key_of(row)
+            if key not in removed:
+                obj = loaded.get(key)
+                yield key, obj.name if obj is not None else self._name_of(row)
+        for key, obj in list(self._added.items()):
+            yield key, obj.name
+
+    def _iter_values(self):
+        # Walks the rows directly instead of searching for every key, as the default values() would.
+        removed, loaded = self._removed, self._loaded
+        for row in range(self._size):
+            key = self._key_of(row)
+            if key not in removed:
+                obj = loaded.get(key)
+                yield obj if obj is not None else self._load(key, row)
+        yield from list(self._added.values())
+
+
+class _SnapshotValues(ValuesView):
+    def __iter__(self):
+        return self._mapping._iter_values()
+
+
+class SnapshotEnrollments(EnrollmentGraph):
+    """
+    Enrollment graph read from the roster and schedule sections of a snapshot.
+
+    The enrollments of a student or course that has not changed since the
+    file was opened are answered from the file. The first enroll, drop or
+    removal touching one copies its set into memory, and the change is made
+    there; the snapshot itself is never modified.
+
+    Args:
+        snapshot (Snapshot): The open snapshot.
+        course_ids (list): The course ID of each course row.
+        find_student (callable): Returns the row of a student ID, or None;
+            ``snapshot.find_student`` or the ``row_of`` of the student table.
+    """
+    def __init__(self, snapshot, course_ids, find_student):
+        super().__init__()
+        self._snapshot = snapshot
+        self._find_student = find_student
+        self._course_ids = course_ids
+        self._course_rows = {course_id: row for row, course_id in enumerate(course_ids)}
+        self._edges = snapshot.num_edges
+
+    def _schedule_rows(self, student_id):
+        row = self._find_student(student_id)
+        return self._snapshot.schedule(row) if row is not None else None
+
+    def _roster_rows(self, course_id):
+        row = self._course_rows.get(course_id)
+        return self._snapshot.roster(row) if row is not None else None
+
+    def _courses(self, student_id, create=False):
+        edges = self._courses_of.get(student_id)
+        if edges is None:
+            rows = self._schedule_rows(student_id)
+            if rows is not None or create:
+                course_ids = self._course_ids
+                edges = self._courses_of[student_id] = dict.fromkeys(course_ids[row] for row in rows or ())
+        return edges
+
+    def _students(self, course_id, create=False):
+        edges = self._students_of.get(course_id)
+        if edges is None:
+            rows = self._roster_rows(course_id)
+            if rows is not None or create:
+                student_id = self._snapshot.student_id
+                edges = self._students_of[course_id] = dict.fromkeys(student_id(row) for row in rows or ())
+        return edges
+
+    def is_enrolled(self, student_id, course_id):
+        if student_id in self._courses_of:
+            return super().is_enrolled(student_id, course_id)
+        rows = self._schedule_rows(student_id)
+        return rows is not None and self._course_rows.get(course_id) in rows
+
+    def courses_of(self, student_id):
+        if student_id in self._courses_of:
+            return super().courses_of(student_id)
+        course_ids = self._course_ids
+        return [course_ids[row] for row in self._schedule_rows(student_id) or ()]
+
+    def students_of(self, course_id):
+        if course_id in self._students_of:
+            return super().students_of(course_id)
+        student_id = self._snapshot.student_id
+        return [student_id(row) for row in self._roster_rows(course_id) or ()]
+
+    def course_count(self, student_id):
+        if student_id in self._courses_of:
+            return super().course_count(student_id)
+        return len(self._schedule_rows(student_id) or ())
+
+    def student_count(self, course_id):
+        if course_id in self._students_of:
+            return super().student_count(course_id)
+        return len(self._roster_rows(course_id) or ())
+
+    def remove_student(self, student_id):
+        dropped = super().remove_student(student_id)
+        # An empty set, so the removed student's enrollments are not read from the file again.
+        self._courses_of[student_id] = {}
+        return dropped
+
+    def remove_course(self, course_id):
+        dropped = super().remove_course(course_id)
+        self._students_of[course_id] = {}
+        return dropped
+
+
+def open_registry(path):
+    """
+    Opens a snapshot and returns a registry whose tables read from it lazily.
+
+    Args:
+        path (str): Snapshot file name.
+
+    Returns:
+        SchoolRegistry: The registry. Its ``snapshot`` attribute holds the open
+        ``Snapshot``, which must stay open while the registry is in use.
+    """
+    snapshot = Snapshot(path)
+    registry = SchoolRegistry()
+    courses = []
+    # Instructor row -> the courses it teaches, in course order.
+    courses_by_instructor = {}
+
+    def build_instructor(row):
+        instructor_id, name, email, age = snapshot.instructor(row)
+        instructor = Instructor(name=name, age=age, email=email, instructor_id=instructor_id)
+        instructor.assigned_courses = list(courses_by_instructor.get(row, ()))
+        return instructor
+
+    def build_student(row):
+        student_id, name, email, age = snapshot.student(row)
+        return Student(name=name, age=age, email=email, student_id=student_id)
+
+    registry.instructors = SnapshotTable(snapshot.num_instructors, snapshot.instructor_id,
+                                         snapshot.find_instructor, build_instructor, snapshot.instructor_name)
+    registry.students = SnapshotTable(snapshot.num_students, snapshot.student_id,
+                                      snapshot.find_student, build_student, snapshot.student_name)
+
+    course_instructor = {}
+    for row in range(snapshot.num_courses):
+        course_id, course_name, instructor_row = snapshot.course(row)
+        course = Course(course_id=course_id, course_name=course_name, instructor=None)
+        course_instructor[id(course)] = instructor_row
+        courses_by_instructor.setdefault(instructor_row, []).append(course)
+        courses.append(course)
+        registry.courses[course_id] = course
+    for course in courses:
+        if course_instructor[id(course)] >= 0:
+            course.instructor = registry.instructors.by_row(course_instructor[id(course)])
+    registry.enrollments = SnapshotEnrollments(snapshot, [course.course_id for course in courses],
+                                               registry.students.row_of)
+
+    registry.snapshot = snapshot
+    return registry
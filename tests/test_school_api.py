@@ -0,0 +1,110 @@
+"""
+Loopback tests for ``school_api``.
+
+Each test starts the API server on a free port against a throwaway database
+and talks to it over a real connection.
+
+Usage::
+
+    python -m unittest discover tests
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db_migrations import migrate
+from school_api import SchoolApi, serve
+from school_db import ConnectionPool
+
+
+async def request(port, method, path, body=None):
+    """
+    Sends one request on a new connection and returns the status and decoded JSON body.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+                 f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    payload = json.loads(await reader.readexactly(length))
+    writer.close()
+    return status, payload
+
+
+class SchoolApiTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'school.db')
+        conn = sqlite3.connect(path)
+        migrate(conn)
+        conn.execute("INSERT INTO students (name, age, email, student_id) VALUES ('Alice', 20, 'alice@school.edu', 'S1')")
+        conn.execute("INSERT INTO instructors (name, age, email, instructor_id) VALUES ('Bob', 40, 'bob@school.edu', 'I1')")
+        conn.execute("INSERT INTO courses (course_name, course_id, instructor_id) VALUES ('Math', 'C1', 'I1')")
+        conn.commit()
+        conn.close()
+        self.pool = ConnectionPool(path, size=2)
+        self.api = SchoolApi(self.pool, 2)
+        self.server = await serve(self.api, port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.api.close()
+        self.pool.close()
+        self.directory.cleanup()
+
+    async def test_get_record(self):
+        status, record = await request(self.port, 'GET', '/students/S1')
+        self.assertEqual(status, 200)
+        self.assertEqual(record['student_id'], 'S1')
+        self.assertEqual(record['name'], 'Alice')
+
+    async def test_bulk_insert_rejects_unknown_reference(self):
+        registrations = [{'student_id': 'S1', 'course_id': 'C1'}, {'student_id': 'S9', 'course_id': 'C1'}]
+        status, result = await request(self.port, 'POST', '/registrations', registrations)
+        self.assertEqual(status, 200)
+        self.assertEqual(result['inserted'], 1)
+        self.assertEqual([item['index'] for item in result['rejected']], [1])
+        status, found = await request(self.port, 'GET', '/registrations?course_id=C1')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(found), 1)
+
+    async def test_not_found(self):
+        status, payload = await request(self.port, 'GET', '/students/S9')
+        self.assertEqual(status, 404)
+        self.assertIn('error', payload)
+        status, _payload = await request(self.port, 'GET', '/teachers')
+        self.assertEqual(status, 404)
+
+    async def test_bad_request(self):
+        status, payload = await request(self.port, 'POST', '/students', b'{not json')
+        self.assertEqual(status, 400)
+        self.assertEqual(payload['error'], 'Request body is not valid JSON')
+
+    async def test_internal_error_hides_details(self):
+        with mock.patch.object(self.api, 'route', side_effect=RuntimeError('secret.db is locked')), \
+                self.assertLogs('school_api', 'ERROR'):
+            status, payload = await request(self.port, 'GET', '/stats')
+        self.assertEqual(status, 500)
+        self.assertEqual(payload, {'error': 'Internal server error'})
+
+
+if __name__ == '__main__':
+    unittest.main()
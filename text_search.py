@@ -0,0 +1,328 @@
+"""
+In-memory trigram index for substring and fuzzy search over a ``SchoolRegistry``.
+
+Every record is indexed under the three-character slices (trigrams) of its
+lower-cased ID and name. A substring query only has to look at the records
+that share the query's rarest trigram instead of scanning every record, and
+the index follows the registry's change events so it never has to be rebuilt
+after an add, edit or delete.
+
+Fuzzy (typo-tolerant) search uses the same trigrams to collect the records
+sharing the most trigrams with the query, then re-ranks only those by a
+bounded edit distance (see ``rank_names``, which ``school_db`` also uses for
+the Tkinter app's database).
+"""
+import heapq
+from collections import Counter, defaultdict
+from itertools import islice
+
+# Registry record kinds and the record type used in keys, as shown by the record table.
+RECORD_TYPES = {'student': 'Student', 'instructor': 'Instructor', 'course': 'Course'}
+
+FUZZY_LIMIT = 10
+# Records re-ranked by edit distance per fuzzy query, and the number of records
+# counted from the rarest trigrams before the commoner ones are skipped.
+FUZZY_CANDIDATES = 200
+FUZZY_POOL = 5000
+
+
+def trigrams(text):
+    """
+    Returns the set of three-character slices of ``text``.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def searchText(record_type, record):
+    """
+    Returns the lower-cased text a record is searched by: its ID and name on separate lines.
+
+    The text starts and ends with a newline so the first and last letters of
+    the ID and name also appear in trigrams, which fuzzy search relies on.
+    """
+    if record_type == 'Student':
+        return _searchText(record.student_id, record.name)
+    if record_type == 'Instructor':
+        return _searchText(record.instructor_id, record.name)
+    return _searchText(record.course_id, record.course_name)
+
+
+def _searchText(record_id, name):
+    return f'\n{record_id}\n{name}\n'.lower()
+
+
+def _registryNames(registry):
+    # Yields ((type, ID), name) for every record. Tables that read from a snapshot
+    # supply names straight from the file, so indexing builds no record objects.
+    courses = registry.courses
+    for course_id in list(courses):
+        course = courses.get(course_id)
+        if course is not None:
+            yield ('Course', course_id), course.course_name
+    for record_type, table in (('Instructor', registry.instructors), ('Student', registry.students)):
+        if hasattr(table, 'names'):
+            for record_id, name in table.names():
+                yield (record_type, record_id), name
+        else:
+            for record_id in list(table):
+                record = table.get(record_id)
+                if record is not None:
+                    yield (record_type, record_id), record.name
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the edit distance between ``a`` and ``b``, or ``limit + 1`` if it exceeds ``limit``.
+
+    Insertions, deletions, substitutions and swaps of two adjacent letters
+    each count as one edit (the optimal string alignment distance). Only the
+    last two rows of the dynamic-programming table are kept, and the
+    computation stops as soon as every entry of a row is over ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def max_distance(query):
+    """
+    Returns the number of typos tolerated in ``query``: 1 up to 7 characters, 2 up to 11, then 3.
+    """
+    return min(3, 1 + len(query) // 8 + len(query) // 12)
+
+
+def fuzzy_score(query, name, limit=None):
+    """
+    Scores how closely ``name`` matches the lower-cased ``query``, from 0 to 1.
+
+    The query is compared with the whole name and with each run of as many
+    consecutive words as the query has, so "jonson" matches "Mary Johnson".
+
+    Returns:
+        float: ``1 - distance / len(query)``, or None if more than ``limit``
+        (default ``max_distance(query)``) edits apart.
+    """
+    if limit is None:
+        limit = max_distance(query)
+    words = name.lower().split()
+    span = len(query.split()) or 1
+    targets = {' '.join(words)} | {' '.join(words[i:i + span]) for i in range(len(words) - span + 1)}
+    distance = min(edit_distance(query, target, limit) for target in targets)
+    if distance > limit:
+        return None
+    return 1 - distance / max(len(query), 1)
+
+
+def rank_names(query, candidates, limit=FUZZY_LIMIT):
+    """
+    Re-ranks candidate records by how closely their names match ``query``.
+
+    Args:
+        query (str): The search text.
+        candidates (iterable): ``(key, name)`` pairs.
+        limit (int): The number of results to return.
+
+    Returns:
+        list: Up to ``limit`` ``(score, key, name)`` tuples, best first; candidates
+        more than ``max_distance(query)`` edits away are dropped.
+    """
+    query = ' '.join(query.lower().split())
+    scored = []
+    for key, name in candidates:
+        score = fuzzy_score(query, name)
+        if score is not None:
+            scored.append((score, key, name))
+    return heapq.nlargest(limit, scored, key=lambda result: result[0])
+
+
+class TrigramIndex:
+    """
+    Substring index over the students, instructors and courses of a registry.
+
+    Records are keyed by ``(type, ID)`` with type 'Student', 'Instructor' or
+    'Course'. Attaching a registry only queues its records; ``build`` indexes
+    them a chunk at a time, so a GUI can do it while idle. Records of a
+    registry opened from a snapshot are indexed from the names stored in the
+    file, without building their objects. Until the build is complete,
+    searches only see the records indexed so far. Changes made through the
+    registry are indexed as they happen, whether or not the build has
+    reached them.
+
+    Attributes:
+        registry (SchoolRegistry): The registry being indexed.
+        complete (bool): Whether every record queued by ``attach`` has been indexed.
+    """
+
+    def __init__(self):
+        self.registry = None
+        self.complete = True
+        self._texts = {}
+        self._postings = defaultdict(set)
+        self._pending = iter(())
+
+    def attach(self, registry):
+        """
+        Indexes ``registry`` instead of the current one and subscribes to its changes.
+
+        Args:
+            registry (SchoolRegistry): The registry to index.
+        """
+        if self.registry is not None:
+            self.registry.unsubscribe(self.recordChanged)
+        self.registry = registry
+        self._texts = {}
+        self._postings = defaultdict(set)
+        self._pending = _registryNames(registry)
+        self.complete = False
+        registry.subscribe(self.recordChanged)
+
+    def _lookup(self, key):
+        record_type, record_id = key
+        if record_type == 'Student':
+            return self.registry.get_student(record_id)
+        if record_type == 'Instructor':
+            return self.registry.get_instructor(record_id)
+        return self.registry.get_course(record_id)
+
+    def build(self, limit=None):
+        """
+        Indexes up to ``limit`` of the records still queued by ``attach``.
+
+        Args:
+            limit (int): The maximum number of records to index; None indexes them all.
+
+        Returns:
+            bool: True once every record is indexed.
+        """
+        texts = self._texts
+        count = 0
+        for key, name in islice(self._pending, limit):
+            count += 1
+            # Records changed since attaching were already indexed by recordChanged.
+            if key not in texts:
+                self._add(key, _searchText(key[1], name))
+        if limit is None or count < limit:
+            self.complete = True
+        return self.complete
+
+    def _add(self, key, text):
+        self._texts[key] = text
+        for trigram in trigrams(text):
+            self._postings[trigram].add(key)
+
+    def _remove(self, key):
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        for trigram in trigrams(text):
+            keys = self._postings.get(trigram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[trigram]
+
+    def recordChanged(self, event, kind, record_id):
+        """
+        Updates the entry of a changed record; subscribed by ``attach``.
+
+        Args:
+            event (str): 'inserted', 'updated' or 'removed'.
+            kind (str): 'student', 'instructor' or 'course'.
+            record_id (str): The ID of the changed record.
+        """
+        key = (RECORD_TYPES[kind], record_id)
+        self._remove(key)
+        if event != 'removed':
+            record = self._lookup(key)
+            if record is not None:
+                self._add(key, searchText(key[0], record))
+
+    def matches(self, key, term):
+        """
+        Returns whether the record ``key`` contains ``term`` in its ID or name, ignoring case.
+        """
+        text = self._texts.get(key)
+        return text is not None and term.lower() in text
+
+    def search(self, term):
+        """
+        Returns the keys of the records whose ID or name contains ``term``, ignoring case.
+
+        Terms of three or more characters are looked up under their rarest
+        trigram and the candidates are confirmed with a substring check.
+        Shorter terms take the union of the trigrams that contain them.
+        Only the records indexed so far are searched; see ``complete``.
+
+        Args:
+            term (str): The text to look for.
+
+        Returns:
+            set: ``(type, ID)`` keys of the matching records.
+        """
+        term = term.lower()
+        if not term:
+            return set(self._texts)
+        if len(term) < 3:
+            found = set()
+            for trigram, keys in self._postings.items():
+                if term in trigram:
+                    found |= keys
+            return found
+        postings = []
+        for trigram in trigrams(term):
+            keys = self._postings.get(trigram)
+            if not keys:
+                return set()
+            postings.append(keys)
+        texts = self._texts
+        return {key for key in min(postings, key=len) if term in texts[key]}
+
+    def fuzzySearch(self, term, limit=FUZZY_LIMIT):
+        """
+        Returns the records whose names are closest to ``term``, tolerating typos.
+
+        Candidates are the records sharing the most trigrams with the query,
+        counted from its rarest trigrams first; only the best
+        ``FUZZY_CANDIDATES`` of them are compared by edit distance. Only the
+        records indexed so far are searched; see ``complete``.
+
+        Args:
+            term (str): The text to look for.
+            limit (int): The number of results to return.
+
+        Returns:
+            list: Up to ``limit`` ``(score, key, name)`` tuples, best first.
+        """
+        query = ' '.join(term.lower().split())
+        if not query:
+            return []
+        grams = trigrams(f'\n{query}\n') | trigrams(f' {query} ')
+        postings = sorted((self._postings[gram] for gram in grams if gram in self._postings), key=len)
+        counts = Counter()
+        for keys in postings:
+            if len(counts) >= FUZZY_POOL:
+                break
+            counts.update(keys)
+        best = heapq.nlargest(FUZZY_CANDIDATES, counts.items(), key=lambda item: item[1])
+        # Candidates are ranked by the lower-cased name in their search text; only the
+        # records returned are looked up, for their names as written.
+        texts = self._texts
+        ranked = rank_names(query, ((key, texts[key].split('\n')[2]) for key, _count in best), limit)
+        results = []
+        for score, key, _name in ranked:
+            record = self._lookup(key)
+            if record is not None:
+                results.append((score, key, record.course_name if key[0] == 'Course' else record.name))
+        return results